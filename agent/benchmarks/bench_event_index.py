@@ -0,0 +1,56 @@
+"""イベントインデックス（文字 n-gram 転置インデックス）のサイズと検索レイテンシを計測する。
+
+MOCK_EVENTS を ID を変えて複製したコーパスで計測する。
+
+実行方法:
+    uv run python benchmarks/bench_event_index.py [件数] [n]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from confee_agent.event_index import EventIndex
+from confee_agent.mock_events import MOCK_EVENTS
+from confee_agent.tools.search_connpass import _parse_event
+
+# インデックスは開催月・開催日の指定がある検索にだけ応答する
+QUERIES = [
+    {"keyword": "TypeScript", "ym": "202603,202604"},
+    {"keyword": "もくもく会", "ym": "202603,202604"},
+    {"keyword_or": "Python,Rust", "ym": "202603,202604"},
+    {"keyword": "勉強会", "ym": "202603", "prefecture": "tokyo"},
+    {"keyword": "クラウドネイティブ", "ym": "202604"},
+]
+
+
+def main(n: int, ngram: int) -> None:
+    events = [
+        _parse_event({**MOCK_EVENTS[i % len(MOCK_EVENTS)], "id": 1_000_000 + i})
+        for i in range(n)
+    ]
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    index = EventIndex(events, months={"202603", "202604"}, ngram=ngram)
+    build_seconds = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"events: {n}, n-gram: {ngram}")
+    print(f"  build time     : {build_seconds * 1000:8.1f} ms")
+    print(f"  index memory   : {current / 1024 / 1024:8.2f} MiB (postings arrays: {index._text_index.postings_bytes() / 1024:.1f} KiB)")
+    for query in QUERIES:
+        iterations = 50
+        started = time.perf_counter()
+        for _ in range(iterations):
+            result = index.search(**query)
+        elapsed = (time.perf_counter() - started) / iterations
+        print(f"  {str(query):50s} {elapsed * 1e6:10.1f} us  ({result.results_available} hits)")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 2,
+    )
@@ -0,0 +1,80 @@
+"""ConnpassEvent の旧表現（__dict__ ベース）と新表現（slots / 列指向）のメモリ使用量を比較する。
+
+実行方法:
+    uv run python benchmarks/bench_models_memory.py [件数]
+"""
+
+import sys
+import tracemalloc
+from dataclasses import dataclass
+
+from confee_agent.mock_events import MOCK_EVENTS
+from confee_agent.models import ConnpassEvent, ConnpassEventColumns
+from confee_agent.tools.search_connpass import _parse_event
+
+
+@dataclass
+class LegacyConnpassEvent:
+    """変更前の ConnpassEvent と同じ定義（slots なし）。"""
+
+    id: int
+    title: str
+    catch: str | None
+    description: str | None
+    url: str
+    started_at: str | None
+    ended_at: str | None
+    place: str | None
+    address: str | None
+    accepted: int
+    waiting: int
+    limit: int | None
+    event_type: str
+    open_status: str
+    updated_at: str | None = None
+
+
+def _source_events(n: int) -> list[ConnpassEvent]:
+    # 文字列は MOCK_EVENTS と共有されるため、計測されるのはオブジェクト本体と数値のコストになる
+    return [
+        _parse_event({**MOCK_EVENTS[i % len(MOCK_EVENTS)], "id": 1_000_000 + i})
+        for i in range(n)
+    ]
+
+
+def _measure(build) -> tuple[int, object]:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    obj = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return size, obj
+
+
+def main(n: int) -> None:
+    source = _source_events(n)
+    field_names = ConnpassEvent.__dataclass_fields__.keys()
+
+    legacy_size, _ = _measure(
+        lambda: [
+            LegacyConnpassEvent(**{name: getattr(e, name) for name in field_names})
+            for e in source
+        ]
+    )
+    slotted_size, _ = _measure(
+        lambda: [
+            ConnpassEvent(**{name: getattr(e, name) for name in field_names})
+            for e in source
+        ]
+    )
+    columns_size, _ = _measure(lambda: ConnpassEventColumns.from_events(source))
+
+    print(f"events: {n}")
+    print(f"  legacy dataclass (__dict__): {legacy_size / 1024:10.1f} KiB ({legacy_size / n:6.1f} B/event)")
+    print(f"  slotted frozen dataclass   : {slotted_size / 1024:10.1f} KiB ({slotted_size / n:6.1f} B/event)")
+    print(f"  columnar arrays (+ refs)   : {columns_size / 1024:10.1f} KiB ({columns_size / n:6.1f} B/event)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -0,0 +1,76 @@
+"""ツール結果と Chat Lambda の本文の JSON シリアライズの速度とサイズを、シリアライザごとに比較する。
+
+ツール結果は MOCK_EVENTS を ID を変えて複製したイベントを search_connpass と同じ形式に変換したもの、
+Lambda の本文はそのイベントを紹介する日本語の回答文を想定したもの。
+json (ensure_ascii=True) は変更前の Lambda の本文の出力と同じ設定。
+
+実行方法:
+    uv run python benchmarks/bench_serialization.py [件数] [回数]
+"""
+
+import json
+import statistics
+import sys
+import time
+
+from confee_agent.mock_events import MOCK_EVENTS
+from confee_agent.models import ConnpassSearchResult
+from confee_agent.serialization import OrjsonSerializer, StdlibSerializer
+from confee_agent.tools.search_connpass import _parse_event, _to_tool_result
+
+
+def _tool_result(n: int) -> dict:
+    events = [_parse_event({**MOCK_EVENTS[i % len(MOCK_EVENTS)], "id": 1_000_000 + i}) for i in range(n)]
+    result = ConnpassSearchResult(results_returned=n, results_available=n, results_start=1, events=events)
+    return _to_tool_result(result, ["TypeScript"])
+
+
+def _lambda_body(tool_result: dict) -> dict:
+    lines = [
+        f"- {e['title']}（{e.get('place', 'オンライン')}）: {e.get('catch', '')} {e['url']}"
+        for e in tool_result["events"]
+    ]
+    return {"response": "おすすめのイベントを紹介します。\n" + "\n".join(lines), "session_id": "a" * 33}
+
+
+def _serializers() -> dict:
+    serializers = {
+        "json (ensure_ascii)": lambda obj: json.dumps(obj).encode(),
+        "json": StdlibSerializer().dumps_bytes,
+    }
+    try:
+        serializers["orjson"] = OrjsonSerializer().dumps_bytes
+    except ImportError:
+        print("orjson is not installed, skipping")
+    return serializers
+
+
+def _measure(dumps, payload, rounds: int) -> list[float]:
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        dumps(payload)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main(n: int, rounds: int) -> None:
+    tool_result = _tool_result(n)
+    payloads = {"tool result": tool_result, "lambda body": _lambda_body(tool_result)}
+    print(f"events: {n}, rounds: {rounds}")
+    for label, payload in payloads.items():
+        print(label)
+        for name, dumps in _serializers().items():
+            size = len(dumps(payload))
+            us = sorted(t * 1_000_000 for t in _measure(dumps, payload, rounds))
+            print(
+                f"  {name:<20} size={size:9,d}B mean={statistics.mean(us):9.1f}us "
+                f"p50={us[len(us) // 2]:9.1f}us p95={us[int(len(us) * 0.95) - 1]:9.1f}us"
+            )
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200,
+    )
@@ -0,0 +1,121 @@
+"""Chat Lambda の 1 呼び出しあたりのオーバーヘッドを、クライアント再生成と再利用で比較する。
+
+AgentCore への通信は botocore の Stubber で置き換えるため、ネットワークには接続しない。
+計測されるのはクライアント生成（エンドポイント解決・認証情報の読み込み等）とハンドラ本体のコスト。
+
+実行方法:
+    cd agent/lambda && python benchmarks/bench_client_reuse.py [回数]
+"""
+
+import json
+import os
+import statistics
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "ap-northeast-1")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault(
+    "AGENT_RUNTIME_ARN",
+    "arn:aws:bedrock-agentcore:ap-northeast-1:123456789012:runtime/bench-id",
+)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import boto3  # noqa: E402
+from botocore.response import StreamingBody  # noqa: E402
+from botocore.stub import ANY, Stubber  # noqa: E402
+
+import handler as handler_module  # noqa: E402
+
+EVENT = {
+    "body": json.dumps({"message": "TypeScriptのカンファレンス", "session_id": "a" * 33}),
+    "httpMethod": "POST",
+    "path": "/chat",
+}
+
+
+def _stub_responses(client, n: int) -> Stubber:
+    stubber = Stubber(client)
+    for _ in range(n):
+        raw = json.dumps({"response": "ok"}).encode()
+        stubber.add_response(
+            "invoke_agent_runtime",
+            {
+                "response": StreamingBody(BytesIO(raw), len(raw)),
+                "contentType": "application/json",
+                "statusCode": 200,
+                "runtimeSessionId": "a" * 33,
+            },
+            {"agentRuntimeArn": ANY, "payload": ANY, "runtimeSessionId": ANY},
+        )
+    stubber.activate()
+    return stubber
+
+
+def _stubbed_client_factory(service_name, **kwargs):
+    client = _real_client(service_name, **kwargs)
+    _stub_responses(client, 1)
+    return client
+
+
+_real_client = boto3.client
+
+
+def _measure(n: int) -> list[float]:
+    timings = []
+    for _ in range(n):
+        started = time.perf_counter()
+        response = handler_module.handler(EVENT, None)
+        timings.append(time.perf_counter() - started)
+        assert response["statusCode"] == 200, response
+    return timings
+
+
+def _per_request_client(n: int) -> list[float]:
+    """変更前の挙動: リクエストごとにクライアントを生成する（Stubber の設定も計測に含まれる）。"""
+    original = handler_module._get_agentcore_client
+    handler_module._get_agentcore_client = lambda: _stubbed_client_factory("bedrock-agentcore")
+    try:
+        return _measure(n)
+    finally:
+        handler_module._get_agentcore_client = original
+
+
+def _reused_client(n: int) -> list[float]:
+    """変更後の挙動: 1 回目に生成したクライアントを再利用する。"""
+    handler_module._agentcore_client = None
+    original = handler_module.boto3.client
+
+    def factory(service_name, **kwargs):
+        client = _real_client(service_name, **kwargs)
+        _stub_responses(client, n)
+        return client
+
+    handler_module.boto3.client = factory
+    try:
+        return _measure(n)
+    finally:
+        handler_module.boto3.client = original
+        handler_module._agentcore_client = None
+
+
+def _report(label: str, timings: list[float]) -> None:
+    ms = sorted(t * 1000 for t in timings)
+    print(
+        f"{label:<20} mean={statistics.mean(ms):8.3f}ms "
+        f"p50={ms[len(ms) // 2]:8.3f}ms p95={ms[int(len(ms) * 0.95) - 1]:8.3f}ms"
+    )
+
+
+def main(n: int) -> None:
+    print(f"invocations: {n}")
+    _report("per-request client", _per_request_client(n))
+    # 1 回目（コールドスタート相当）でクライアントを生成し、以降は再利用する
+    _report("reused client", _reused_client(n))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
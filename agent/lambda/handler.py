@@ -2,14 +2,43 @@ import json
 import logging
 import os
 import uuid
+from collections.abc import Iterator
 
 import boto3
+from botocore.config import Config
+
+try:
+    import orjson
+except ImportError:  # orjson は任意。インストールされていれば高速な方を使う
+    orjson = None
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 AGENT_RUNTIME_ARN = os.environ.get("AGENT_RUNTIME_ARN", "")
 
+# Lambda のタイムアウト (60 秒) 内にエラー応答まで返せるよう、接続と読み取りのタイムアウトの合計を 55 秒に収める。
+# エージェントの呼び出しは冪等ではなく、再試行しても Lambda のタイムアウト内に終わらないため再試行しない。
+LAMBDA_TIMEOUT_SECONDS = 60
+CLIENT_CONFIG = Config(
+    connect_timeout=5,
+    read_timeout=50,
+    max_pool_connections=10,
+    tcp_keepalive=True,
+    retries={"total_max_attempts": 1, "mode": "standard"},
+)
+
+# ウォームスタート時はエンドポイント解決・認証情報の読み込み・接続を再利用する
+_agentcore_client = None
+
+
+def _get_agentcore_client():
+    global _agentcore_client
+    if _agentcore_client is None:
+        _agentcore_client = boto3.client("bedrock-agentcore", config=CLIENT_CONFIG)
+    return _agentcore_client
+
+
 CORS_HEADERS = {
     "Content-Type": "application/json",
     "Access-Control-Allow-Origin": "*",
@@ -17,16 +46,59 @@ CORS_HEADERS = {
     "Access-Control-Allow-Methods": "POST,OPTIONS",
 }
 
+STREAM_HEADERS = {
+    **CORS_HEADERS,
+    "Content-Type": "text/event-stream",
+    "Cache-Control": "no-cache",
+}
+
+
+def dumps(data) -> str:
+    """JSON 文字列にする。日本語などの非 ASCII 文字は \\uXXXX にエスケープせず UTF-8 のまま出力する。"""
+    if orjson is not None:
+        return orjson.dumps(data).decode()
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def loads(data: str | bytes):
+    """JSON をパースする。不正な場合は json.JSONDecodeError（orjson の例外もこのサブクラス）を送出する。"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _sse(data: dict) -> str:
+    return f"data: {dumps(data)}\n\n"
+
+
+def relay_stream(response: dict, session_id: str) -> Iterator[str]:
+    """AgentCore Runtime の SSE を 1 イベントずつ読み、クライアント向けの SSE として返す。
+
+    最後に {"done": true, "session_id": ...} を送り、クライアントがセッション ID を引き継げるようにする。
+    """
+    for line in response["response"].iter_lines():
+        line = line.strip()
+        if not line.startswith(b"data:"):
+            continue
+        try:
+            event = loads(line[len(b"data:"):])
+        except json.JSONDecodeError:
+            logger.warning("Skipping malformed stream event: %r", line[:100])
+            continue
+        if isinstance(event, dict):
+            yield _sse(event)
+    yield _sse({"done": True, "session_id": response.get("runtimeSessionId") or session_id})
+
 
 def handler(event, context):
     try:
         body_str = event.get("body") or "{}"
-        body = json.loads(body_str)
+        body = loads(body_str)
     except (json.JSONDecodeError, TypeError):
         return {
             "statusCode": 400,
             "headers": CORS_HEADERS,
-            "body": json.dumps({"error": "Invalid JSON body"}),
+            "body": dumps({"error": "Invalid JSON body"}),
         }
 
     message = body.get("message", "")
@@ -34,27 +106,42 @@ def handler(event, context):
         return {
             "statusCode": 400,
             "headers": CORS_HEADERS,
-            "body": json.dumps({"error": "message is required"}),
+            "body": dumps({"error": "message is required"}),
         }
 
     session_id = body.get("session_id", "")
     if not session_id:
         session_id = f"{uuid.uuid4()}-{uuid.uuid4().hex[:8]}"
 
+    stream = bool(body.get("stream"))
+    payload = {"prompt": message}
+    if stream:
+        payload["stream"] = True
+
     try:
-        client = boto3.client("bedrock-agentcore")
+        client = _get_agentcore_client()
         response = client.invoke_agent_runtime(
             agentRuntimeArn=AGENT_RUNTIME_ARN,
-            payload=json.dumps({"prompt": message}).encode("utf-8"),
+            payload=dumps(payload).encode("utf-8"),
             runtimeSessionId=session_id,
         )
 
-        response_body = json.loads(response["response"].read())
+        if stream and response.get("contentType", "").startswith("text/event-stream"):
+            # Python のマネージドランタイムは Lambda のレスポンスストリーミングに対応していないため、
+            # ここで SSE の本文をすべて受け取ってから返す。ストリーミングは AgentCore のエントリポイントまでで、
+            # ブラウザには応答の全文がまとめて届く（初回トークンまでの時間は短くならない）
+            return {
+                "statusCode": 200,
+                "headers": STREAM_HEADERS,
+                "body": "".join(relay_stream(response, session_id)),
+            }
+
+        response_body = loads(response["response"].read())
 
         return {
             "statusCode": 200,
             "headers": CORS_HEADERS,
-            "body": json.dumps(
+            "body": dumps(
                 {
                     "response": response_body.get("response", ""),
                     "session_id": response.get(
@@ -69,7 +156,7 @@ def handler(event, context):
         return {
             "statusCode": 503,
             "headers": CORS_HEADERS,
-            "body": json.dumps(
+            "body": dumps(
                 {"error": "Service temporarily unavailable"}
             ),
         }
@@ -11,6 +11,15 @@ def setup_env(monkeypatch):
     monkeypatch.setenv("AGENT_RUNTIME_ARN", "arn:aws:bedrock:ap-northeast-1:123456789012:agent-runtime/test-id")
 
 
+@pytest.fixture(autouse=True)
+def reset_agentcore_client(setup_env):
+    import handler as handler_module
+
+    handler_module._agentcore_client = None
+    yield
+    handler_module._agentcore_client = None
+
+
 @pytest.fixture
 def mock_agentcore_client():
     with patch("handler.boto3.client") as mock_client_factory:
@@ -158,7 +167,42 @@ class TestHandlerInvokeAgentRuntime:
             )
             handler(event, None)
 
-            mock_factory.assert_called_with("bedrock-agentcore")
+            import handler as handler_module
+
+            mock_factory.assert_called_with(
+                "bedrock-agentcore", config=handler_module.CLIENT_CONFIG
+            )
+
+    def test_client_does_not_retry_and_fits_lambda_timeout(self):
+        """エージェントの呼び出しは再試行せず、タイムアウトの合計が Lambda のタイムアウトに収まる"""
+        import handler as handler_module
+
+        config = handler_module.CLIENT_CONFIG
+
+        assert config.retries["total_max_attempts"] == 1
+        assert config.connect_timeout + config.read_timeout < handler_module.LAMBDA_TIMEOUT_SECONDS
+
+    def test_reuses_boto3_client_across_invocations(
+        self, mock_agentcore_client
+    ):
+        """ウォームスタート時はクライアントを作り直さない"""
+        with patch("handler.boto3.client") as mock_factory:
+            mock_client = MagicMock()
+            mock_factory.return_value = mock_client
+            mock_client.invoke_agent_runtime.side_effect = lambda **_: (
+                _make_runtime_response("ok")
+            )
+
+            from handler import handler
+
+            event = _make_apigw_event(
+                {"message": "テスト", "session_id": "a" * 33}
+            )
+            handler(event, None)
+            handler(event, None)
+
+            mock_factory.assert_called_once()
+            assert mock_client.invoke_agent_runtime.call_count == 2
 
     def test_returns_response_and_session_id(self, mock_agentcore_client):
         """応答テキストとsession_idを返す"""
@@ -275,3 +319,151 @@ class TestHandlerCorsHeaders:
         response = handler(event, None)
 
         assert response["headers"]["Access-Control-Allow-Origin"] == "*"
+
+
+def _make_stream_response(events: list[dict], session_id: str = "") -> dict:
+    from botocore.response import StreamingBody
+
+    raw = "".join(f"data: {json.dumps(e, ensure_ascii=False)}\n\n" for e in events).encode()
+    return {
+        "response": StreamingBody(BytesIO(raw), len(raw)),
+        "contentType": "text/event-stream",
+        "runtimeSessionId": session_id,
+    }
+
+
+def _parse_sse(body: str) -> list[dict]:
+    return [
+        json.loads(chunk[len("data: "):])
+        for chunk in body.split("\n\n")
+        if chunk.startswith("data: ")
+    ]
+
+
+class TestHandlerStreaming:
+    """ストリーミング応答の中継をテストする"""
+
+    def test_passes_stream_flag_to_agentcore(self, mock_agentcore_client):
+        """stream=true のリクエストはAgentCoreにもstreamを指定する"""
+        from handler import handler
+
+        mock_agentcore_client.invoke_agent_runtime.return_value = (
+            _make_stream_response([{"data": "こんにちは"}])
+        )
+
+        event = _make_apigw_event(
+            {"message": "テスト", "session_id": "a" * 33, "stream": True}
+        )
+        handler(event, None)
+
+        call_args = mock_agentcore_client.invoke_agent_runtime.call_args
+        payload = json.loads(call_args[1]["payload"])
+        assert payload == {"prompt": "テスト", "stream": True}
+
+    def test_relays_events_as_sse(self, mock_agentcore_client):
+        """AgentCoreのイベントをSSEとして中継し、最後にsession_idを送る"""
+        from handler import handler
+
+        mock_agentcore_client.invoke_agent_runtime.return_value = (
+            _make_stream_response(
+                [{"tool": "search_connpass"}, {"data": "おすすめ"}, {"data": "です"}],
+                session_id="runtime-session-" + "x" * 20,
+            )
+        )
+
+        event = _make_apigw_event(
+            {"message": "テスト", "session_id": "a" * 33, "stream": True}
+        )
+        response = handler(event, None)
+
+        assert response["statusCode"] == 200
+        assert response["headers"]["Content-Type"] == "text/event-stream"
+        assert response["headers"]["Access-Control-Allow-Origin"] == "*"
+        assert _parse_sse(response["body"]) == [
+            {"tool": "search_connpass"},
+            {"data": "おすすめ"},
+            {"data": "です"},
+            {"done": True, "session_id": "runtime-session-" + "x" * 20},
+        ]
+
+    def test_skips_malformed_events(self, mock_agentcore_client):
+        """JSONとして読めないイベントは読み飛ばす"""
+        from botocore.response import StreamingBody
+
+        from handler import handler
+
+        raw = b'data: {"data": "A"}\n\ndata: not-json\n\n: keep-alive\n\ndata: {"data": "B"}\n\n'
+        mock_agentcore_client.invoke_agent_runtime.return_value = {
+            "response": StreamingBody(BytesIO(raw), len(raw)),
+            "contentType": "text/event-stream",
+        }
+
+        event = _make_apigw_event(
+            {"message": "テスト", "session_id": "a" * 33, "stream": True}
+        )
+        response = handler(event, None)
+
+        assert [e.get("data") for e in _parse_sse(response["body"])[:-1]] == ["A", "B"]
+
+    def test_falls_back_to_json_when_runtime_does_not_stream(
+        self, mock_agentcore_client
+    ):
+        """AgentCoreがJSONを返した場合は従来どおりJSONで応答する"""
+        from handler import handler
+
+        mock_agentcore_client.invoke_agent_runtime.return_value = (
+            _make_runtime_response("まとめて応答", session_id="s" * 33)
+        )
+
+        event = _make_apigw_event(
+            {"message": "テスト", "session_id": "a" * 33, "stream": True}
+        )
+        response = handler(event, None)
+
+        body = json.loads(response["body"])
+        assert body["response"] == "まとめて応答"
+        assert response["headers"]["Content-Type"] == "application/json"
+
+
+class TestHandlerSerialization:
+    """レスポンス本文の JSON シリアライズをテストする"""
+
+    def test_non_ascii_is_not_escaped(self, mock_agentcore_client):
+        """日本語は \\uXXXX にエスケープせず UTF-8 のまま返す"""
+        from handler import handler
+
+        mock_agentcore_client.invoke_agent_runtime.return_value = (
+            _make_runtime_response("おすすめのイベントです", session_id="s" * 33)
+        )
+
+        response = handler(_make_apigw_event({"message": "テスト", "session_id": "a" * 33}), None)
+
+        assert "おすすめのイベントです" in response["body"]
+        assert "\\u" not in response["body"]
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_same_body_with_or_without_orjson(self, mock_agentcore_client, monkeypatch, use_orjson):
+        """orjson の有無で同じ本文を返す"""
+        import handler as handler_module
+
+        if not use_orjson:
+            monkeypatch.setattr(handler_module, "orjson", None)
+        elif handler_module.orjson is None:
+            pytest.skip("orjson is not installed")
+        mock_agentcore_client.invoke_agent_runtime.return_value = (
+            _make_runtime_response("応答", session_id="s" * 33)
+        )
+
+        response = handler_module.handler(_make_apigw_event({"message": "テスト"}), None)
+
+        assert response["body"] == '{"response":"応答","session_id":"' + "s" * 33 + '"}'
+
+    def test_invalid_json_body_without_orjson(self, monkeypatch):
+        """orjson がなくても不正な JSON は 400 を返す"""
+        import handler as handler_module
+
+        monkeypatch.setattr(handler_module, "orjson", None)
+
+        response = handler_module.handler({"body": "{invalid"}, None)
+
+        assert response["statusCode"] == 400
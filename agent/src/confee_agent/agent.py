@@ -1,7 +1,16 @@
+from collections.abc import AsyncIterator
+
 from strands import Agent
+from strands.hooks import AfterInvocationEvent
 from strands.models import BedrockModel
 
-from confee_agent.tools.search_connpass import search_connpass
+from confee_agent.answer_cache import AnswerCache
+from confee_agent.conversation import BudgetConversationManager, tool_result_event_ids
+from confee_agent.event_index import event_fingerprint
+from confee_agent.suggested_answers import SuggestedAnswerStore
+from confee_agent.tools.http_client import aclose_async_client
+from confee_agent.tools.search_connpass import search_connpass, search_connpass_async
+from confee_agent.tools.search_connpass_multi import search_connpass_multi
 
 SYSTEM_PROMPT = """\
 あなたは技術カンファレンス推薦エージェント「confee」です。
@@ -11,7 +20,7 @@ SYSTEM_PROMPT = """\
 
 1. **必ず日本語で応答**してください。
 2. **必ずsearch_connpassツールを使って**カンファレンス情報を検索し、APIから取得した情報のみを提示してください。自分の知識だけで回答せず、必ずツールを呼び出してください。
-3. あいまいなクエリ（「面白そうな」「おすすめの」等）の場合は、異なるキーワードで複数回検索を行い、幅広い結果から推薦してください。
+3. あいまいなクエリ（「面白そうな」「おすすめの」等）の場合は、**search_connpass_multiツール**で異なるキーワードの検索条件をまとめて1回で検索し、幅広い結果から推薦してください。
 4. 応答はMarkdown形式で構造化し、フロントエンドで見やすく表示されるようにしてください。
 
 ## カンファレンス情報の提示フォーマット
@@ -34,7 +43,7 @@ SYSTEM_PROMPT = """\
 
 ## おすすめ度の基準
 
-以下の基準を総合的に判断し、おすすめ度を付与してください：
+おすすめ度は以下の基準で判定します：
 
 - **★★★（高）**: 以下のうち2つ以上に該当
   - ユーザのクエリに直接マッチするテーマ
@@ -47,6 +56,15 @@ SYSTEM_PROMPT = """\
   - 有名なコミュニティが主催
 - **★☆☆（低）**: 間接的に関連がある、または情報提供として有用
 
+ツールは「ユニークまたは注目度の高いテーマ」「有名なコミュニティが主催」以外の項目で判定した
+`recommendation_level` と、該当した項目 `recommendation_reasons` を返します。基本は `recommendation_level` をそのまま使い、
+次の場合だけ1段階上げてください：
+
+- 「ユニークまたは注目度の高いテーマ」に該当し、`recommendation_reasons` に「クエリに直接一致」「定員の50%以上が申込済み」「2週間以内に開催」のいずれかを含む場合は★★★
+- ★☆☆のイベントが「有名なコミュニティが主催」に該当する場合は★★☆
+
+おすすめ理由には `recommendation_reasons` の内容を踏まえ、イベントの内容に即した具体的な説明を書いてください。
+
 ## イベントステータスの処理
 
 検索結果には申し込み可能なイベント（open/preopen）のみが含まれます（募集終了・キャンセル済みはツール側で自動除外済み）。
@@ -54,6 +72,11 @@ SYSTEM_PROMPT = """\
 - **open**（募集中）: 通常通り提示
 - **preopen**（募集前）: 「🔜 まもなく募集開始」と表記し提示
 
+## 以前の検索結果を使う場合
+
+connpass に接続できない場合、ツールは以前に取得した検索結果に `"stale": true` を付けて返します。
+その結果を提示するときは、最新の情報ではない可能性があることを一言添えてください。
+
 ## 申込期限の注意喚起
 
 - 開催日が **3日以内** のものには「⚠️ まもなく開催！」と強調
@@ -68,33 +91,129 @@ SYSTEM_PROMPT = """\
 
 ## ソート
 
-複数のカンファレンスを提示する場合は、おすすめ度の高い順にソートして提示してください。
-同じおすすめ度の場合は、開催日が近い順に並べてください。
+ツールの検索結果は、おすすめ度の高い順 → 開催日が近い順に並べ替え済みです。基本は返された順序のまま提示し、
+おすすめ度を上げたイベントがある場合だけ、同じ基準（おすすめ度の高い順 → 開催日が近い順）で並べ直してください。
 """
 
 
+def create_model() -> BedrockModel:
+    return BedrockModel(
+        model_id="apac.amazon.nova-micro-v1:0",
+    )
+
+
 class ConfeeAgent:
-    def __init__(self):
+    def __init__(
+        self,
+        async_tools: bool = False,
+        model: BedrockModel | None = None,
+        answer_cache: AnswerCache | None = None,
+        suggested_answers: SuggestedAnswerStore | None = None,
+    ):
+        # True の場合は httpx.AsyncClient ベースのツールを登録し、I/O 待ちでスレッドを占有しない
+        self._async_tools = async_tools
+        # セッションごとの ConfeeAgent で同じモデル（Bedrock クライアント）を共有できるよう外から渡せる
+        self.model = model
+        self._answer_cache = answer_cache
+        self._suggested_answers = suggested_answers
         self._agent = None
+        # 同期の invoke() の実行中かどうか（呼び出しごとのイベントループで作った非同期クライアントを閉じるため）
+        self._sync_invocation = False
 
     def create_agent(self) -> Agent:
-        model = BedrockModel(
-            model_id="apac.amazon.nova-micro-v1:0",
-        )
+        if self.model is None:
+            self.model = create_model()
 
         self._agent = Agent(
-            model=model,
-            tools=[search_connpass],
+            model=self.model,
+            tools=[
+                search_connpass_async if self._async_tools else search_connpass,
+                search_connpass_multi,
+            ],
             system_prompt=SYSTEM_PROMPT,
+            conversation_manager=BudgetConversationManager.from_env(),
         )
+        self._agent.hooks.add_callback(AfterInvocationEvent, self._close_invocation_client)
 
         return self._agent
 
+    async def _close_invocation_client(self, event: AfterInvocationEvent) -> None:
+        """同期の呼び出しで作った非同期 HTTP クライアントを、イベントループの終了前に閉じる。
+
+        Strands は同期の呼び出しを呼び出しごとに新しいイベントループで実行するため、そのループで
+        search_connpass_multi 等が作ったクライアントは閉じないと接続が残り続ける。
+        stream() は呼び出し元の長寿命のループで実行されるため、クライアントを閉じずに使い回す。
+        """
+        if self._sync_invocation:
+            await aclose_async_client()
+
+    def _use_precomputed(self) -> bool:
+        # 会話の文脈に依存しないセッション最初の質問だけを事前生成・キャッシュ済みの回答の対象にする
+        if self._answer_cache is None and self._suggested_answers is None:
+            return False
+        return len(self._agent.messages) == 0
+
+    def _suggested_answer(self, prompt: str) -> str | None:
+        if self._suggested_answers is not None:
+            suggested = self._suggested_answers.lookup(prompt)
+            if suggested is not None:
+                return suggested.text
+        return None
+
+    def _precomputed_answer(self, prompt: str) -> str | None:
+        suggested = self._suggested_answer(prompt)
+        if suggested is not None:
+            return suggested
+        if self._answer_cache is not None:
+            return self._answer_cache.get(prompt)
+        return None
+
+    async def _precomputed_answer_async(self, prompt: str) -> str | None:
+        """_precomputed_answer の非同期版。共有の回答キャッシュ（L2）の読み込みでイベントループを止めない。"""
+        suggested = self._suggested_answer(prompt)
+        if suggested is not None:
+            return suggested
+        if self._answer_cache is not None:
+            return await self._answer_cache.get_async(prompt)
+        return None
+
+    def _used_events(self) -> dict[str, str]:
+        # 回答に使ったイベントの updated_at を添えて、イベントが更新されたら使わないようにする
+        return event_fingerprint(tool_result_event_ids(self._agent.messages))
+
+    def _store_answer(self, prompt: str, answer: str) -> None:
+        if self._answer_cache is not None:
+            self._answer_cache.set(prompt, answer, events=self._used_events())
+
+    async def _store_answer_async(self, prompt: str, answer: str) -> None:
+        if self._answer_cache is not None:
+            await self._answer_cache.set_async(prompt, answer, events=self._used_events())
+
+    def _remember_cached_answer(self, prompt: str, answer: str) -> None:
+        """キャッシュから返した回答を会話履歴に加え、続く質問で文脈として使えるようにする。"""
+        self._agent.messages.extend(
+            [
+                {"role": "user", "content": [{"text": prompt}]},
+                {"role": "assistant", "content": [{"text": answer}]},
+            ]
+        )
+
     def invoke(self, prompt: str) -> dict:
         if self._agent is None:
             raise RuntimeError("Agent not created. Call create_agent() first.")
 
-        result = self._agent(prompt)
+        use_cache = self._use_precomputed()
+        if use_cache:
+            cached = self._precomputed_answer(prompt)
+            if cached is not None:
+                self._remember_cached_answer(prompt, cached)
+                return {"response": cached}
+
+        self._sync_invocation = True
+        try:
+            result = self._agent(prompt)
+        finally:
+            self._sync_invocation = False
 
         # result.message は {"role": "assistant", "content": [{"text": "..."}]} 形式
         # テキスト部分のみ抽出して返す
@@ -109,6 +228,41 @@ class ConfeeAgent:
         else:
             response_text = str(message)
 
+        if use_cache:
+            self._store_answer(prompt, response_text)
         return {
             "response": response_text,
         }
+
+    async def stream(self, prompt: str) -> AsyncIterator[dict]:
+        """Strands のストリームイベントのうち、クライアントに必要なものだけを JSON 化可能な形で返す。
+
+        - {"data": "..."}: 応答テキストの差分
+        - {"tool": "search_connpass"}: ツール呼び出しの開始（同じツール呼び出しにつき 1 回）
+        """
+        if self._agent is None:
+            raise RuntimeError("Agent not created. Call create_agent() first.")
+
+        use_cache = self._use_precomputed()
+        if use_cache:
+            cached = await self._precomputed_answer_async(prompt)
+            if cached is not None:
+                self._remember_cached_answer(prompt, cached)
+                yield {"data": cached}
+                return
+
+        announced: set[str] = set()
+        chunks: list[str] = []
+        async for event in self._agent.stream_async(prompt):
+            if "data" in event:
+                chunks.append(event["data"])
+                yield {"data": event["data"]}
+            elif "current_tool_use" in event:
+                tool_use = event["current_tool_use"] or {}
+                tool_use_id = tool_use.get("toolUseId")
+                if tool_use_id and tool_use_id not in announced:
+                    announced.add(tool_use_id)
+                    yield {"tool": tool_use.get("name", "")}
+
+        if use_cache:
+            await self._store_answer_async(prompt, "".join(chunks))
@@ -0,0 +1,279 @@
+import asyncio
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+
+from confee_agent.config import env_float, env_int
+from confee_agent.event_index import JST, current_version, events_changed
+from confee_agent.shared_cache import CacheBackend, decode_payload, encode_payload, get_backend, shared_key
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 600.0
+DEFAULT_MAX_ENTRIES = 256
+# 0 で完全一致（正規化後）のみ。0 より大きい場合は文字 bigram の Jaccard 係数がこの値以上なら同じ質問とみなす
+DEFAULT_SIMILARITY = 0.0
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9.+#_-]*")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """全角半角・大文字小文字を揃え、空白と句読点・記号を除く。"""
+    text = unicodedata.normalize("NFKC", prompt).casefold()
+    return "".join(ch for ch in text if not ch.isspace() and not unicodedata.category(ch).startswith("P"))
+
+
+def _bigrams(text: str) -> frozenset[str]:
+    if len(text) < 2:
+        return frozenset({text}) if text else frozenset()
+    return frozenset(text[i : i + 2] for i in range(len(text) - 1))
+
+
+def _jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass
+class _Answer:
+    grams: frozenset[str]
+    # 英数字の語（TypeScript, 2026 等）。近い質問でも検索語が違えば別の質問として扱う
+    words: frozenset[str]
+    text: str
+    version: str | None
+    expires_at: float
+    # 回答に使ったイベントの ID → updated_at
+    events: dict[str, str]
+
+
+@dataclass(frozen=True, slots=True)
+class _Query:
+    key: tuple[str, str]
+    normalized: str
+    now: float
+    version: str | None
+
+
+class AnswerCache:
+    """エージェントの回答をプロンプト単位で再利用するキャッシュ（スレッドセーフ）。
+
+    キーは正規化したプロンプトと日付（JST）。「今月」「来週」など日付に依存する質問を翌日に使い回さないため。
+    回答時点のイベントインデックスの version と、回答に使ったイベントの updated_at を保持し、
+    イベントが変わったエントリは使わない。インデックスの再構築が無効な場合は後者だけで判定する。
+    回答後に追加されたイベントは検出できないため、それは TTL の範囲で許容する。
+    l2 を指定すると完全一致の回答を他のインスタンスと共有する（類似一致はプロセス内のエントリのみ）。
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        similarity: float = DEFAULT_SIMILARITY,
+        clock: Callable[[], float] = time.monotonic,
+        today: Callable[[], str] = lambda: datetime.now(JST).strftime("%Y%m%d"),
+        version: Callable[[], str | None] = current_version,
+        changed: Callable[[dict[str, str]], bool] = events_changed,
+        l2: CacheBackend | None = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.similarity = similarity
+        self._clock = clock
+        self._today = today
+        self._version = version
+        self._changed = changed
+        self.l2 = l2
+        self._entries: OrderedDict[tuple[str, str], _Answer] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._shared_hits = 0
+        self._similar_hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    @classmethod
+    def from_env(cls) -> "AnswerCache":
+        return cls(
+            ttl_seconds=env_float("CONFEE_ANSWER_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS),
+            max_entries=env_int("CONFEE_ANSWER_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES),
+            similarity=env_float("CONFEE_ANSWER_CACHE_SIMILARITY", DEFAULT_SIMILARITY),
+            l2=get_backend(),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def _usable(self, key: tuple[str, str], entry: _Answer, now: float, version: str | None) -> bool:
+        if entry.expires_at <= now or entry.version != version or self._changed(entry.events):
+            del self._entries[key]
+            self._invalidations += 1
+            return False
+        return True
+
+    def get(self, prompt: str) -> str | None:
+        query = self._query(prompt)
+        if query is None:
+            return None
+        text = self._get_local(query)
+        if text is not None:
+            return text
+        # L2 の読み込みは通信を伴うため、ロックの外で行う
+        return self._get_rest(query, self._get_shared(query.key, query.version))
+
+    async def get_async(self, prompt: str) -> str | None:
+        """get の非同期版。L2 の読み込みはスレッドで行い、イベントループを止めない。"""
+        query = self._query(prompt)
+        if query is None:
+            return None
+        text = self._get_local(query)
+        if text is not None:
+            return text
+        shared = await asyncio.to_thread(self._get_shared, query.key, query.version) if self.l2 is not None else None
+        return self._get_rest(query, shared)
+
+    def _query(self, prompt: str) -> _Query | None:
+        if not self.enabled:
+            return None
+        normalized = normalize_prompt(prompt)
+        return _Query((self._today(), normalized), normalized, self._clock(), self._version())
+
+    def _get_local(self, query: _Query) -> str | None:
+        with self._lock:
+            entry = self._entries.get(query.key)
+            if entry is not None and self._usable(query.key, entry, query.now, query.version):
+                self._entries.move_to_end(query.key)
+                self._hits += 1
+                return entry.text
+        return None
+
+    def _get_rest(self, query: _Query, shared: tuple[str, dict[str, str]] | None) -> str | None:
+        """L2 の結果を反映し、なければ類似の質問を探す。"""
+        with self._lock:
+            if shared is not None:
+                text, events = shared
+                self._store_locked(query.key, query.normalized, text, query.version, query.now, events)
+                self._shared_hits += 1
+                return text
+
+            if self.similarity > 0:
+                found = self._find_similar(query.key[0], query.normalized, query.now, query.version)
+                if found is not None:
+                    self._similar_hits += 1
+                    return found
+
+            self._misses += 1
+            return None
+
+    def _get_shared(self, key: tuple[str, str], version: str | None) -> tuple[str, dict[str, str]] | None:
+        if self.l2 is None:
+            return None
+        try:
+            data = self.l2.get(shared_key("answer", key))
+            payload = decode_payload(data) if data is not None else None
+        except Exception as e:
+            logger.warning("Shared answer cache read failed: %s", e)
+            return None
+        if not payload or payload.get("version") != version:
+            return None
+        events = payload.get("events") or {}
+        if self._changed(events):
+            return None
+        return payload["text"], events
+
+    def _store_locked(
+        self,
+        key: tuple[str, str],
+        normalized: str,
+        text: str,
+        version: str | None,
+        now: float,
+        events: dict[str, str],
+    ) -> None:
+        self._entries[key] = _Answer(
+            grams=_bigrams(normalized),
+            words=frozenset(_WORD_RE.findall(normalized)),
+            text=text,
+            version=version,
+            expires_at=now + self.ttl_seconds,
+            events=events,
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _find_similar(self, bucket: str, normalized: str, now: float, version: str | None) -> str | None:
+        grams = _bigrams(normalized)
+        words = frozenset(_WORD_RE.findall(normalized))
+        best_key, best_score = None, self.similarity
+        for key, entry in list(self._entries.items()):
+            if key[0] != bucket or entry.words != words:
+                continue
+            if not self._usable(key, entry, now, version):
+                continue
+            score = _jaccard(grams, entry.grams)
+            if score >= best_score:
+                best_key, best_score = key, score
+        if best_key is None:
+            return None
+        self._entries.move_to_end(best_key)
+        return self._entries[best_key].text
+
+    def set(self, prompt: str, text: str, events: dict[str, str] | None = None) -> None:
+        """回答を保存する。events は回答に使ったイベントの ID → updated_at（event_fingerprint() の戻り値）。"""
+        shared = self._set_local(prompt, text, events)
+        if shared is not None:
+            self._set_shared(*shared)
+
+    async def set_async(self, prompt: str, text: str, events: dict[str, str] | None = None) -> None:
+        """set の非同期版。L2 への書き込みはスレッドで行い、イベントループを止めない。"""
+        shared = self._set_local(prompt, text, events)
+        if shared is not None:
+            await asyncio.to_thread(self._set_shared, *shared)
+
+    def _set_local(
+        self, prompt: str, text: str, events: dict[str, str] | None
+    ) -> tuple[tuple[str, str], dict] | None:
+        """プロセス内に保存し、L2 に書き込む (キー, ペイロード) を返す（L2 がなければ None）。"""
+        if not self.enabled or not text:
+            return None
+        normalized = normalize_prompt(prompt)
+        if not normalized:
+            return None
+        key = (self._today(), normalized)
+        version = self._version()
+        events = events or {}
+        with self._lock:
+            self._store_locked(key, normalized, text, version, self._clock(), events)
+        if self.l2 is None:
+            return None
+        return key, {"text": text, "version": version, "events": events}
+
+    def _set_shared(self, key: tuple[str, str], payload: dict) -> None:
+        try:
+            self.l2.set(shared_key("answer", key), encode_payload(payload), self.ttl_seconds)
+        except Exception as e:
+            logger.warning("Shared answer cache write failed: %s", e)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._shared_hits = self._similar_hits = self._misses = self._invalidations = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "shared_hits": self._shared_hits,
+                "similar_hits": self._similar_hits,
+                "misses": self._misses,
+                "invalidations": self._invalidations,
+                "entries": len(self._entries),
+            }
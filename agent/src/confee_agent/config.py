@@ -0,0 +1,30 @@
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def env_int(name: str, default: int) -> int:
+    """環境変数を int として読み込む。未設定・不正値の場合はデフォルト値を返す。"""
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        logger.warning("Invalid value for %s, using default %s", name, default)
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    """環境変数を float として読み込む。未設定・不正値の場合はデフォルト値を返す。"""
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        logger.warning("Invalid value for %s, using default %s", name, default)
+        return default
+
+
+def env_bool(name: str, default: bool = False) -> bool:
+    """環境変数を bool として読み込む（"1", "true", "yes", "on" を真とみなす）。"""
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
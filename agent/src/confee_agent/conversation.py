@@ -0,0 +1,219 @@
+import logging
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, Any
+
+from strands.agent.conversation_manager import ConversationManager
+from strands.types.exceptions import ContextWindowOverflowException
+
+from confee_agent.config import env_bool, env_int
+from confee_agent.serialization import loads
+from confee_agent.tools.result_format import estimate_tokens, truncate
+
+if TYPE_CHECKING:
+    from strands import Agent
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_TOKENS = 8000
+DEFAULT_KEEP_RECENT_TURNS = 1
+DEFAULT_SUMMARY_MAX_CHARS = 1200
+
+COMPACTED_PREFIX = "[省略済みの検索結果]"
+SUMMARY_PREFIX = "[これまでの会話の要約]"
+
+_TITLE_MAX_CHARS = 40
+_ANSWER_MAX_CHARS = 120
+
+
+def _message_tokens(message: dict) -> int:
+    return estimate_tokens(message.get("content", []))
+
+
+def _is_turn_start(message: dict) -> bool:
+    """ユーザの発話（ツール結果ではない user メッセージ）かどうか。"""
+    if message.get("role") != "user":
+        return False
+    content = message.get("content", [])
+    return any("text" in block for block in content) and not any("toolResult" in block for block in content)
+
+
+def _turn_starts(messages: list[dict]) -> list[int]:
+    return [i for i, message in enumerate(messages) if _is_turn_start(message)]
+
+
+def _tool_result_events(tool_result: dict) -> Iterator[dict]:
+    """ツール結果（search_connpass / search_connpass_multi）に含まれるイベントを返す。"""
+    for block in tool_result.get("content", []):
+        if "json" in block:
+            payload = block["json"]
+        elif "text" in block:
+            try:
+                payload = loads(block["text"])
+            except (TypeError, ValueError):
+                continue
+        else:
+            continue
+        if not isinstance(payload, dict):
+            continue
+        for event in payload.get("events", []):
+            if isinstance(event, dict) and "id" in event:
+                yield event
+
+
+def _event_refs(tool_result: dict) -> list[str]:
+    refs = []
+    for event in _tool_result_events(tool_result):
+        title = truncate(str(event.get("title", "")), _TITLE_MAX_CHARS)
+        refs.append(f"{event['id']}「{title}」" if title else str(event["id"]))
+    return refs
+
+
+def tool_result_event_ids(messages: list[dict]) -> list[int]:
+    """会話履歴のツール結果に含まれるイベントの ID を、重複を除いて返す（回答に使ったイベントの特定用）。"""
+    ids: dict[int, None] = {}
+    for message in messages:
+        for block in message.get("content", []):
+            if "toolResult" in block:
+                for event in _tool_result_events(block["toolResult"]):
+                    ids[event["id"]] = None
+    return list(ids)
+
+
+def compact_tool_result(tool_result: dict) -> dict | None:
+    """ツール結果をイベント ID（とタイトル）の参照に置き換えたものを返す。圧縮済みなら None。"""
+    content = tool_result.get("content", [])
+    if content and content[0].get("text", "").startswith(COMPACTED_PREFIX):
+        return None
+    refs = _event_refs(tool_result)
+    if refs:
+        text = f"{COMPACTED_PREFIX} イベント: {', '.join(refs)}（詳細が必要な場合は再検索してください）"
+    else:
+        text = f"{COMPACTED_PREFIX} 結果は省略されました"
+    return {**tool_result, "content": [{"text": text}]}
+
+
+def _first_text(message: dict) -> str:
+    for block in message.get("content", []):
+        text = block.get("text")
+        if text and not text.startswith(SUMMARY_PREFIX):
+            return " ".join(text.split())
+    return ""
+
+
+def summarize_turns(messages: list[dict], max_chars: int = DEFAULT_SUMMARY_MAX_CHARS) -> str:
+    """破棄する会話を、質問と回答の冒頭だけを並べた要約にする（LLM は呼ばない）。
+
+    既存の要約が含まれていれば引き継ぎ、max_chars を超える場合は古い方から削る。
+    """
+    lines = []
+    for message in messages:
+        for block in message.get("content", []):
+            text = block.get("text", "")
+            if text.startswith(SUMMARY_PREFIX):
+                lines.extend(line for line in text[len(SUMMARY_PREFIX):].strip().splitlines() if line)
+        if _is_turn_start(message):
+            lines.append(f"- Q: {truncate(_first_text(message), _ANSWER_MAX_CHARS)}")
+        elif message.get("role") == "assistant":
+            answer = _first_text(message)
+            if answer:
+                lines.append(f"  A: {truncate(answer, _ANSWER_MAX_CHARS)}")
+
+    while lines and sum(len(line) + 1 for line in lines) > max_chars:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+class BudgetConversationManager(ConversationManager):
+    """会話履歴をトークン予算内に収める conversation manager。
+
+    1. 直近 keep_recent_turns 件より前のターンのツール結果を、イベント ID の参照に圧縮する
+    2. それでも max_tokens を超える場合は古いターンから破棄し、summarize が有効なら要約を残す
+    要約は残った最初のユーザ発話の先頭に付けるため、user / assistant の交互の並びは崩れない。
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        keep_recent_turns: int = DEFAULT_KEEP_RECENT_TURNS,
+        summarize: bool = True,
+        summary_max_chars: int = DEFAULT_SUMMARY_MAX_CHARS,
+    ):
+        super().__init__()
+        self.max_tokens = max_tokens
+        self.keep_recent_turns = max(keep_recent_turns, 0)
+        self.summarize = summarize
+        self.summary_max_chars = summary_max_chars
+
+    @classmethod
+    def from_env(cls) -> "BudgetConversationManager":
+        return cls(
+            max_tokens=env_int("CONFEE_HISTORY_TOKEN_BUDGET", DEFAULT_MAX_TOKENS),
+            keep_recent_turns=env_int("CONFEE_HISTORY_KEEP_TURNS", DEFAULT_KEEP_RECENT_TURNS),
+            summarize=env_bool("CONFEE_HISTORY_SUMMARY", True),
+        )
+
+    def get_state(self) -> dict[str, Any]:
+        state = super().get_state()
+        state["max_tokens"] = self.max_tokens
+        return state
+
+    def _compact(self, messages: list[dict], end: int) -> int:
+        compacted = 0
+        for message in messages[:end]:
+            content = message.get("content", [])
+            for i, block in enumerate(content):
+                if "toolResult" in block:
+                    replaced = compact_tool_result(block["toolResult"])
+                    if replaced is not None:
+                        content[i] = {"toolResult": replaced}
+                        compacted += 1
+        return compacted
+
+    def _drop_oldest_turns(self, messages: list[dict], keep_from: int, force: bool = False) -> int:
+        """keep_from より前のターンを、予算に収まるまで（force なら全て）古い順に破棄する。"""
+        starts = [i for i in _turn_starts(messages) if 0 < i <= keep_from]
+        total = sum(_message_tokens(m) for m in messages)
+        cut = 0
+        for start in starts:
+            if total <= self.max_tokens and not force:
+                break
+            total -= sum(_message_tokens(m) for m in messages[cut:start])
+            cut = start
+        if cut == 0:
+            return 0
+
+        dropped = messages[:cut]
+        del messages[:cut]
+        self.removed_message_count += cut
+        if self.summarize:
+            summary = summarize_turns(dropped, self.summary_max_chars)
+            if summary:
+                messages[0]["content"].insert(0, {"text": f"{SUMMARY_PREFIX}\n{summary}"})
+        return cut
+
+    def apply_management(self, agent: "Agent", **kwargs: Any) -> None:
+        messages = agent.messages
+        if self.max_tokens <= 0 or not messages:
+            return
+        starts = _turn_starts(messages)
+        if self.keep_recent_turns == 0:
+            keep_from = len(messages)
+        elif len(starts) >= self.keep_recent_turns:
+            keep_from = starts[-self.keep_recent_turns]
+        else:
+            keep_from = 0
+        compacted = self._compact(messages, keep_from)
+        dropped = 0
+        if sum(_message_tokens(m) for m in messages) > self.max_tokens:
+            dropped = self._drop_oldest_turns(messages, keep_from)
+        if compacted or dropped:
+            logger.info("Conversation history managed: compacted %d tool results, dropped %d messages", compacted, dropped)
+
+    def reduce_context(self, agent: "Agent", e: Exception | None = None, **kwargs: Any) -> None:
+        """コンテキスト長超過時は直近のターンを含めて圧縮し、最新のターン以外を破棄する。"""
+        messages = agent.messages
+        compacted = self._compact(messages, len(messages))
+        starts = _turn_starts(messages)
+        dropped = self._drop_oldest_turns(messages, starts[-1], force=e is not None) if starts else 0
+        if not compacted and not dropped and e is not None:
+            raise ContextWindowOverflowException("Unable to reduce conversation history further") from e
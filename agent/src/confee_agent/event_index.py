@@ -0,0 +1,376 @@
+import bisect
+import hashlib
+import logging
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from confee_agent.models import MISSING, ConnpassEvent, ConnpassSearchResult, parse_epoch
+from confee_agent.ngram_index import NgramIndex
+from confee_agent.tools.result_format import strip_html
+
+logger = logging.getLogger(__name__)
+
+JST = timezone(timedelta(hours=9))
+
+DEFAULT_REFRESH_SECONDS = 600.0
+DEFAULT_MAX_AGE_SECONDS = 1800.0
+DEFAULT_MONTHS_AHEAD = 3
+DEFAULT_MAX_TRACKED_EVENTS = 20000
+
+# 住所の先頭から connpass の都道府県コードを判定するための対応表
+PREFECTURE_CODES = {
+    "北海道": "hokkaido", "青森県": "aomori", "岩手県": "iwate", "宮城県": "miyagi",
+    "秋田県": "akita", "山形県": "yamagata", "福島県": "fukushima", "茨城県": "ibaraki",
+    "栃木県": "tochigi", "群馬県": "gunma", "埼玉県": "saitama", "千葉県": "chiba",
+    "東京都": "tokyo", "神奈川県": "kanagawa", "新潟県": "niigata", "富山県": "toyama",
+    "石川県": "ishikawa", "福井県": "fukui", "山梨県": "yamanashi", "長野県": "nagano",
+    "岐阜県": "gifu", "静岡県": "shizuoka", "愛知県": "aichi", "三重県": "mie",
+    "滋賀県": "shiga", "京都府": "kyoto", "大阪府": "osaka", "兵庫県": "hyogo",
+    "奈良県": "nara", "和歌山県": "wakayama", "鳥取県": "tottori", "島根県": "shimane",
+    "岡山県": "okayama", "広島県": "hiroshima", "山口県": "yamaguchi", "徳島県": "tokushima",
+    "香川県": "kagawa", "愛媛県": "ehime", "高知県": "kochi", "福岡県": "fukuoka",
+    "佐賀県": "saga", "長崎県": "nagasaki", "熊本県": "kumamoto", "大分県": "oita",
+    "宮崎県": "miyazaki", "鹿児島県": "kagoshima", "沖縄県": "okinawa",
+}
+ONLINE = "online"
+
+
+def normalize_text(text: str) -> str:
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+def prefecture_of(event: ConnpassEvent) -> str | None:
+    """イベントの住所・会場から connpass の都道府県コードを推定する。"""
+    if event.address:
+        address = event.address.strip()
+        for name, code in PREFECTURE_CODES.items():
+            if address.startswith(name):
+                return code
+        return None
+    if event.place and ("オンライン" in event.place or "online" in event.place.casefold()):
+        return ONLINE
+    return None
+
+
+def _split(value: str) -> list[str]:
+    return [item for item in (normalize_text(v).strip() for v in value.split(",")) if item]
+
+
+def _month_range(ym: str) -> tuple[int, int]:
+    start = datetime(int(ym[:4]), int(ym[4:6]), 1, tzinfo=JST)
+    end = datetime(start.year + start.month // 12, start.month % 12 + 1, 1, tzinfo=JST)
+    return int(start.timestamp()), int(end.timestamp())
+
+
+def _day_range(ymd: str) -> tuple[int, int]:
+    start = datetime(int(ymd[:4]), int(ymd[4:6]), int(ymd[6:8]), tzinfo=JST)
+    return int(start.timestamp()), int((start + timedelta(days=1)).timestamp())
+
+
+def _valid_ymd(ymd: str) -> bool:
+    if len(ymd) != 8 or not ymd.isdigit():
+        return False
+    try:
+        _day_range(ymd)
+    except ValueError:
+        return False
+    return True
+
+
+def upcoming_months(months: int, now: datetime | None = None) -> list[str]:
+    """今月から months か月分の yyyymm を返す。"""
+    now = now or datetime.now(JST)
+    year, month = now.year, now.month
+    result = []
+    for _ in range(months):
+        result.append(f"{year:04d}{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return result
+
+
+class EventIndex:
+    """事前取得したイベントをプロセス内で検索するためのインデックス。
+
+    タイトル・キャッチ・概要・住所の文字 n-gram 転置インデックスと、開催日時・都道府県の副インデックスを持つ。
+    インデックスの対象範囲（月・都道府県）外の検索には None を返し、呼び出し側で API にフォールバックする。
+    """
+
+    def __init__(
+        self,
+        events: list[ConnpassEvent],
+        months: set[str],
+        prefectures: set[str] | None = None,
+        built_at: float | None = None,
+        ngram: int = 2,
+    ):
+        self.months = set(months)
+        self.prefectures = set(prefectures) if prefectures else None
+        self.built_at = time.monotonic() if built_at is None else built_at
+
+        unique: dict[int, ConnpassEvent] = {}
+        for event in events:
+            unique[event.id] = event
+        self._events = list(unique.values())
+
+        texts: list[str] = []
+        self._by_prefecture: dict[str, list[int]] = {}
+        for doc_id, event in enumerate(self._events):
+            texts.append(
+                normalize_text(
+                    "\n".join(
+                        part
+                        for part in (event.title, event.catch, strip_html(event.description or ""), event.address)
+                        if part
+                    )
+                )
+            )
+            prefecture = prefecture_of(event)
+            if prefecture:
+                self._by_prefecture.setdefault(prefecture, []).append(doc_id)
+
+        self._text_index = NgramIndex(texts, n=ngram)
+
+        # イベントの追加・削除・更新を検出するための指紋（回答キャッシュの無効化に使う）
+        digest = hashlib.blake2b(digest_size=8)
+        for event in sorted(self._events, key=lambda e: e.id):
+            digest.update(f"{event.id}:{event.updated_at or ''}\n".encode())
+        self.version = digest.hexdigest()
+
+        self._started_at = [parse_epoch(e.started_at) for e in self._events]
+        self._updated_at = [parse_epoch(e.updated_at) for e in self._events]
+        self._started_order = sorted(
+            (doc_id for doc_id, t in enumerate(self._started_at) if t != MISSING),
+            key=self._started_at.__getitem__,
+        )
+        self._started_keys = [self._started_at[doc_id] for doc_id in self._started_order]
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def age(self) -> float:
+        return time.monotonic() - self.built_at
+
+    def covers(self, ym: str = "", ymd: str = "", prefecture: str = "") -> bool:
+        """検索条件がインデックスの対象範囲に収まるかを判定する。
+
+        インデックスは対象の月・都道府県のイベントしか持たないため、開催月・開催日の指定がない検索や、
+        都道府県を絞ったインデックスに対する都道府県の指定がない（全国の）検索は対象外とする。
+        不正な日付も対象外とし、API 側でエラーにする。
+        """
+        months, days = _split(ym), _split(ymd)
+        if not months and not days:
+            return False
+        if any(value not in self.months for value in months):
+            return False
+        if any(value[:6] not in self.months or not _valid_ymd(value) for value in days):
+            return False
+        if self.prefectures is not None:
+            if not prefecture or not set(_split(prefecture)) <= self.prefectures:
+                return False
+        return True
+
+    def _date_filter(self, ranges: list[tuple[int, int]]) -> set[int]:
+        matched: set[int] = set()
+        for start, end in ranges:
+            lo = bisect.bisect_left(self._started_keys, start)
+            hi = bisect.bisect_left(self._started_keys, end)
+            matched.update(self._started_order[lo:hi])
+        return matched
+
+    def search(
+        self,
+        keyword: str = "",
+        keyword_or: str = "",
+        ym: str = "",
+        ymd: str = "",
+        prefecture: str = "",
+        order: int = 1,
+        start: int = 1,
+        count: int = 10,
+    ) -> ConnpassSearchResult | None:
+        """connpass API と同じ条件でインデックスを検索する。対象範囲外なら None を返す。"""
+        if not self.covers(ym=ym, ymd=ymd, prefecture=prefecture):
+            return None
+
+        matched = set(self._text_index.search(all_of=_split(keyword), any_of=_split(keyword_or)))
+        date_ranges = [_month_range(v) for v in _split(ym)] + [_day_range(v) for v in _split(ymd)]
+        if date_ranges:
+            matched &= self._date_filter(date_ranges)
+        if prefecture:
+            in_prefectures: set[int] = set()
+            for code in _split(prefecture):
+                in_prefectures.update(self._by_prefecture.get(code, ()))
+            matched &= in_prefectures
+
+        # 1=更新日時降順, 2=開催日時降順, 3=新着順（ID の降順で近似）
+        if order == 2:
+            ordered = sorted(matched, key=lambda i: self._started_at[i], reverse=True)
+        elif order == 3:
+            ordered = sorted(matched, key=lambda i: self._events[i].id, reverse=True)
+        else:
+            ordered = sorted(matched, key=lambda i: self._updated_at[i], reverse=True)
+
+        page = [self._events[i] for i in ordered[max(start, 1) - 1 : max(start, 1) - 1 + count]]
+        return ConnpassSearchResult(
+            results_returned=len(page),
+            results_available=len(ordered),
+            results_start=start,
+            events=page,
+        )
+
+
+_current_index: EventIndex | None = None
+
+
+def publish_index(index: EventIndex | None) -> None:
+    global _current_index
+    _current_index = index
+    if index is not None:
+        record_events(index._events)
+
+
+def current_index(max_age: float) -> EventIndex | None:
+    """max_age 秒以内に構築されたインデックスがあれば返す。"""
+    index = _current_index
+    if index is None or index.age() > max_age:
+        return None
+    return index
+
+
+def current_version() -> str | None:
+    """公開中のインデックスの version を返す。インデックスがなければ None。"""
+    index = _current_index
+    return index.version if index is not None else None
+
+
+class EventVersions:
+    """検索で取得したイベントの updated_at を ID ごとに覚えておく（スレッドセーフ）。
+
+    回答キャッシュは回答に使ったイベントの updated_at を保存しておき、その後の検索で
+    いずれかのイベントの更新を観測したら回答を使わない。インデックスの再構築が無効でも働く。
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_TRACKED_EVENTS):
+        self.max_entries = max_entries
+        self._updated_at: OrderedDict[int, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, events: Iterable[ConnpassEvent]) -> None:
+        with self._lock:
+            for event in events:
+                self._updated_at[event.id] = event.updated_at or ""
+                self._updated_at.move_to_end(event.id)
+            while len(self._updated_at) > self.max_entries:
+                self._updated_at.popitem(last=False)
+
+    def fingerprint(self, event_ids: Iterable[int]) -> dict[str, str]:
+        """イベント ID → updated_at の対応を返す（JSON で共有できるよう ID は文字列にする）。"""
+        with self._lock:
+            return {str(i): self._updated_at[i] for i in event_ids if i in self._updated_at}
+
+    def changed(self, fingerprint: dict[str, str]) -> bool:
+        """fingerprint の作成後に更新されたイベントがあれば True。観測していないイベントは変更なしとみなす。"""
+        with self._lock:
+            for event_id, updated_at in fingerprint.items():
+                current = self._updated_at.get(int(event_id))
+                if current is not None and current != updated_at:
+                    return True
+            return False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._updated_at.clear()
+
+
+_event_versions = EventVersions()
+
+
+def record_events(events: Iterable[ConnpassEvent]) -> None:
+    _event_versions.record(events)
+
+
+def event_fingerprint(event_ids: Iterable[int]) -> dict[str, str]:
+    return _event_versions.fingerprint(event_ids)
+
+
+def events_changed(fingerprint: dict[str, str]) -> bool:
+    return _event_versions.changed(fingerprint)
+
+
+class EventIndexRefresher:
+    """開催予定のイベントを定期的に取得してインデックスを再構築するバックグラウンドスレッド。"""
+
+    def __init__(
+        self,
+        fetch: Callable[[str, str], ConnpassSearchResult | dict],
+        interval_seconds: float = DEFAULT_REFRESH_SECONDS,
+        months_ahead: int = DEFAULT_MONTHS_AHEAD,
+        prefectures: list[str] | None = None,
+        ngram: int = 2,
+    ):
+        self._fetch = fetch
+        self.ngram = ngram
+        self.interval_seconds = interval_seconds
+        self.months_ahead = months_ahead
+        self.prefectures = prefectures or []
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def refresh_once(self) -> EventIndex | None:
+        """全対象（月 × 都道府県）を取得し、すべて成功した場合のみインデックスを差し替える。"""
+        started = time.monotonic()
+        months = upcoming_months(self.months_ahead)
+        events: list[ConnpassEvent] = []
+        for ym in months:
+            for prefecture in self.prefectures or [""]:
+                result = self._fetch(ym, prefecture)
+                if isinstance(result, dict):
+                    logger.warning(
+                        "Event index refresh failed (ym=%s, prefecture=%s): %s",
+                        ym,
+                        prefecture,
+                        result.get("message"),
+                    )
+                    return None
+                events.extend(result.events)
+
+        index = EventIndex(
+            events,
+            months=set(months),
+            prefectures=set(self.prefectures) or None,
+            ngram=self.ngram,
+        )
+        publish_index(index)
+        logger.info(
+            "Event index refreshed: %d events, months=%s, took %.2fs",
+            len(index),
+            ",".join(months),
+            time.monotonic() - started,
+        )
+        return index
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh_once()
+            except Exception as e:
+                logger.error("Event index refresh raised: %s", e, exc_info=True)
+            self._stop.wait(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="event-index-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
@@ -1,9 +1,57 @@
+import time
+
+# コールドスタート時間の起点（重いモジュールの import より前に記録する）
+_PROCESS_STARTED = time.perf_counter()
+
+from confee_agent import startup_profiler
+from confee_agent.config import env_bool, env_float, env_int
+
+if env_bool("CONFEE_PROFILE_STARTUP"):
+    startup_profiler.start()
+
+import importlib
+import json
 import logging
+import os
+import threading
 import traceback
+from typing import TYPE_CHECKING
 
 from bedrock_agentcore.runtime import BedrockAgentCoreApp
 
-from confee_agent.agent import ConfeeAgent
+from confee_agent.answer_cache import AnswerCache
+from confee_agent.event_index import (
+    DEFAULT_MONTHS_AHEAD,
+    EventIndexRefresher,
+)
+from confee_agent.metrics import emit_metrics
+from confee_agent.sessions import DEFAULT_SESSION_ID, SessionRegistry
+from confee_agent.suggested_answers import SuggestedAnswerStore
+
+if TYPE_CHECKING:
+    from confee_agent.agent import ConfeeAgent
+
+# /ping への応答に不要な重いモジュール（strands のエージェント・ツール、httpx）。
+# CONFEE_LAZY_IMPORTS が有効な場合は初回利用時まで import を遅らせる。
+_DEFERRED_IMPORTS = {
+    "ConfeeAgent": ("confee_agent.agent", "ConfeeAgent"),
+    "get_client": ("confee_agent.tools.http_client", "get_client"),
+    "_get_api_key": ("confee_agent.tools.search_connpass", "_get_api_key"),
+    "_search_connpass_api": ("confee_agent.tools.search_connpass", "_search_connpass_api"),
+    "fetch_for_index": ("confee_agent.tools.search_connpass", "fetch_for_index"),
+}
+
+
+def _load_deferred_imports() -> None:
+    """遅延対象のモジュールを import し、モジュール属性として公開する（既にあるものは上書きしない）。"""
+    namespace = globals()
+    for name, (module, attr) in _DEFERRED_IMPORTS.items():
+        if name not in namespace:
+            namespace[name] = getattr(importlib.import_module(module), attr)
+
+
+if not env_bool("CONFEE_LAZY_IMPORTS"):
+    _load_deferred_imports()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -11,32 +59,178 @@ logger = logging.getLogger(__name__)
 app = BedrockAgentCoreApp()
 
 @app.entrypoint
-def invoke(payload):
+def invoke(payload, context=None):
     try:
         prompt = payload.get("prompt", "こんにちは！何かお手伝いできますか？")
-        logger.info("Received prompt: %s", prompt[:100])
-        result = _get_confee().invoke(prompt)
+        session_id = getattr(context, "session_id", None) or DEFAULT_SESSION_ID
+        logger.info("Received prompt (session=%s): %s", session_id, prompt[:100])
+        registry = _get_registry()
+        if payload.get("stream"):
+            # 非同期ジェネレータを返すと BedrockAgentCoreApp が text/event-stream で逐次返す
+            return _stream(registry, session_id, prompt)
+        with registry.session(session_id) as confee:
+            result = confee.invoke(prompt)
         logger.info("Agent invocation completed successfully")
         return result
     except Exception as e:
         logger.error("Agent invocation failed: %s\n%s", e, traceback.format_exc())
         return {"response": f"エラーが発生しました: {e}"}
 
-_confee = None
 
+async def _stream(registry: SessionRegistry, session_id: str, prompt: str):
+    try:
+        async with registry.session_async(session_id) as confee:
+            async for event in confee.stream(prompt):
+                yield event
+        logger.info("Agent streaming completed successfully")
+    except Exception as e:
+        logger.error("Agent streaming failed: %s\n%s", e, traceback.format_exc())
+        yield {"data": f"エラーが発生しました: {e}"}
+
+_registry: SessionRegistry | None = None
+_registry_lock = threading.Lock()
+# 全セッションで共有する BedrockModel（最初のセッション作成時に生成する）
+_shared_model = None
+_shared_model_lock = threading.Lock()
+# 全セッションで共有する回答キャッシュ（おすすめプロンプト等の同じ質問を LLM を呼ばずに返す）
+_answer_cache = AnswerCache.from_env()
+
+
+def _compute_suggested_answer(prompt: str) -> str:
+    """おすすめプロンプトの回答を、会話履歴・回答キャッシュを持たない使い捨てのエージェントで生成する。"""
+    _load_deferred_imports()
+    confee = ConfeeAgent(async_tools=env_bool("CONFEE_ASYNC_TOOLS"), model=_shared_model)
+    confee.create_agent()
+    return confee.invoke(prompt)["response"]
+
+
+# おすすめプロンプトの事前生成した回答（CONFEE_SUGGESTED_REFRESH_SECONDS が正の場合のみ）
+_suggested_answers = (
+    SuggestedAnswerStore.from_env(_compute_suggested_answer)
+    if env_float("CONFEE_SUGGESTED_REFRESH_SECONDS", 0) > 0
+    else None
+)
+
+
+def _new_confee(model) -> "ConfeeAgent":
+    logger.info("Initializing ConfeeAgent...")
+    confee = ConfeeAgent(
+        async_tools=env_bool("CONFEE_ASYNC_TOOLS"),
+        model=model,
+        answer_cache=_answer_cache,
+        suggested_answers=_suggested_answers,
+    )
+    confee.create_agent()
+    logger.info("ConfeeAgent initialized successfully")
+    return confee
+
+
+def _create_confee() -> "ConfeeAgent":
+    """セッション用の ConfeeAgent を作る。セッションは並行に作成されるため、共有モデルの生成は個別のロックで守る。"""
+    global _shared_model
+    _load_deferred_imports()
+    if _shared_model is None:
+        with _shared_model_lock:
+            # 最初のセッションだけがモデルを生成し、同時に作成される他のセッションはそれを待って共有する
+            if _shared_model is None:
+                confee = _new_confee(None)
+                _shared_model = confee.model
+                return confee
+    return _new_confee(_shared_model)
+
+
+def _get_registry() -> SessionRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = SessionRegistry.from_env(_create_confee)
+    return _registry
+
+
+def _get_confee(session_id: str = DEFAULT_SESSION_ID) -> "ConfeeAgent":
+    return _get_registry().get(session_id)
+
+
+def warm_up() -> dict[str, float]:
+    """/ping に応答する前に、初回リクエストで発生する初期化をまとめて済ませる。
+
+    エージェント（BedrockModel を含む）の構築、connpass API キーの解決、HTTP 接続プールの作成を行い、
+    CONFEE_WARMUP_PRIME が有効なら connpass API に 1 件だけの検索を送って接続を確立しておく。
+    各ステップは失敗しても起動を止めず、所要時間（ミリ秒）を EMF メトリクスとして出力する。
+    """
+    timings: dict[str, float] = {"ImportMs": (time.perf_counter() - _PROCESS_STARTED) * 1000}
+    _load_deferred_imports()
+    steps = [
+        ("AgentInitMs", _get_confee),
+        ("ApiKeyMs", _get_api_key),
+        ("HttpPoolMs", get_client),
+    ]
+    if env_bool("CONFEE_WARMUP_PRIME"):
+        steps.append(("PrimingRequestMs", lambda: _search_connpass_api(count=1)))
+
+    for name, step in steps:
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            logger.warning("Warm-up step %s failed: %s", name, e, exc_info=True)
+        timings[name] = (time.perf_counter() - started) * 1000
+
+    timings["ColdStartMs"] = (time.perf_counter() - _PROCESS_STARTED) * 1000
+    logger.info(
+        "Warm-up completed: %s",
+        ", ".join(f"{name}={value:.1f}" for name, value in timings.items()),
+    )
+    emit_metrics(timings, dimensions={"Service": "confee-agent"})
+    return timings
+
+
+def _start_event_index_refresher() -> EventIndexRefresher | None:
+    """CONNPASS_INDEX_REFRESH_SECONDS が正の場合、イベントインデックスの定期更新を開始する。"""
+    interval = env_float("CONNPASS_INDEX_REFRESH_SECONDS", 0)
+    if interval <= 0:
+        return None
+    _load_deferred_imports()
+    prefectures = os.environ.get("CONNPASS_INDEX_PREFECTURES", "")
+    refresher = EventIndexRefresher(
+        fetch=fetch_for_index,
+        interval_seconds=interval,
+        months_ahead=env_int("CONNPASS_INDEX_MONTHS_AHEAD", DEFAULT_MONTHS_AHEAD),
+        prefectures=[p.strip() for p in prefectures.split(",") if p.strip()],
+        ngram=env_int("CONNPASS_INDEX_NGRAM", 2),
+    )
+    refresher.start()
+    logger.info("Event index refresher started (interval=%ss)", interval)
+    return refresher
 
-def _get_confee() -> ConfeeAgent:
-    global _confee
-    if _confee is None:
-        logger.info("Initializing ConfeeAgent...")
-        _confee = ConfeeAgent()
-        _confee.create_agent()
-        logger.info("ConfeeAgent initialized successfully")
-    return _confee
 
+def _start_suggested_answers() -> SuggestedAnswerStore | None:
+    """CONFEE_SUGGESTED_REFRESH_SECONDS が正の場合、おすすめプロンプトの回答の定期生成を開始する。"""
+    if _suggested_answers is None:
+        return None
+    interval = env_float("CONFEE_SUGGESTED_REFRESH_SECONDS", 0)
+    _suggested_answers.start(interval)
+    logger.info("Suggested answer refresher started (interval=%ss)", interval)
+    return _suggested_answers
 
 
+def _report_startup_profile() -> None:
+    """CONFEE_PROFILE_STARTUP が有効な場合、起動完了までの時間と import の内訳を出力する。"""
+    profile = startup_profiler.report()
+    if profile is None:
+        return
+    logger.info("Startup profile: %s", json.dumps(profile, ensure_ascii=False))
+    emit_metrics(
+        {"TimeToReadyMs": profile["time_to_ready_ms"], "ImportTotalMs": profile["import_total_ms"]},
+        dimensions={"Service": "confee-agent"},
+    )
 
 
 if __name__ == "__main__":
+    if env_bool("CONFEE_WARMUP", True):
+        warm_up()
+    _start_event_index_refresher()
+    _start_suggested_answers()
+    _report_startup_profile()
     app.run()
@@ -0,0 +1,36 @@
+import sys
+import time
+
+from confee_agent.serialization import dumps
+
+NAMESPACE = "Confee"
+
+
+def emit_metrics(
+    values: dict[str, float],
+    unit: str = "Milliseconds",
+    dimensions: dict[str, str] | None = None,
+) -> dict:
+    """CloudWatch Embedded Metric Format (EMF) のレコードを標準出力に 1 行で書き出す。
+
+    AgentCore Runtime の標準出力は CloudWatch Logs に送られ、EMF のレコードはそのままメトリクスになる。
+    logging のフォーマッタを通すと接頭辞が付いて EMF として解釈されないため、直接書き出す。
+    """
+    dimensions = dimensions or {}
+    record = {
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [
+                {
+                    "Namespace": NAMESPACE,
+                    "Dimensions": [list(dimensions)],
+                    "Metrics": [{"Name": name, "Unit": unit} for name in values],
+                }
+            ],
+        },
+        **dimensions,
+        **values,
+    }
+    sys.stdout.write(dumps(record) + "\n")
+    sys.stdout.flush()
+    return record
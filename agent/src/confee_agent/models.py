@@ -1,7 +1,12 @@
-from dataclasses import dataclass
+from array import array
+from dataclasses import asdict, dataclass
+from datetime import datetime
 
+# 列指向コンテナで値がないことを表す番兵（定員なし・日時不明）
+MISSING = -1
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class ConnpassEvent:
     id: int
     title: str
@@ -17,11 +22,93 @@ class ConnpassEvent:
     limit: int | None
     event_type: str
     open_status: str
+    updated_at: str | None = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ConnpassSearchResult:
     results_returned: int
     results_available: int
     results_start: int
     events: list[ConnpassEvent]
+    # connpass API に接続できず、以前に取得した結果を返している場合 True
+    stale: bool = False
+
+    def to_dict(self) -> dict:
+        """JSON に変換できる dict にする（プロセス間で共有するキャッシュ用）。"""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ConnpassSearchResult":
+        return cls(
+            results_returned=data["results_returned"],
+            results_available=data["results_available"],
+            results_start=data["results_start"],
+            events=[ConnpassEvent(**event) for event in data["events"]],
+            stale=data.get("stale", False),
+        )
+
+
+def parse_epoch(value: str | None) -> int:
+    """ISO 8601 形式の日時をエポック秒に変換する。値がない・不正な場合は MISSING を返す。"""
+    if not value:
+        return MISSING
+    try:
+        return int(datetime.fromisoformat(value).timestamp())
+    except ValueError:
+        return MISSING
+
+
+@dataclass(frozen=True, slots=True)
+class ConnpassEventColumns:
+    """大量のイベントを扱うための列指向コンテナ。
+
+    数値項目を型付き配列で並列に保持し、フィルタ・ソートをイベントオブジェクトに触れずに行う。
+    各メソッドはイベントの位置（インデックス）を返し、take() で ConnpassEvent に戻す。
+    """
+
+    events: tuple[ConnpassEvent, ...]
+    ids: array
+    accepted: array
+    waiting: array
+    limit: array
+    started_at: array
+    ended_at: array
+
+    @classmethod
+    def from_events(cls, events: list[ConnpassEvent]) -> "ConnpassEventColumns":
+        return cls(
+            events=tuple(events),
+            ids=array("q", (e.id for e in events)),
+            accepted=array("l", (e.accepted for e in events)),
+            waiting=array("l", (e.waiting for e in events)),
+            limit=array("l", (MISSING if e.limit is None else e.limit for e in events)),
+            started_at=array("q", (parse_epoch(e.started_at) for e in events)),
+            ended_at=array("q", (parse_epoch(e.ended_at) for e in events)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def take(self, indices: list[int]) -> list[ConnpassEvent]:
+        return [self.events[i] for i in indices]
+
+    def starting_between(self, start: int, end: int) -> list[int]:
+        """開催日時が [start, end) のエポック秒範囲に入るイベントの位置を返す。"""
+        return [i for i, t in enumerate(self.started_at) if start <= t < end]
+
+    def argsort_by_started_at(self, descending: bool = False) -> list[int]:
+        """開催日時順の位置を返す。日時不明のイベントは常に末尾に置く。"""
+        known = sorted(
+            (i for i, t in enumerate(self.started_at) if t != MISSING),
+            key=self.started_at.__getitem__,
+            reverse=descending,
+        )
+        return known + [i for i, t in enumerate(self.started_at) if t == MISSING]
+
+    def fill_ratios(self) -> list[float]:
+        """参加者数 / 定員 を返す。定員がない場合は 0.0。"""
+        return [
+            a / limit if limit > 0 else 0.0
+            for a, limit in zip(self.accepted, self.limit)
+        ]
@@ -0,0 +1,109 @@
+import bisect
+from array import array
+from collections.abc import Sequence
+
+
+def _ngrams(text: str, n: int) -> set[str]:
+    return {text[i : i + n] for i in range(len(text) - n + 1)}
+
+
+def _intersect(a, b) -> array:
+    """昇順に並んだ 2 つのポスティングの共通部分を返す。
+
+    サイズ差が大きい場合は短い方の各要素を長い方から二分探索する。
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    result = array(b.typecode)
+    if len(a) * 8 < len(b):
+        lo = 0
+        for doc_id in a:
+            lo = bisect.bisect_left(b, doc_id, lo)
+            if lo == len(b):
+                break
+            if b[lo] == doc_id:
+                result.append(doc_id)
+        return result
+
+    i = j = 0
+    while i < len(a) and j < len(b):
+        if a[i] == b[j]:
+            result.append(a[i])
+            i += 1
+            j += 1
+        elif a[i] < b[j]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+class NgramIndex:
+    """文字 n-gram による転置インデックス。
+
+    単語区切りのない日本語（「もくもく会」「勉強会」等）でも部分一致検索できる。
+    ポスティングは昇順の型付き整数配列で保持し、n-gram の積集合で候補を絞ったあと
+    元の文字列との部分一致で確定する（n-gram の偽陽性を除くため）。
+    """
+
+    def __init__(self, texts: list[str], n: int = 2):
+        if n < 1:
+            raise ValueError("n must be >= 1")
+        self.n = n
+        self._texts = list(texts)
+        typecode = "H" if len(texts) < 2**16 else "I"
+
+        postings: dict[str, list[int]] = {}
+        for doc_id, text in enumerate(self._texts):
+            for gram in _ngrams(text, n):
+                postings.setdefault(gram, []).append(doc_id)
+        # doc_id の昇順に追加しているので、そのまま配列化すれば整列済みになる
+        self._postings: dict[str, array] = {
+            gram: array(typecode, doc_ids) for gram, doc_ids in postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def postings_bytes(self) -> int:
+        """ポスティング配列の合計バイト数を返す。"""
+        return sum(p.itemsize * len(p) for p in self._postings.values())
+
+    def _candidates(self, term: str) -> array | range:
+        if len(term) < self.n:
+            # n より短い語は n-gram で絞り込めないため全件を候補にする
+            return range(len(self._texts))
+
+        grams = sorted(_ngrams(term, self.n), key=lambda g: len(self._postings.get(g, ())))
+        result = None
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings is None:
+                return []
+            result = postings if result is None else _intersect(result, postings)
+            if not result:
+                return []
+        return result
+
+    def match(self, term: str) -> list[int]:
+        """term を部分文字列として含む文書 ID を昇順で返す。"""
+        if not term:
+            return list(range(len(self._texts)))
+        return [doc_id for doc_id in self._candidates(term) if term in self._texts[doc_id]]
+
+    def search(self, all_of: Sequence[str] = (), any_of: Sequence[str] = ()) -> list[int]:
+        """all_of のすべてを含み、かつ any_of のいずれかを含む文書 ID を昇順で返す。"""
+        result: set[int] | None = None
+        for term in sorted(all_of, key=len, reverse=True):
+            matched = set(self.match(term))
+            result = matched if result is None else result & matched
+            if not result:
+                return []
+        if any_of:
+            union: set[int] = set()
+            for term in any_of:
+                union.update(self.match(term))
+            result = union if result is None else result & union
+        if result is None:
+            return list(range(len(self._texts)))
+        return sorted(result)
@@ -0,0 +1,105 @@
+import time
+import unicodedata
+from dataclasses import dataclass
+
+from confee_agent.models import MISSING, ConnpassEvent, ConnpassEventColumns
+
+# おすすめ度の判定基準（システムプロンプトの基準と対応）。
+# 「ユニーク・注目度の高いテーマ」「有名なコミュニティが主催」は機械的に判定できないため、モデルが判断する
+POPULAR_FILL_RATIO = 0.5
+SOON_SECONDS = 14 * 24 * 60 * 60
+ACTIVE_ACCEPTED = 10
+
+RECOMMENDATION_LEVELS = {3: "★★★", 2: "★★☆", 1: "★☆☆"}
+
+REASON_DIRECT_MATCH = "クエリに直接一致"
+REASON_RELATED = "クエリに関連"
+REASON_POPULAR = "定員の50%以上が申込済み"
+REASON_SOON = "2週間以内に開催"
+REASON_ACTIVE = "参加者10名以上"
+
+
+@dataclass(frozen=True, slots=True)
+class RankedEvent:
+    event: ConnpassEvent
+    level: int
+    reasons: tuple[str, ...]
+
+    @property
+    def recommendation_level(self) -> str:
+        return RECOMMENDATION_LEVELS[self.level]
+
+
+def _normalize(text: str | None) -> str:
+    return unicodedata.normalize("NFKC", text or "").casefold()
+
+
+def query_terms(*values: str) -> list[str]:
+    """keyword / keyword_or などのカンマ区切り文字列から正規化済みの検索語を取り出す。"""
+    terms = []
+    for value in values:
+        for term in value.split(","):
+            term = _normalize(term).strip()
+            if term and term not in terms:
+                terms.append(term)
+    return terms
+
+
+def rank_events(
+    events: list[ConnpassEvent],
+    terms: list[str],
+    now: float | None = None,
+    secondary: list[float] | None = None,
+) -> list[RankedEvent]:
+    """イベントにおすすめ度を付与し、おすすめ度の高い順 → 開催日時の早い順に並べる。
+
+    ★★★ はクエリへの直接一致・参加率 50% 以上・2 週間以内の開催のうち 2 つ以上、
+    ★★☆ はクエリへの一致（タイトル以外を含む）または参加者 10 名以上、それ以外は ★☆☆ とする。
+    参加率・開催日時・参加者数は列指向コンテナの列から読み、シグナルはイベントごとに判定する。
+    secondary を渡した場合は、おすすめ度が同じイベントの間で値の大きい順を優先する。
+    """
+    if not events:
+        return []
+    now = time.time() if now is None else now
+    columns = ConnpassEventColumns.from_events(events)
+
+    popular = [ratio >= POPULAR_FILL_RATIO for ratio in columns.fill_ratios()]
+    soon = [t != MISSING and 0 <= t - now <= SOON_SECONDS for t in columns.started_at]
+    active = [accepted >= ACTIVE_ACCEPTED for accepted in columns.accepted]
+    titles = [_normalize(e.title) for e in events]
+    bodies = [_normalize(e.catch) + "\n" + _normalize(e.description) for e in events]
+    direct = [any(term in title for term in terms) for title in titles]
+    related = [not d and any(term in body for term in terms) for d, body in zip(direct, bodies)]
+
+    ranked = []
+    for i, event in enumerate(events):
+        reasons = []
+        if direct[i]:
+            reasons.append(REASON_DIRECT_MATCH)
+        if related[i]:
+            reasons.append(REASON_RELATED)
+        if popular[i]:
+            reasons.append(REASON_POPULAR)
+        if soon[i]:
+            reasons.append(REASON_SOON)
+        if active[i]:
+            reasons.append(REASON_ACTIVE)
+
+        if direct[i] + popular[i] + soon[i] >= 2:
+            level = 3
+        elif direct[i] or related[i] or active[i]:
+            level = 2
+        else:
+            level = 1
+        ranked.append(RankedEvent(event, level, tuple(reasons)))
+
+    started_at = columns.started_at
+    order = sorted(
+        range(len(events)),
+        key=lambda i: (
+            -ranked[i].level,
+            -(secondary[i] if secondary else 0),
+            started_at[i] if started_at[i] != MISSING else float("inf"),
+        ),
+    )
+    return [ranked[i] for i in order]
@@ -0,0 +1,105 @@
+import json
+import logging
+import os
+import threading
+from typing import Any, Protocol
+
+logger = logging.getLogger(__name__)
+
+
+class Serializer(Protocol):
+    """JSON のシリアライザ。出力は空白なしのコンパクトな形式で、非 ASCII 文字はエスケープせず UTF-8 のまま出力する。"""
+
+    name: str
+
+    def dumps(self, obj: Any) -> str: ...
+
+    def dumps_bytes(self, obj: Any) -> bytes: ...
+
+    def loads(self, data: str | bytes) -> Any: ...
+
+
+class StdlibSerializer:
+    """標準ライブラリの json を使うシリアライザ（既定・追加の依存なし）。"""
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        return self.dumps(obj).encode()
+
+    def loads(self, data: str | bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer:
+    """orjson を使うシリアライザ。orjson がインストールされている場合だけ使える。"""
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+        # 標準の json と同様に、int などの str 以外のキーも文字列にして出力する
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any) -> str:
+        return self.dumps_bytes(obj).decode()
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        return self._orjson.dumps(obj, option=self._options)
+
+    def loads(self, data: str | bytes) -> Any:
+        return self._orjson.loads(data)
+
+
+_serializer: Serializer | None = None
+_serializer_lock = threading.Lock()
+
+
+def _create_serializer() -> Serializer:
+    """CONFEE_JSON_BACKEND（auto | orjson | json）に従ってシリアライザを作る。
+
+    auto（既定）は orjson がインストールされていれば orjson、なければ標準の json を使う。
+    """
+    name = os.environ.get("CONFEE_JSON_BACKEND", "auto").lower()
+    if name in ("auto", "orjson"):
+        try:
+            return OrjsonSerializer()
+        except ImportError:
+            if name == "orjson":
+                logger.warning("orjson is not installed, falling back to json")
+    return StdlibSerializer()
+
+
+def get_serializer() -> Serializer:
+    global _serializer
+    if _serializer is not None:
+        return _serializer
+    with _serializer_lock:
+        if _serializer is None:
+            _serializer = _create_serializer()
+            logger.info("JSON serializer: %s", _serializer.name)
+        return _serializer
+
+
+def set_serializer(serializer: Serializer | None) -> None:
+    """使うシリアライザを差し替える。None を渡すと次回の呼び出しで環境変数から作り直す。"""
+    global _serializer
+    with _serializer_lock:
+        _serializer = serializer
+
+
+def dumps(obj: Any) -> str:
+    return get_serializer().dumps(obj)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    return get_serializer().dumps_bytes(obj)
+
+
+def loads(data: str | bytes) -> Any:
+    return get_serializer().loads(data)
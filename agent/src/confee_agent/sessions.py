@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable, Iterator
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
+from typing import TYPE_CHECKING
+
+from confee_agent.config import env_float, env_int
+
+if TYPE_CHECKING:
+    from confee_agent.agent import ConfeeAgent
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION_ID = "default"
+DEFAULT_IDLE_SECONDS = 900.0
+DEFAULT_MAX_SESSIONS = 64
+LOCK_POLL_SECONDS = 0.01
+
+
+class _Session:
+    __slots__ = ("ready", "lock", "last_used", "in_use")
+
+    def __init__(self, now: float):
+        # エージェントの生成はレジストリのロックの外で行うため、完成するまでは ready で待つ
+        self.ready: Future = Future()
+        # 同じセッションの会話履歴を壊さないよう、1 セッションにつき同時に 1 リクエストだけ処理する
+        self.lock = threading.Lock()
+        self.last_used = now
+        self.in_use = 0
+
+
+class SessionRegistry:
+    """runtimeSessionId ごとに ConfeeAgent（会話履歴）を保持するレジストリ。
+
+    異なるセッションのリクエストは並行に処理し、同じセッションのリクエストはセッション単位のロックで直列化する。
+    一定時間使われていないセッション、および上限を超えた分の古いセッションは処理中でなければ破棄する。
+    エージェントの生成はレジストリ全体のロックの外で行い、同じセッションの他のリクエストはその完成を待つ。
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], "ConfeeAgent"],
+        idle_seconds: float = DEFAULT_IDLE_SECONDS,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._factory = factory
+        self.idle_seconds = idle_seconds
+        self.max_sessions = max_sessions
+        self._clock = clock
+        self._sessions: OrderedDict[str, _Session] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, factory: Callable[[], "ConfeeAgent"]) -> "SessionRegistry":
+        return cls(
+            factory,
+            idle_seconds=env_float("CONFEE_SESSION_IDLE_SECONDS", DEFAULT_IDLE_SECONDS),
+            max_sessions=env_int("CONFEE_MAX_SESSIONS", DEFAULT_MAX_SESSIONS),
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._sessions
+
+    def _evict_locked(self, now: float, reserve: int = 0) -> int:
+        evicted = 0
+        for session_id, session in list(self._sessions.items()):
+            if session.in_use == 0 and now - session.last_used > self.idle_seconds:
+                del self._sessions[session_id]
+                evicted += 1
+        # 上限超過分は最後に使われたのが古い順に破棄する（処理中のセッションは残す）
+        for session_id, session in list(self._sessions.items()):
+            if len(self._sessions) + reserve <= self.max_sessions:
+                break
+            if session.in_use == 0:
+                del self._sessions[session_id]
+                evicted += 1
+        if evicted:
+            logger.info("Evicted %d sessions (%d remaining)", evicted, len(self._sessions))
+        return evicted
+
+    def evict_idle(self) -> int:
+        with self._lock:
+            return self._evict_locked(self._clock())
+
+    def _checkout(self, session_id: str) -> tuple[_Session, bool]:
+        """セッションを使用中にして返す。新しく登録した（エージェントの生成が必要な）場合は True も返す。"""
+        with self._lock:
+            now = self._clock()
+            session = self._sessions.get(session_id)
+            created = session is None
+            if created:
+                self._evict_locked(now, reserve=1)
+                session = _Session(now)
+                self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+            session.in_use += 1
+            return session, created
+
+    def _build(self, session_id: str, session: _Session) -> None:
+        """エージェントを生成して ready に設定する。失敗した場合はセッションを登録から外し、例外を ready に設定する。"""
+        try:
+            agent = self._factory()
+        except BaseException as e:
+            with self._lock:
+                if self._sessions.get(session_id) is session:
+                    del self._sessions[session_id]
+            session.ready.set_exception(e)
+            return
+        session.ready.set_result(agent)
+        logger.info("Created session %s (%d active)", session_id, len(self))
+
+    def _acquire(self, session_id: str) -> _Session:
+        session, created = self._checkout(session_id)
+        try:
+            if created:
+                self._build(session_id, session)
+            session.ready.result()
+        except BaseException:
+            self._release(session)
+            raise
+        return session
+
+    async def _acquire_async(self, session_id: str) -> _Session:
+        session, created = self._checkout(session_id)
+        try:
+            if created:
+                # 生成はスレッドで行い、待っている側がキャンセルされても生成は最後まで進める
+                asyncio.get_running_loop().run_in_executor(None, self._build, session_id, session)
+            await asyncio.shield(asyncio.wrap_future(session.ready))
+        except BaseException:
+            self._release(session)
+            raise
+        return session
+
+    def _release(self, session: _Session) -> None:
+        with self._lock:
+            session.in_use -= 1
+            session.last_used = self._clock()
+
+    def get(self, session_id: str = DEFAULT_SESSION_ID) -> "ConfeeAgent":
+        """セッションのエージェントを（なければ作成して）返す。ロックは取らない。"""
+        session = self._acquire(session_id)
+        self._release(session)
+        return session.ready.result()
+
+    @contextmanager
+    def session(self, session_id: str = DEFAULT_SESSION_ID) -> Iterator["ConfeeAgent"]:
+        """セッションのロックを取得した状態でエージェントを渡す。"""
+        session = self._acquire(session_id)
+        try:
+            with session.lock:
+                yield session.ready.result()
+        finally:
+            self._release(session)
+
+    @asynccontextmanager
+    async def session_async(self, session_id: str = DEFAULT_SESSION_ID) -> AsyncIterator["ConfeeAgent"]:
+        """session() の非同期版。ロック待ちでイベントループを止めないよう、取得できるまで短い間隔で再試行する。"""
+        session = await self._acquire_async(session_id)
+        try:
+            # キャンセルされても取得済みのロックが残らないよう、ブロッキング取得はしない
+            while not session.lock.acquire(blocking=False):
+                await asyncio.sleep(LOCK_POLL_SECONDS)
+            try:
+                yield session.ready.result()
+            finally:
+                session.lock.release()
+        finally:
+            self._release(session)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
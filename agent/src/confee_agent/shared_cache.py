@@ -0,0 +1,356 @@
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, Callable, Protocol
+
+from confee_agent.serialization import dumps_bytes, loads
+from confee_agent.tools.response_cache import (
+    DEFAULT_MAX_BYTES,
+    DEFAULT_MAX_ENTRIES,
+    DEFAULT_TTL_SECONDS,
+    ResponseCache,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SQLITE_PATH = "/tmp/confee-cache.sqlite3"
+# DynamoDB の項目サイズ上限（400KB）に余裕を持たせた値。これを超える値は L2 に保存しない
+DYNAMODB_MAX_ITEM_BYTES = 350 * 1024
+_SQLITE_PURGE_EVERY = 128
+
+
+class CacheBackend(Protocol):
+    """インスタンス間で共有する L2 の読み書きのインターフェース。値は圧縮済みのバイト列。"""
+
+    def get(self, key: str) -> bytes | None: ...
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None: ...
+
+
+class SQLiteBackend:
+    """ローカルファイル（SQLite）の L2。テストや、1 ホストで複数プロセスを動かす場合に使う。"""
+
+    def __init__(self, path: str = DEFAULT_SQLITE_PATH, clock: Callable[[], float] = time.time):
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sets = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=1)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, self._clock())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, now + ttl_seconds),
+            )
+            self._sets += 1
+            if self._sets % _SQLITE_PURGE_EVERY == 0:
+                self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+
+
+class DynamoDBBackend:
+    """DynamoDB テーブルの L2。AgentCore の microVM や Lambda コンテナをまたいでキャッシュを共有する。
+
+    テーブルはパーティションキー key (S) と TTL 属性 expires_at (N) を持つこと。
+    TTL による削除は遅れることがあるため、読み込み時にも期限を確認する。
+    """
+
+    def __init__(self, table_name: str, client=None, clock: Callable[[], float] = time.time):
+        self.table_name = table_name
+        self._client = client
+        self._clock = clock
+
+    def _get_client(self):
+        if self._client is None:
+            import boto3
+            from botocore.config import Config
+
+            region = os.environ.get("AWS_DEFAULT_REGION", "ap-northeast-1")
+            # キャッシュの読み書きで connpass API より待たされないよう、短いタイムアウトで再試行もしない
+            self._client = boto3.client(
+                "dynamodb",
+                region_name=region,
+                config=Config(connect_timeout=1, read_timeout=1, retries={"total_max_attempts": 1}),
+            )
+        return self._client
+
+    def get(self, key: str) -> bytes | None:
+        item = self._get_client().get_item(TableName=self.table_name, Key={"key": {"S": key}}).get("Item")
+        if not item or float(item["expires_at"]["N"]) <= self._clock():
+            return None
+        return item["value"]["B"]
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        if len(value) > DYNAMODB_MAX_ITEM_BYTES:
+            logger.debug("Skipped shared cache write for %s (%d bytes)", key, len(value))
+            return
+        self._get_client().put_item(
+            TableName=self.table_name,
+            Item={
+                "key": {"S": key},
+                "value": {"B": value},
+                "expires_at": {"N": str(int(self._clock() + ttl_seconds))},
+            },
+        )
+
+
+_backend: CacheBackend | None = None
+_backend_loaded = False
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> CacheBackend | None:
+    """CONFEE_CACHE_BACKEND（sqlite / dynamodb）に応じた共有の L2 を返す。未設定なら None。"""
+    global _backend, _backend_loaded
+    if _backend_loaded:
+        return _backend
+    with _backend_lock:
+        if not _backend_loaded:
+            _backend = _backend_from_env()
+            _backend_loaded = True
+    return _backend
+
+
+def _backend_from_env() -> CacheBackend | None:
+    name = os.environ.get("CONFEE_CACHE_BACKEND", "").strip().lower()
+    if not name:
+        return None
+    try:
+        if name == "sqlite":
+            return SQLiteBackend(os.environ.get("CONFEE_CACHE_SQLITE_PATH", DEFAULT_SQLITE_PATH))
+        if name == "dynamodb":
+            table = os.environ.get("CONFEE_CACHE_TABLE", "")
+            if table:
+                return DynamoDBBackend(table)
+            logger.warning("CONFEE_CACHE_TABLE is not set, shared cache disabled")
+            return None
+    except Exception as e:
+        logger.warning("Shared cache backend %s unavailable: %s", name, e)
+        return None
+    logger.warning("Unknown CONFEE_CACHE_BACKEND: %s", name)
+    return None
+
+
+def reset_backend() -> None:
+    """共有の L2 を破棄し、次回の get_backend() で環境変数から作り直す（テスト用）。"""
+    global _backend, _backend_loaded
+    with _backend_lock:
+        _backend = None
+        _backend_loaded = False
+
+
+def shared_key(namespace: str, key: Any) -> str:
+    """キャッシュキー（タプル等）から、L2 で使う固定長の文字列キーを生成する。"""
+    raw = dumps_bytes(key)
+    return f"{namespace}:{hashlib.blake2b(raw, digest_size=16).hexdigest()}"
+
+
+def encode_payload(payload: Any) -> bytes:
+    return zlib.compress(dumps_bytes(payload))
+
+
+def decode_payload(data: bytes) -> Any:
+    return loads(zlib.decompress(data))
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class CacheLookup:
+    value: Any
+    # ttl_seconds を過ぎ、stale_seconds の猶予期間内にある値かどうか
+    stale: bool
+
+
+@dataclass(frozen=True, slots=True)
+class _Stored:
+    value: Any
+    fresh_until: float
+
+
+class TieredCache:
+    """プロセス内の L1（ResponseCache）と、インスタンス間で共有する L2 からなる 2 層キャッシュ。
+
+    ttl_seconds を過ぎた値も stale_seconds の間は stale として返し、呼び出し側は revalidate() で裏で取り直す
+    （stale-while-revalidate）。同じキーの取り直しはプロセス内で同時に 1 つだけ実行する。
+    L2 の障害はキャッシュミスとして扱い、リクエストは失敗させない。
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        stale_seconds: float = 0.0,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        l2: CacheBackend | None = None,
+        encode: Callable[[Any], Any] = _identity,
+        decode: Callable[[Any], Any] = _identity,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = max(stale_seconds, 0.0)
+        self.l2 = l2
+        self._encode = encode
+        self._decode = decode
+        self._clock = clock
+        self._l1 = ResponseCache(ttl_seconds + self.stale_seconds, max_entries, max_bytes, clock=clock)
+        self._lock = threading.Lock()
+        self._revalidating: set[tuple] = set()
+        self._l2_hits = 0
+        self._l2_misses = 0
+        self._l2_errors = 0
+        self._stale_hits = 0
+        self._revalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self._l1.enabled
+
+    def _get_l2(self, key: tuple) -> _Stored | None:
+        if self.l2 is None:
+            return None
+        try:
+            data = self.l2.get(shared_key(self.namespace, key))
+            payload = decode_payload(data) if data is not None else None
+            stored = _Stored(self._decode(payload["value"]), payload["fresh_until"]) if payload else None
+        except Exception as e:
+            logger.warning("Shared cache read failed: %s", e)
+            with self._lock:
+                self._l2_errors += 1
+            return None
+        with self._lock:
+            if stored is None:
+                self._l2_misses += 1
+            else:
+                self._l2_hits += 1
+        if stored is not None:
+            self._l1.set(key, stored, size=len(data))
+        return stored
+
+    def lookup(self, key: tuple) -> CacheLookup | None:
+        """L1 → L2 の順に探す。ttl_seconds + stale_seconds を過ぎた値は返さない。"""
+        if not self.enabled:
+            return None
+        return self._found(self._l1.get(key) or self._get_l2(key))
+
+    async def lookup_async(self, key: tuple) -> CacheLookup | None:
+        """lookup の非同期版。L2 の読み込みはスレッドで行い、イベントループを止めない。"""
+        if not self.enabled:
+            return None
+        stored = self._l1.get(key)
+        if stored is None and self.l2 is not None:
+            stored = await asyncio.to_thread(self._get_l2, key)
+        return self._found(stored)
+
+    def _found(self, stored: _Stored | None) -> CacheLookup | None:
+        now = self._clock()
+        if stored is None or stored.fresh_until + self.stale_seconds <= now:
+            return None
+        stale = stored.fresh_until <= now
+        if stale:
+            with self._lock:
+                self._stale_hits += 1
+        return CacheLookup(stored.value, stale)
+
+    def get(self, key: tuple) -> Any | None:
+        """期限内（stale でない）の値だけを返す。"""
+        found = self.lookup(key)
+        return found.value if found is not None and not found.stale else None
+
+    def set(self, key: tuple, value: Any, size: int) -> None:
+        stored = self._set_l1(key, value, size)
+        if stored is not None:
+            self._set_l2(key, stored)
+
+    async def set_async(self, key: tuple, value: Any, size: int) -> None:
+        """set の非同期版。L2 への書き込みはスレッドで行い、イベントループを止めない。"""
+        stored = self._set_l1(key, value, size)
+        if stored is not None:
+            await asyncio.to_thread(self._set_l2, key, stored)
+
+    def _set_l1(self, key: tuple, value: Any, size: int) -> _Stored | None:
+        """L1 に書き込み、L2 にも書き込む値を返す（L2 がなければ None）。"""
+        if not self.enabled:
+            return None
+        stored = _Stored(value, self._clock() + self.ttl_seconds)
+        self._l1.set(key, stored, size=size)
+        return stored if self.l2 is not None else None
+
+    def _set_l2(self, key: tuple, stored: _Stored) -> None:
+        try:
+            data = encode_payload({"value": self._encode(stored.value), "fresh_until": stored.fresh_until})
+            self.l2.set(shared_key(self.namespace, key), data, self.ttl_seconds + self.stale_seconds)
+        except Exception as e:
+            logger.warning("Shared cache write failed: %s", e)
+            with self._lock:
+                self._l2_errors += 1
+
+    def revalidate(self, key: tuple, load: Callable[[], Any]) -> bool:
+        """load を裏のスレッドで実行する。同じキーの取り直しが実行中なら何もしない。
+
+        load は取得した値を set() でキャッシュに書き込むこと。
+        """
+        with self._lock:
+            if key in self._revalidating:
+                return False
+            self._revalidating.add(key)
+            self._revalidations += 1
+
+        def run():
+            try:
+                load()
+            except Exception as e:
+                logger.warning("Cache revalidation failed: %s", e)
+            finally:
+                with self._lock:
+                    self._revalidating.discard(key)
+
+        threading.Thread(target=run, name=f"{self.namespace}-revalidate", daemon=True).start()
+        return True
+
+    def clear(self) -> None:
+        """L1 と統計を消去する。L2 は他のインスタンスと共有しているため消さない。"""
+        self._l1.clear()
+        with self._lock:
+            self._l2_hits = self._l2_misses = self._l2_errors = 0
+            self._stale_hits = self._revalidations = 0
+
+    def stats(self) -> dict:
+        stats = self._l1.stats()
+        with self._lock:
+            stats.update(
+                {
+                    "l2_hits": self._l2_hits,
+                    "l2_misses": self._l2_misses,
+                    "l2_errors": self._l2_errors,
+                    "stale_hits": self._stale_hits,
+                    "revalidations": self._revalidations,
+                }
+            )
+        return stats
@@ -0,0 +1,124 @@
+import logging
+import sys
+import threading
+import time
+from importlib.abc import MetaPathFinder
+
+logger = logging.getLogger(__name__)
+
+
+class ImportProfiler(MetaPathFinder):
+    """モジュールごとの import 時間を記録する meta path finder。
+
+    他の finder が見つけた spec のローダーの exec_module を計測用の関数で包む。
+    各モジュールについて、配下の import を含む累積時間と、それを除いた自身の時間を記録する。
+    """
+
+    def __init__(self):
+        self.records: list[tuple[str, float, float]] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self) -> list[float]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._local, "finding", False):
+            return None
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.finding = False
+
+        loader = spec.loader
+        # 組み込み・frozen モジュールはローダーがクラスそのもの（共有）なので包まない
+        if loader is None or isinstance(loader, type) or not hasattr(loader, "exec_module"):
+            return spec
+
+        exec_module = loader.exec_module
+
+        def timed_exec_module(module):
+            stack = self._stack()
+            stack.append(0.0)
+            started = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                elapsed = time.perf_counter() - started
+                children = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                with self._lock:
+                    self.records.append((fullname, (elapsed - children) * 1000, elapsed * 1000))
+
+        loader.exec_module = timed_exec_module
+        return spec
+
+    def summary(self, top: int = 20) -> dict:
+        """自身の時間が長いモジュールと、トップレベルパッケージ別の合計を返す。"""
+        with self._lock:
+            records = list(self.records)
+        packages: dict[str, float] = {}
+        for name, self_ms, _ in records:
+            root = name.partition(".")[0]
+            packages[root] = packages.get(root, 0.0) + self_ms
+        slowest = sorted(records, key=lambda r: r[1], reverse=True)[:top]
+        return {
+            "modules_imported": len(records),
+            "import_total_ms": round(sum(r[1] for r in records), 1),
+            "packages": {
+                name: round(ms, 1)
+                for name, ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+            },
+            "slowest_modules": [
+                {"module": name, "self_ms": round(self_ms, 1), "cumulative_ms": round(cumulative_ms, 1)}
+                for name, self_ms, cumulative_ms in slowest
+            ],
+        }
+
+
+_profiler: ImportProfiler | None = None
+_started_at: float | None = None
+
+
+def start() -> ImportProfiler:
+    """import 時間の計測を開始する。重いモジュールを import する前に呼ぶ。"""
+    global _profiler, _started_at
+    if _profiler is None:
+        _profiler = ImportProfiler()
+        _started_at = time.perf_counter()
+        sys.meta_path.insert(0, _profiler)
+    return _profiler
+
+
+def stop() -> None:
+    global _profiler, _started_at
+    if _profiler is not None and _profiler in sys.meta_path:
+        sys.meta_path.remove(_profiler)
+    _profiler = None
+    _started_at = None
+
+
+def is_active() -> bool:
+    return _profiler is not None
+
+
+def report(top: int = 20) -> dict | None:
+    """計測を終了し、計測開始から現在までの時間 (time_to_ready_ms) と import の内訳を返す。"""
+    if _profiler is None:
+        return None
+    result = {"time_to_ready_ms": round((time.perf_counter() - _started_at) * 1000, 1)}
+    result.update(_profiler.summary(top))
+    stop()
+    return result
@@ -0,0 +1,134 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+
+from confee_agent.answer_cache import normalize_prompt
+from confee_agent.config import env_float
+from confee_agent.event_index import JST
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_AGE_SECONDS = 1800.0
+
+# frontend/src/data/suggestedPrompts.ts の prompt と同じ内容を保つこと
+SUGGESTED_PROMPTS = (
+    "TypeScriptのカンファレンスある？",
+    "今月開催のLT会を教えて",
+    "面白そうなカンファレンスを見つけてきて",
+    "おすすめの勉強会ある？",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class SuggestedAnswer:
+    prompt: str
+    text: str
+    # 回答を生成した時刻（エポック秒）と JST の日付
+    generated_at: float
+    day: str
+
+
+class SuggestedAnswerStore:
+    """おすすめプロンプトの回答を事前に生成して保持し、チャットの経路から即座に返す。
+
+    回答が max_age_seconds より古くなっても、生成済みの回答を返しつつ裏で再生成する。
+    ただし生成した日付（JST）が今日と異なる回答は「今月」等の意味が変わるため返さない。
+    """
+
+    def __init__(
+        self,
+        compute: Callable[[str], str],
+        prompts: tuple[str, ...] = SUGGESTED_PROMPTS,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+        clock: Callable[[], float] = time.time,
+        today: Callable[[], str] = lambda: datetime.now(JST).strftime("%Y%m%d"),
+    ):
+        self._compute = compute
+        self.prompts = prompts
+        self.max_age_seconds = max_age_seconds
+        self._clock = clock
+        self._today = today
+        self._keys = {normalize_prompt(p): p for p in prompts}
+        self._answers: dict[str, SuggestedAnswer] = {}
+        self._refreshing: set[str] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @classmethod
+    def from_env(cls, compute: Callable[[str], str]) -> "SuggestedAnswerStore":
+        return cls(
+            compute,
+            max_age_seconds=env_float("CONFEE_SUGGESTED_MAX_AGE_SECONDS", DEFAULT_MAX_AGE_SECONDS),
+        )
+
+    def refresh(self, prompt: str) -> SuggestedAnswer | None:
+        """1 つのプロンプトの回答を生成し直す。失敗した場合は既存の回答を残す。"""
+        started = time.monotonic()
+        try:
+            text = self._compute(prompt)
+        except Exception as e:
+            logger.warning("Suggested answer refresh failed (%s): %s", prompt, e)
+            return None
+        finally:
+            with self._lock:
+                self._refreshing.discard(prompt)
+        if not text:
+            return None
+        answer = SuggestedAnswer(prompt, text, self._clock(), self._today())
+        with self._lock:
+            self._answers[prompt] = answer
+        logger.info("Suggested answer refreshed (%s) in %.2fs", prompt, time.monotonic() - started)
+        return answer
+
+    def refresh_all(self) -> int:
+        return sum(self.refresh(prompt) is not None for prompt in self.prompts)
+
+    def _refresh_in_background(self, prompt: str) -> None:
+        with self._lock:
+            if prompt in self._refreshing:
+                return
+            self._refreshing.add(prompt)
+        threading.Thread(
+            target=self.refresh, args=(prompt,), name="suggested-answer-refresh", daemon=True
+        ).start()
+
+    def lookup(self, message: str) -> SuggestedAnswer | None:
+        """message がおすすめプロンプトと一致すれば生成済みの回答を返す。"""
+        prompt = self._keys.get(normalize_prompt(message))
+        if prompt is None:
+            return None
+        with self._lock:
+            answer = self._answers.get(prompt)
+        if answer is None or answer.day != self._today():
+            self._refresh_in_background(prompt)
+            return None
+        if self._clock() - answer.generated_at > self.max_age_seconds:
+            self._refresh_in_background(prompt)
+        return answer
+
+    def _run(self, interval_seconds: float) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh_all()
+            except Exception as e:
+                logger.error("Suggested answer refresh raised: %s", e, exc_info=True)
+            self._stop.wait(interval_seconds)
+
+    def start(self, interval_seconds: float) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(interval_seconds,), name="suggested-answers", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
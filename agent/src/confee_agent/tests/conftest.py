@@ -1,6 +1,10 @@
 import pytest
 
+import confee_agent.event_index as event_index_module
+import confee_agent.tools.http_client as http_client_module
 import confee_agent.tools.search_connpass as search_connpass_module
+from confee_agent.tools.circuit_breaker import CircuitBreaker
+from confee_agent.tools.rate_limit import RateLimiter, RetryPolicy
 
 
 @pytest.fixture(autouse=True)
@@ -9,3 +13,48 @@ def _reset_api_key_cache():
     search_connpass_module._cached_api_key = None
     yield
     search_connpass_module._cached_api_key = None
+
+
+@pytest.fixture(autouse=True)
+def _reset_http_client():
+    """各テスト後に共有 HTTP クライアントを破棄する。"""
+    yield
+    http_client_module.close_client()
+
+
+@pytest.fixture(autouse=True)
+def _reset_response_cache():
+    """各テスト前後に検索結果キャッシュをクリアする。"""
+    search_connpass_module._response_cache.clear()
+    search_connpass_module._last_good.clear()
+    yield
+    search_connpass_module._response_cache.clear()
+    search_connpass_module._last_good.clear()
+
+
+@pytest.fixture(autouse=True)
+def _reset_event_index():
+    """各テスト後に公開中のイベントインデックスを破棄する。"""
+    yield
+    event_index_module.publish_index(None)
+
+
+@pytest.fixture(autouse=True)
+def _reset_event_versions():
+    """各テスト前後に観測したイベントの updated_at を破棄する。"""
+    event_index_module._event_versions.clear()
+    yield
+    event_index_module._event_versions.clear()
+
+
+@pytest.fixture(autouse=True)
+def _no_rate_limit(monkeypatch):
+    """connpass API の呼び出し頻度の制限と再試行の待ち時間を無効にする（再試行の回数はそのまま）。"""
+    monkeypatch.setattr(search_connpass_module, "_rate_limiter", RateLimiter(qps=0))
+    monkeypatch.setattr(search_connpass_module, "_retry_policy", RetryPolicy(base_delay_seconds=0))
+
+
+@pytest.fixture(autouse=True)
+def _reset_circuit_breaker(monkeypatch):
+    """テストごとに closed のサーキットブレーカーを使う。"""
+    monkeypatch.setattr(search_connpass_module, "_circuit_breaker", CircuitBreaker())
@@ -1,6 +1,11 @@
+import asyncio
 from unittest.mock import MagicMock, patch
 
+import pytest
+from strands.hooks import AfterInvocationEvent
+
 from confee_agent.agent import ConfeeAgent, SYSTEM_PROMPT
+from confee_agent.tools.http_client import get_async_client
 
 
 class TestConfeeAgentSystemPrompt:
@@ -112,3 +117,237 @@ class TestConfeeAgentInvoke:
             assert False, "Should have raised an error"
         except RuntimeError:
             pass
+
+
+class TestConfeeAgentAsyncTools:
+    """非同期ツール登録のテスト"""
+
+    @patch("confee_agent.agent.Agent")
+    def test_registers_sync_tool_by_default(self, mock_agent_cls):
+        from confee_agent.tools.search_connpass import search_connpass
+
+        ConfeeAgent().create_agent()
+
+        tools = mock_agent_cls.call_args.kwargs.get("tools", [])
+        assert search_connpass in tools
+
+    @patch("confee_agent.agent.Agent")
+    def test_registers_async_tool_when_enabled(self, mock_agent_cls):
+        from confee_agent.tools.search_connpass import search_connpass_async
+
+        ConfeeAgent(async_tools=True).create_agent()
+
+        tools = mock_agent_cls.call_args.kwargs.get("tools", [])
+        assert search_connpass_async in tools
+        assert search_connpass_async.tool_name == "search_connpass"
+
+
+class TestConfeeAgentStream:
+    """ConfeeAgent.streamテスト"""
+
+    @pytest.mark.asyncio
+    @patch("confee_agent.agent.Agent")
+    async def test_stream_yields_text_and_tool_events(self, mock_agent_cls):
+        async def fake_stream(prompt):
+            yield {"init_event_loop": True}
+            yield {"current_tool_use": {"toolUseId": "t1", "name": "search_connpass", "input": ""}}
+            yield {"current_tool_use": {"toolUseId": "t1", "name": "search_connpass", "input": "{}"}}
+            yield {"data": "おすすめ", "delta": {"text": "おすすめ"}}
+            yield {"data": "です", "delta": {"text": "です"}}
+            yield {"result": MagicMock()}
+
+        mock_agent = MagicMock()
+        mock_agent.stream_async = fake_stream
+        mock_agent_cls.return_value = mock_agent
+
+        confee = ConfeeAgent()
+        confee.create_agent()
+        events = [event async for event in confee.stream("テスト")]
+
+        assert events == [{"tool": "search_connpass"}, {"data": "おすすめ"}, {"data": "です"}]
+
+    @pytest.mark.asyncio
+    async def test_stream_without_create_raises_error(self):
+        with pytest.raises(RuntimeError):
+            async for _ in ConfeeAgent().stream("テスト"):
+                pass
+
+
+class TestConfeeAgentAsyncClient:
+    """呼び出しごとのイベントループで作った非同期 HTTP クライアントを閉じるテスト"""
+
+    @patch("confee_agent.agent.Agent")
+    def test_invoke_closes_client_of_its_event_loop(self, mock_agent_cls):
+        mock_agent = MagicMock()
+        mock_agent.messages = []
+        mock_agent_cls.return_value = mock_agent
+        clients = []
+
+        def call(prompt):
+            # Strands と同様に、呼び出しごとの新しいイベントループでツールと AfterInvocationEvent のフックを実行する
+            async def run():
+                clients.append(get_async_client())
+                (_, callback), _ = mock_agent.hooks.add_callback.call_args
+                await callback(AfterInvocationEvent(agent=mock_agent, invocation_state={}))
+                return MagicMock(message={"role": "assistant", "content": [{"text": "回答"}]})
+
+            return asyncio.run(run())
+
+        mock_agent.side_effect = call
+        confee = ConfeeAgent()
+        confee.create_agent()
+        confee.invoke("質問1")
+        confee.invoke("質問2")
+
+        assert len(clients) == 2
+        assert all(client.is_closed for client in clients)
+
+    @pytest.mark.asyncio
+    @patch("confee_agent.agent.Agent")
+    async def test_stream_keeps_client_of_long_lived_loop(self, mock_agent_cls):
+        mock_agent = MagicMock()
+        mock_agent.messages = []
+        mock_agent_cls.return_value = mock_agent
+
+        async def fake_stream(prompt):
+            get_async_client()
+            (_, callback), _ = mock_agent.hooks.add_callback.call_args
+            await callback(AfterInvocationEvent(agent=mock_agent, invocation_state={}))
+            yield {"data": "回答"}
+
+        mock_agent.stream_async = fake_stream
+        confee = ConfeeAgent()
+        confee.create_agent()
+        client = get_async_client()
+        [event async for event in confee.stream("質問")]
+
+        assert not client.is_closed
+        assert get_async_client() is client
+        await client.aclose()
+
+
+class TestConfeeAgentSharedModel:
+    """モデル共有のテスト"""
+
+    @patch("confee_agent.agent.Agent")
+    def test_uses_given_model(self, mock_agent_cls):
+        model = MagicMock()
+
+        confee = ConfeeAgent(model=model)
+        confee.create_agent()
+
+        assert mock_agent_cls.call_args.kwargs["model"] is model
+        assert confee.model is model
+
+    @patch("confee_agent.agent.Agent")
+    @patch("confee_agent.agent.create_model")
+    def test_creates_model_when_not_given(self, mock_create_model, mock_agent_cls):
+        confee = ConfeeAgent()
+        confee.create_agent()
+
+        mock_create_model.assert_called_once()
+        assert confee.model is mock_create_model.return_value
+
+    @patch("confee_agent.agent.Agent")
+    def test_uses_budget_conversation_manager(self, mock_agent_cls):
+        from confee_agent.conversation import BudgetConversationManager
+
+        ConfeeAgent(model=MagicMock()).create_agent()
+
+        assert isinstance(mock_agent_cls.call_args.kwargs["conversation_manager"], BudgetConversationManager)
+
+
+class TestConfeeAgentAnswerCache:
+    """回答キャッシュとの連携のテスト"""
+
+    def _confee(self, mock_agent_cls, cache):
+        mock_agent = MagicMock()
+        mock_agent.messages = []
+        mock_agent.return_value.message = {"role": "assistant", "content": [{"text": "LLMの回答"}]}
+        mock_agent_cls.return_value = mock_agent
+        confee = ConfeeAgent(model=MagicMock(), answer_cache=cache)
+        confee.create_agent()
+        return confee, mock_agent
+
+    @patch("confee_agent.agent.Agent")
+    def test_second_session_gets_cached_answer(self, mock_agent_cls):
+        from confee_agent.answer_cache import AnswerCache
+
+        cache = AnswerCache(version=lambda: None)
+        first, first_agent = self._confee(mock_agent_cls, cache)
+        assert first.invoke("おすすめの勉強会ある？") == {"response": "LLMの回答"}
+
+        second, second_agent = self._confee(mock_agent_cls, cache)
+        assert second.invoke("おすすめの勉強会ある？") == {"response": "LLMの回答"}
+
+        second_agent.assert_not_called()
+        assert second_agent.messages == [
+            {"role": "user", "content": [{"text": "おすすめの勉強会ある？"}]},
+            {"role": "assistant", "content": [{"text": "LLMの回答"}]},
+        ]
+
+    @patch("confee_agent.agent.Agent")
+    def test_follow_up_questions_are_not_cached(self, mock_agent_cls):
+        cache = MagicMock()
+        confee, mock_agent = self._confee(mock_agent_cls, cache)
+        mock_agent.messages.append({"role": "user", "content": [{"text": "前の質問"}]})
+
+        confee.invoke("それの東京開催は？")
+
+        cache.get.assert_not_called()
+        cache.set.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("confee_agent.agent.Agent")
+    async def test_stream_serves_and_stores_cached_answer(self, mock_agent_cls):
+        from confee_agent.answer_cache import AnswerCache
+
+        async def fake_stream(prompt):
+            yield {"data": "ストリーム"}
+            yield {"data": "の回答"}
+
+        cache = AnswerCache(version=lambda: None)
+        first, first_agent = self._confee(mock_agent_cls, cache)
+        first_agent.stream_async = fake_stream
+        assert [e async for e in first.stream("質問")] == [{"data": "ストリーム"}, {"data": "の回答"}]
+
+        second, second_agent = self._confee(mock_agent_cls, cache)
+        second_agent.stream_async = MagicMock()
+        assert [e async for e in second.stream("質問")] == [{"data": "ストリームの回答"}]
+        second_agent.stream_async.assert_not_called()
+
+
+class TestConfeeAgentSuggestedAnswers:
+    """事前生成したおすすめプロンプトの回答との連携のテスト"""
+
+    @patch("confee_agent.agent.Agent")
+    def test_serves_suggested_answer_before_answer_cache(self, mock_agent_cls):
+        from confee_agent.suggested_answers import SuggestedAnswer
+
+        mock_agent = MagicMock()
+        mock_agent.messages = []
+        mock_agent_cls.return_value = mock_agent
+        store = MagicMock()
+        store.lookup.return_value = SuggestedAnswer("おすすめの勉強会ある？", "事前生成の回答", 0.0, "20260315")
+        cache = MagicMock()
+        confee = ConfeeAgent(model=MagicMock(), answer_cache=cache, suggested_answers=store)
+        confee.create_agent()
+
+        assert confee.invoke("おすすめの勉強会ある？") == {"response": "事前生成の回答"}
+        mock_agent.assert_not_called()
+        cache.get.assert_not_called()
+        assert mock_agent.messages[-1] == {"role": "assistant", "content": [{"text": "事前生成の回答"}]}
+
+    @patch("confee_agent.agent.Agent")
+    def test_falls_back_to_llm_when_not_suggested(self, mock_agent_cls):
+        mock_agent = MagicMock()
+        mock_agent.messages = []
+        mock_agent.return_value.message = {"role": "assistant", "content": [{"text": "LLMの回答"}]}
+        mock_agent_cls.return_value = mock_agent
+        store = MagicMock()
+        store.lookup.return_value = None
+        confee = ConfeeAgent(model=MagicMock(), suggested_answers=store)
+        confee.create_agent()
+
+        assert confee.invoke("Pythonの勉強会ある？") == {"response": "LLMの回答"}
+        mock_agent.assert_called_once_with("Pythonの勉強会ある？")
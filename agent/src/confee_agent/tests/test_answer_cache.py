@@ -0,0 +1,217 @@
+import threading
+
+import pytest
+
+from confee_agent.answer_cache import AnswerCache, normalize_prompt
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeEnv:
+    """日付とイベントの version を差し替えるためのテスト用の状態。"""
+
+    def __init__(self):
+        self.day = "20260315"
+        self.events_version = "v1"
+
+
+def _cache(**kwargs) -> tuple[AnswerCache, FakeClock, FakeEnv]:
+    clock = FakeClock()
+    env = FakeEnv()
+    cache = AnswerCache(
+        clock=clock,
+        today=lambda: env.day,
+        version=lambda: env.events_version,
+        **kwargs,
+    )
+    return cache, clock, env
+
+
+class TestNormalizePrompt:
+    """プロンプト正規化のテスト"""
+
+    def test_ignores_width_case_whitespace_and_punctuation(self):
+        assert normalize_prompt("ＴｙｐｅＳｃｒｉｐｔ の カンファレンス ある？") == normalize_prompt(
+            "typescriptのカンファレンスある?"
+        )
+
+
+class TestAnswerCache:
+    """回答キャッシュのテスト"""
+
+    def test_returns_answer_for_same_prompt(self):
+        cache, _, _ = _cache()
+        cache.set("TypeScriptのカンファレンスある？", "回答")
+
+        assert cache.get("TypeScriptのカンファレンスある？") == "回答"
+        assert cache.get("typescript の カンファレンス ある?") == "回答"
+        assert cache.stats()["hits"] == 2
+
+    def test_miss_for_different_prompt(self):
+        cache, _, _ = _cache()
+        cache.set("TypeScriptのカンファレンスある？", "回答")
+
+        assert cache.get("Pythonのカンファレンスある？") is None
+        assert cache.stats()["misses"] == 1
+
+    def test_expires_after_ttl(self):
+        cache, clock, _ = _cache(ttl_seconds=60)
+        cache.set("質問", "回答")
+
+        clock.now = 61
+
+        assert cache.get("質問") is None
+        assert cache.stats()["invalidations"] == 1
+
+    def test_date_bucket_separates_days(self):
+        cache, _, env = _cache()
+        cache.set("今月開催のLT会を教えて", "3月の回答")
+
+        env.day = "20260316"
+
+        assert cache.get("今月開催のLT会を教えて") is None
+
+    def test_invalidated_when_events_change(self):
+        cache, _, env = _cache()
+        cache.set("おすすめの勉強会ある？", "回答")
+
+        env.events_version = "v2"
+
+        assert cache.get("おすすめの勉強会ある？") is None
+        assert cache.stats()["entries"] == 0
+
+    def test_invalidated_when_used_event_is_updated(self):
+        updated: set[str] = set()
+        cache, _, _ = _cache(changed=lambda events: bool(updated & events.keys()))
+        cache.set("TypeScriptのカンファレンスある？", "回答", events={"100001": "2026-03-01T00:00:00+09:00"})
+
+        assert cache.get("TypeScriptのカンファレンスある？") == "回答"
+
+        updated.add("100001")
+
+        assert cache.get("TypeScriptのカンファレンスある？") is None
+        assert cache.stats()["invalidations"] == 1
+
+    def test_evicts_least_recently_used(self):
+        cache, _, _ = _cache(max_entries=2)
+        cache.set("質問A", "A")
+        cache.set("質問B", "B")
+        cache.get("質問A")
+        cache.set("質問C", "C")
+
+        assert cache.get("質問B") is None
+        assert cache.get("質問A") == "A"
+        assert cache.get("質問C") == "C"
+
+    def test_similarity_matching_is_disabled_by_default(self):
+        cache, _, _ = _cache()
+        cache.set("面白そうなカンファレンスを見つけてきて", "回答")
+
+        assert cache.get("面白そうなカンファレンスを見つけて") is None
+
+    def test_similar_prompt_hits_when_enabled(self):
+        cache, _, _ = _cache(similarity=0.8)
+        cache.set("面白そうなカンファレンスを見つけてきて", "回答")
+
+        assert cache.get("面白そうなカンファレンスを見つけて") == "回答"
+        assert cache.stats()["similar_hits"] == 1
+
+    def test_similar_prompt_with_different_keyword_misses(self):
+        cache, _, _ = _cache(similarity=0.5)
+        cache.set("TypeScriptのカンファレンスある？", "回答")
+
+        assert cache.get("Pythonのカンファレンスある？") is None
+
+    def test_disabled_with_zero_ttl(self):
+        cache, _, _ = _cache(ttl_seconds=0)
+        cache.set("質問", "回答")
+
+        assert cache.get("質問") is None
+
+    def test_empty_answer_is_not_cached(self):
+        cache, _, _ = _cache()
+        cache.set("質問", "")
+
+        assert cache.stats()["entries"] == 0
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("CONFEE_ANSWER_CACHE_TTL_SECONDS", "30")
+        monkeypatch.setenv("CONFEE_ANSWER_CACHE_MAX_ENTRIES", "10")
+        monkeypatch.setenv("CONFEE_ANSWER_CACHE_SIMILARITY", "0.9")
+
+        cache = AnswerCache.from_env()
+
+        assert (cache.ttl_seconds, cache.max_entries, cache.similarity) == (30, 10, 0.9)
+
+
+class TestAnswerCacheSharedTier:
+    """共有の L2 を使った回答キャッシュのテスト"""
+
+    def test_answer_is_shared_between_instances(self, tmp_path):
+        from confee_agent.shared_cache import SQLiteBackend
+
+        backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+        first, _, env = _cache(l2=backend)
+        second = AnswerCache(today=lambda: env.day, version=lambda: env.events_version, l2=backend)
+        first.set("おすすめの勉強会ある？", "回答")
+
+        assert second.get("おすすめの勉強会ある?") == "回答"
+        assert second.stats()["shared_hits"] == 1
+        assert second.get("おすすめの勉強会ある？") == "回答"
+        assert second.stats()["hits"] == 1
+
+    def test_shared_answer_for_other_events_version_is_ignored(self, tmp_path):
+        from confee_agent.shared_cache import SQLiteBackend
+
+        backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+        first, _, env = _cache(l2=backend)
+        first.set("おすすめの勉強会ある？", "回答")
+        second = AnswerCache(today=lambda: env.day, version=lambda: "v2", l2=backend)
+
+        assert second.get("おすすめの勉強会ある？") is None
+
+    def test_shared_answer_with_updated_event_is_ignored(self, tmp_path):
+        from confee_agent.shared_cache import SQLiteBackend
+
+        backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+        first, _, env = _cache(l2=backend)
+        first.set("おすすめの勉強会ある？", "回答", events={"100001": "t1"})
+        second = AnswerCache(
+            today=lambda: env.day,
+            version=lambda: env.events_version,
+            changed=lambda events: events == {"100001": "t1"},
+            l2=backend,
+        )
+
+        assert second.get("おすすめの勉強会ある？") is None
+
+    @pytest.mark.asyncio
+    async def test_async_l2_io_runs_off_event_loop(self, tmp_path):
+        from confee_agent.shared_cache import SQLiteBackend
+
+        threads = []
+
+        class RecordingBackend(SQLiteBackend):
+            def get(self, key):
+                threads.append(threading.get_ident())
+                return super().get(key)
+
+            def set(self, key, value, ttl_seconds):
+                threads.append(threading.get_ident())
+                super().set(key, value, ttl_seconds)
+
+        backend = RecordingBackend(str(tmp_path / "cache.sqlite3"))
+        first, _, env = _cache(l2=backend)
+        second = AnswerCache(today=lambda: env.day, version=lambda: env.events_version, l2=backend)
+
+        await first.set_async("おすすめの勉強会ある？", "回答")
+
+        assert await second.get_async("おすすめの勉強会ある？") == "回答"
+        assert len(threads) == 2
+        assert threading.get_ident() not in threads
@@ -0,0 +1,193 @@
+from types import SimpleNamespace
+
+import httpx
+import pytest
+import respx
+
+import confee_agent.tools.search_connpass as search_connpass_module
+from confee_agent.mock_events import MOCK_EVENTS
+from confee_agent.tools.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from confee_agent.tools.search_connpass import (
+    CONNPASS_API_URL,
+    _search_connpass_api,
+    search_connpass,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _open_breaker(clock: FakeClock, **kwargs) -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=2, open_seconds=30, clock=clock, **kwargs)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+
+class TestCircuitBreaker:
+    """サーキットブレーカーの状態遷移のテスト"""
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = _open_breaker(FakeClock())
+
+        assert breaker.state == OPEN
+        assert breaker.allow() is False
+        assert breaker.stats()["rejected"] == 1
+
+    def test_success_resets_failure_count(self):
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success(0.1)
+        breaker.record_failure()
+
+        assert breaker.state == CLOSED
+
+    def test_slow_calls_count_as_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2, slow_call_seconds=1.0)
+        breaker.record_success(1.5)
+        breaker.record_success(2.0)
+
+        assert breaker.state == OPEN
+
+    def test_half_open_allows_single_probe_and_recovers(self):
+        clock = FakeClock()
+        breaker = _open_breaker(clock)
+        clock.now += 30
+
+        assert breaker.allow() is True
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow() is False
+        breaker.record_success(0.1)
+        assert breaker.state == CLOSED
+        assert breaker.allow() is True
+
+    def test_failed_probe_reopens(self):
+        clock = FakeClock()
+        breaker = _open_breaker(clock)
+        clock.now += 30
+        breaker.allow()
+        breaker.record_failure()
+
+        assert breaker.state == OPEN
+        assert breaker.allow() is False
+
+    def test_abandoned_probe_is_retried_after_open_seconds(self):
+        clock = FakeClock()
+        breaker = _open_breaker(clock)
+        clock.now += 30
+        assert breaker.allow() is True
+        clock.now += 30
+
+        assert breaker.allow() is True
+
+    def test_released_probe_is_given_to_next_call(self):
+        clock = FakeClock()
+        breaker = _open_breaker(clock)
+        clock.now += 30
+        assert breaker.allow() is True
+        assert breaker.allow() is False
+
+        breaker.release()
+
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow() is True
+
+
+class TestSearchConnpassApiCircuitBreaker:
+    """_search_connpass_api とサーキットブレーカーの連携テスト"""
+
+    @respx.mock
+    def test_fails_fast_while_open(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        monkeypatch.setattr(search_connpass_module, "_circuit_breaker", CircuitBreaker(failure_threshold=2))
+        route = respx.get(CONNPASS_API_URL).mock(side_effect=httpx.ConnectTimeout("timeout"))
+
+        _search_connpass_api(keyword="TypeScript")
+        _search_connpass_api(keyword="Python")
+        result = _search_connpass_api(keyword="Go")
+
+        assert route.call_count == 2
+        assert result["error"] is True
+        assert result["circuit_open"] is True
+
+    @respx.mock
+    def test_serves_last_known_good_result_as_stale(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        respx.get(CONNPASS_API_URL).mock(
+            side_effect=[
+                httpx.Response(200, json={"results_available": 1, "events": MOCK_EVENTS[:1]}),
+                httpx.ReadTimeout("timeout"),
+            ]
+        )
+        fresh = _search_connpass_api(keyword="TypeScript")
+        # 検索結果キャッシュの期限切れを想定
+        search_connpass_module._response_cache.clear()
+
+        result = search_connpass._tool_func(keyword="TypeScript")
+
+        assert fresh.stale is False
+        assert result["stale"] is True
+        assert [e["id"] for e in result["events"]] == [MOCK_EVENTS[0]["id"]]
+
+    @respx.mock
+    def test_recovers_after_successful_probe(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        clock = FakeClock()
+        breaker = _open_breaker(clock)
+        monkeypatch.setattr(search_connpass_module, "_circuit_breaker", breaker)
+        route = respx.get(CONNPASS_API_URL).mock(
+            return_value=httpx.Response(200, json={"results_available": 0, "events": []})
+        )
+
+        assert _search_connpass_api(keyword="TypeScript")["circuit_open"] is True
+        clock.now += 30
+        result = _search_connpass_api(keyword="TypeScript")
+
+        assert route.call_count == 1
+        assert result.results_returned == 0
+        assert breaker.state == CLOSED
+
+    @respx.mock
+    def test_rate_limited_probe_is_released(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        clock = FakeClock()
+        breaker = _open_breaker(clock)
+        monkeypatch.setattr(search_connpass_module, "_circuit_breaker", breaker)
+        limiter = SimpleNamespace(acquire=lambda: False, try_acquire=lambda: False)
+        monkeypatch.setattr(search_connpass_module, "_rate_limiter", limiter)
+        route = respx.get(CONNPASS_API_URL).mock(
+            return_value=httpx.Response(200, json={"results_available": 0, "events": []})
+        )
+        clock.now += 30
+
+        assert _search_connpass_api(keyword="TypeScript")["status_code"] == 429
+
+        # connpass に送っていないため、次の呼び出しがすぐに試行できる
+        limiter.acquire = lambda: True
+        result = _search_connpass_api(keyword="TypeScript")
+
+        assert route.call_count == 1
+        assert result.results_returned == 0
+        assert breaker.state == CLOSED
+
+    @respx.mock
+    def test_malformed_body_is_recorded_as_failure(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        clock = FakeClock()
+        breaker = _open_breaker(clock)
+        monkeypatch.setattr(search_connpass_module, "_circuit_breaker", breaker)
+        respx.get(CONNPASS_API_URL).mock(return_value=httpx.Response(200, content=b'{"events": ['))
+        clock.now += 30
+
+        with pytest.raises(ValueError):
+            _search_connpass_api(keyword="TypeScript")
+
+        # 試行の失敗として open に戻り、open_seconds 後に再び試行できる
+        assert breaker.state == OPEN
+        clock.now += 30
+        assert breaker.allow() is True
@@ -0,0 +1,230 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from strands.types.exceptions import ContextWindowOverflowException
+
+from confee_agent.conversation import (
+    COMPACTED_PREFIX,
+    SUMMARY_PREFIX,
+    BudgetConversationManager,
+    compact_tool_result,
+    summarize_turns,
+    tool_result_event_ids,
+)
+
+
+def _user(text: str) -> dict:
+    return {"role": "user", "content": [{"text": text}]}
+
+
+def _assistant(text: str) -> dict:
+    return {"role": "assistant", "content": [{"text": text}]}
+
+
+def _turn(question: str, answer: str, events: list[dict], tool_use_id: str) -> list[dict]:
+    """ユーザ発話 → ツール呼び出し → ツール結果 → 回答 の 1 ターン分のメッセージ。"""
+    result = {"results_returned": len(events), "events": events}
+    return [
+        _user(question),
+        {
+            "role": "assistant",
+            "content": [{"toolUse": {"toolUseId": tool_use_id, "name": "search_connpass", "input": {}}}],
+        },
+        {
+            "role": "user",
+            "content": [
+                {
+                    "toolResult": {
+                        "toolUseId": tool_use_id,
+                        "status": "success",
+                        "content": [{"text": json.dumps(result, ensure_ascii=False)}],
+                    }
+                }
+            ],
+        },
+        _assistant(answer),
+    ]
+
+
+def _events(prefix: str, n: int = 5) -> list[dict]:
+    return [
+        {"id": i, "title": f"{prefix}勉強会 {i}", "description": "詳しい説明" * 50}
+        for i in range(n)
+    ]
+
+
+def _tool_result_text(message: dict) -> str:
+    return message["content"][0]["toolResult"]["content"][0]["text"]
+
+
+class TestCompactToolResult:
+    """ツール結果の圧縮のテスト"""
+
+    def test_replaces_events_with_id_references(self):
+        tool_result = {
+            "toolUseId": "t1",
+            "status": "success",
+            "content": [{"text": json.dumps({"events": [{"id": 1, "title": "TypeScript会議"}, {"id": 2}]})}],
+        }
+
+        compacted = compact_tool_result(tool_result)
+
+        assert compacted["toolUseId"] == "t1"
+        assert compacted["status"] == "success"
+        text = compacted["content"][0]["text"]
+        assert text.startswith(COMPACTED_PREFIX)
+        assert "1「TypeScript会議」" in text
+        assert "2" in text
+
+    def test_supports_json_blocks(self):
+        compacted = compact_tool_result({"toolUseId": "t1", "content": [{"json": {"events": [{"id": 7, "title": "A"}]}}]})
+
+        assert "7「A」" in compacted["content"][0]["text"]
+
+    def test_non_event_results_are_omitted(self):
+        compacted = compact_tool_result({"toolUseId": "t1", "content": [{"text": "plain text"}]})
+
+        assert compacted["content"][0]["text"] == f"{COMPACTED_PREFIX} 結果は省略されました"
+
+    def test_already_compacted_returns_none(self):
+        compacted = compact_tool_result({"toolUseId": "t1", "content": [{"text": "x"}]})
+
+        assert compact_tool_result(compacted) is None
+
+
+class TestToolResultEventIds:
+    """会話履歴から回答に使ったイベント ID を取り出すテスト"""
+
+    def test_collects_unique_ids_from_tool_results(self):
+        messages = _turn("Q1", "A1", _events("A", 3), "t1") + _turn("Q2", "A2", _events("B", 2), "t2")
+
+        assert tool_result_event_ids(messages) == [0, 1, 2]
+
+    def test_ignores_compacted_results(self):
+        messages = _turn("Q1", "A1", _events("A", 3), "t1")
+        messages[2]["content"][0]["toolResult"] = compact_tool_result(messages[2]["content"][0]["toolResult"])
+
+        assert tool_result_event_ids(messages) == []
+
+
+class TestBudgetConversationManager:
+    """トークン予算による会話履歴管理のテスト"""
+
+    def test_compacts_tool_results_of_older_turns(self):
+        messages = _turn("TypeScriptある？", "3件あります", _events("TS"), "t1") + _turn(
+            "Pythonは？", "2件あります", _events("Py"), "t2"
+        )
+        agent = SimpleNamespace(messages=messages)
+
+        BudgetConversationManager(max_tokens=100_000).apply_management(agent)
+
+        assert _tool_result_text(messages[2]).startswith(COMPACTED_PREFIX)
+        assert "0「TS勉強会 0」" in _tool_result_text(messages[2])
+        # 直近のターンのツール結果はそのまま残す
+        assert not _tool_result_text(messages[6]).startswith(COMPACTED_PREFIX)
+        assert len(messages) == 8
+
+    def test_single_turn_is_untouched(self):
+        messages = _turn("TypeScriptある？", "3件あります", _events("TS"), "t1")
+        agent = SimpleNamespace(messages=messages)
+
+        BudgetConversationManager(max_tokens=100_000, keep_recent_turns=3).apply_management(agent)
+
+        assert not _tool_result_text(messages[2]).startswith(COMPACTED_PREFIX)
+
+    def test_drops_oldest_turns_over_budget_and_keeps_summary(self):
+        messages = []
+        for i in range(6):
+            messages += _turn(f"質問{i}", f"回答{i}です", _events(f"E{i}"), f"t{i}")
+        agent = SimpleNamespace(messages=messages)
+        manager = BudgetConversationManager(max_tokens=1500)
+
+        manager.apply_management(agent)
+
+        assert sum(len(json.dumps(m, ensure_ascii=False)) for m in messages) < 6 * 4 * 200
+        assert manager.removed_message_count > 0
+        assert messages[0]["role"] == "user"
+        summary = messages[0]["content"][0]["text"]
+        assert summary.startswith(SUMMARY_PREFIX)
+        assert "Q: 質問0" in summary
+        assert "A: 回答0です" in summary
+        # 最新のターンは残る
+        assert messages[-1] == _assistant("回答5です")
+
+    def test_summary_is_carried_over_on_next_drop(self):
+        manager = BudgetConversationManager(max_tokens=1200)
+        messages = []
+        agent = SimpleNamespace(messages=messages)
+        for i in range(8):
+            messages += _turn(f"質問{i}", f"回答{i}です", _events(f"E{i}"), f"t{i}")
+            manager.apply_management(agent)
+
+        summary = messages[0]["content"][0]["text"]
+        assert summary.count(SUMMARY_PREFIX) == 1
+        assert "Q: 質問0" in summary
+        assert "Q: 質問6" in summary
+
+    def test_history_size_stays_bounded_across_turns(self):
+        manager = BudgetConversationManager(max_tokens=2000)
+        messages = []
+        agent = SimpleNamespace(messages=messages)
+        sizes = []
+        for i in range(20):
+            messages += _turn(f"質問{i}", f"回答{i}です", _events(f"E{i}"), f"t{i}")
+            manager.apply_management(agent)
+            sizes.append(len(messages))
+
+        assert max(sizes[5:]) <= max(sizes[:5]) + 4
+
+    def test_summary_can_be_disabled(self):
+        messages = []
+        for i in range(6):
+            messages += _turn(f"質問{i}", f"回答{i}です", _events(f"E{i}"), f"t{i}")
+        agent = SimpleNamespace(messages=messages)
+
+        BudgetConversationManager(max_tokens=1500, summarize=False).apply_management(agent)
+
+        assert not messages[0]["content"][0]["text"].startswith(SUMMARY_PREFIX)
+
+    def test_reduce_context_keeps_only_latest_turn(self):
+        messages = _turn("質問0", "回答0", _events("A"), "t0") + _turn("質問1", "回答1", _events("B"), "t1")
+        agent = SimpleNamespace(messages=messages)
+
+        BudgetConversationManager(max_tokens=100_000).reduce_context(agent, e=RuntimeError("overflow"))
+
+        assert len(messages) == 4
+        assert messages[0]["content"][-1] == {"text": "質問1"}
+        assert _tool_result_text(messages[2]).startswith(COMPACTED_PREFIX)
+
+    def test_reduce_context_raises_when_nothing_to_reduce(self):
+        agent = SimpleNamespace(messages=[_user("こんにちは")])
+
+        with pytest.raises(ContextWindowOverflowException):
+            BudgetConversationManager().reduce_context(agent, e=RuntimeError("overflow"))
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("CONFEE_HISTORY_TOKEN_BUDGET", "3000")
+        monkeypatch.setenv("CONFEE_HISTORY_KEEP_TURNS", "2")
+        monkeypatch.setenv("CONFEE_HISTORY_SUMMARY", "false")
+
+        manager = BudgetConversationManager.from_env()
+
+        assert manager.max_tokens == 3000
+        assert manager.keep_recent_turns == 2
+        assert manager.summarize is False
+
+
+class TestSummarizeTurns:
+    """抽出的要約のテスト"""
+
+    def test_limits_summary_length_keeping_newest(self):
+        messages = []
+        for i in range(30):
+            messages += [_user(f"質問{i}"), _assistant(f"回答{i}")]
+
+        summary = summarize_turns(messages, max_chars=100)
+
+        assert len(summary) <= 100
+        assert "質問29" in summary
+        assert "質問0\n" not in summary
@@ -0,0 +1,324 @@
+import httpx
+import respx
+
+import confee_agent.tools.search_connpass as search_connpass_module
+
+import confee_agent.event_index as event_index_module
+from confee_agent.event_index import (
+    EventIndex,
+    EventIndexRefresher,
+    EventVersions,
+    prefecture_of,
+    upcoming_months,
+)
+from confee_agent.mock_events import MOCK_EVENTS
+from confee_agent.models import ConnpassSearchResult
+from confee_agent.tools.search_connpass import (
+    CONNPASS_API_URL,
+    _parse_event,
+    fetch_for_index,
+    search_connpass,
+)
+
+MOCK_MONTHS = {"202603", "202604"}
+# インデックスは開催月の指定がある検索にだけ応答するため、テストでは対象の全月を指定する
+ALL_MONTHS = ",".join(sorted(MOCK_MONTHS))
+
+
+def _mock_index(**kwargs) -> EventIndex:
+    return EventIndex([_parse_event(e) for e in MOCK_EVENTS], months=MOCK_MONTHS, **kwargs)
+
+
+class TestEventIndexSearch:
+    """EventIndex の検索テスト"""
+
+    def test_keyword_and_search(self):
+        result = _mock_index().search(ym=ALL_MONTHS, keyword="TypeScript")
+
+        assert [e.id for e in result.events] == [100001]
+
+    def test_keyword_matches_japanese_substring(self):
+        result = _mock_index().search(ym=ALL_MONTHS, keyword="もくもく")
+
+        assert [e.id for e in result.events] == [100002]
+
+    def test_keyword_and_requires_all_terms(self):
+        index = _mock_index()
+
+        assert index.search(ym=ALL_MONTHS, keyword="Rust,ハンズオン").results_available == 1
+        assert index.search(ym=ALL_MONTHS, keyword="Rust,TypeScript").results_available == 0
+
+    def test_keyword_or_search(self):
+        result = _mock_index().search(ym=ALL_MONTHS, keyword_or="Python,Rust", count=100)
+
+        assert {e.id for e in result.events} == {100002, 100008}
+
+    def test_keyword_is_case_insensitive(self):
+        result = _mock_index().search(ym=ALL_MONTHS, keyword="typescript")
+
+        assert [e.id for e in result.events] == [100001]
+
+    def test_ym_and_ymd_filter(self):
+        index = _mock_index()
+
+        april = index.search(ym="202604", count=100)
+        assert {e.id for e in april.events} == {100004, 100006, 100008, 100009}
+        day = index.search(ymd="20260315")
+        assert [e.id for e in day.events] == [100001]
+
+    def test_prefecture_filter(self):
+        index = _mock_index()
+
+        osaka = index.search(ym=ALL_MONTHS, prefecture="osaka")
+        assert [e.id for e in osaka.events] == [100008]
+        online = index.search(ym=ALL_MONTHS, prefecture="online", count=100)
+        assert {e.id for e in online.events} == {100003, 100009}
+
+    def test_order_by_started_at_desc(self):
+        result = _mock_index().search(ym="202603", order=2, count=100)
+
+        started = [e.started_at for e in result.events]
+        assert started == sorted(started, reverse=True)
+
+    def test_pagination(self):
+        index = _mock_index()
+
+        first = index.search(ym=ALL_MONTHS, order=2, start=1, count=3)
+        second = index.search(ym=ALL_MONTHS, order=2, start=4, count=3)
+
+        assert first.results_available == 10
+        assert second.results_start == 4
+        assert not {e.id for e in first.events} & {e.id for e in second.events}
+
+    def test_out_of_coverage_returns_none(self):
+        index = _mock_index(prefectures={"tokyo"})
+
+        assert index.search(ym="202612") is None
+        assert index.search(ymd="20261201") is None
+        assert index.search(ym="202603", prefecture="osaka") is None
+        assert index.search(ym="202603", prefecture="tokyo") is not None
+
+    def test_nationwide_search_on_prefecture_index_returns_none(self):
+        index = _mock_index(prefectures={"tokyo"})
+
+        assert index.covers(ym="202603") is False
+        assert index.search(ym="202603") is None
+
+    def test_search_without_date_returns_none(self):
+        index = _mock_index()
+
+        assert index.covers() is False
+        assert index.search(keyword="TypeScript") is None
+
+    def test_invalid_ymd_returns_none(self):
+        index = _mock_index()
+
+        assert index.search(ymd="20260399") is None
+        assert index.search(ymd="2026031") is None
+
+    def test_prefecture_of(self):
+        events = {e["id"]: _parse_event(e) for e in MOCK_EVENTS}
+
+        assert prefecture_of(events[100001]) == "tokyo"
+        assert prefecture_of(events[100003]) == "online"
+
+
+
+class TestEventIndexVersion:
+    """イベントの変更検出用 version のテスト"""
+
+    def test_version_is_stable_for_same_events(self):
+        assert _mock_index().version == _mock_index().version
+
+    def test_version_changes_when_event_is_updated(self):
+        events = [_parse_event(e) for e in MOCK_EVENTS]
+        updated = [_parse_event({**MOCK_EVENTS[0], "updated_at": "2099-01-01T00:00:00+09:00"})] + events[1:]
+
+        assert EventIndex(events, months=MOCK_MONTHS).version != EventIndex(updated, months=MOCK_MONTHS).version
+
+    def test_current_version_follows_published_index(self):
+        assert event_index_module.current_version() is None
+
+        index = _mock_index()
+        event_index_module.publish_index(index)
+
+        assert event_index_module.current_version() == index.version
+
+
+class TestEventVersions:
+    """回答に使ったイベントの更新検出のテスト"""
+
+    def test_changed_after_event_is_updated(self):
+        versions = EventVersions()
+        versions.record([_parse_event(e) for e in MOCK_EVENTS])
+        fingerprint = versions.fingerprint([100001, 100002])
+
+        assert not versions.changed(fingerprint)
+
+        versions.record([_parse_event({**MOCK_EVENTS[0], "updated_at": "2099-01-01T00:00:00+09:00"})])
+
+        assert versions.changed(fingerprint)
+
+    def test_unseen_events_are_not_in_fingerprint(self):
+        versions = EventVersions()
+        versions.record([_parse_event(MOCK_EVENTS[0])])
+
+        assert versions.fingerprint([100001, 999999]) == {"100001": MOCK_EVENTS[0]["updated_at"]}
+
+    def test_forgotten_events_count_as_unchanged(self):
+        versions = EventVersions(max_entries=1)
+        versions.record([_parse_event(MOCK_EVENTS[0])])
+        fingerprint = versions.fingerprint([100001])
+        versions.record([_parse_event(MOCK_EVENTS[1])])
+
+        assert not versions.changed(fingerprint)
+
+    @respx.mock
+    def test_search_records_updated_at_without_index(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-key")
+        respx.get(CONNPASS_API_URL).mock(
+            return_value=httpx.Response(
+                200,
+                json={"results_returned": 1, "results_available": 1, "results_start": 1, "events": MOCK_EVENTS[:1]},
+            )
+        )
+
+        search_connpass(keyword="TypeScript")
+
+        assert event_index_module.event_fingerprint([100001]) == {"100001": MOCK_EVENTS[0]["updated_at"]}
+
+
+class TestEventIndexRefresher:
+    """EventIndexRefresher のテスト"""
+
+    def teardown_method(self):
+        event_index_module.publish_index(None)
+
+    def test_refresh_publishes_index(self):
+        calls = []
+
+        def fetch(ym, prefecture):
+            calls.append((ym, prefecture))
+            return ConnpassSearchResult(0, 0, 1, [])
+
+        refresher = EventIndexRefresher(fetch=fetch, months_ahead=2, prefectures=["tokyo", "online"])
+        index = refresher.refresh_once()
+
+        assert len(calls) == 4
+        assert event_index_module.current_index(max_age=60) is index
+
+    def test_failed_refresh_keeps_previous_index(self):
+        previous = _mock_index()
+        event_index_module.publish_index(previous)
+
+        refresher = EventIndexRefresher(fetch=lambda ym, prefecture: {"error": True, "message": "down"})
+
+        assert refresher.refresh_once() is None
+        assert event_index_module.current_index(max_age=60) is previous
+
+    def test_stale_index_is_not_used(self):
+        event_index_module.publish_index(_mock_index(built_at=0))
+
+        assert event_index_module.current_index(max_age=60) is None
+
+    def test_upcoming_months_wraps_year(self):
+        from datetime import datetime
+
+        assert upcoming_months(3, now=datetime(2026, 11, 20)) == ["202611", "202612", "202701"]
+
+
+def _page_response(request: httpx.Request, available: int = 250) -> httpx.Response:
+    """start から 100 件分（最終ページは残りの件数分）の申し込み可能なイベントを返す。"""
+    start = int(request.url.params.get("start", "1"))
+    events = [
+        {**MOCK_EVENTS[0], "id": i, "title": f"勉強会 {i}"}
+        for i in range(start, min(start + 100, available + 1))
+    ]
+    return httpx.Response(200, json={"results_available": available, "results_start": start, "events": events})
+
+
+class TestFetchForIndex:
+    """インデックス構築用の全件取得のテスト"""
+
+    @respx.mock
+    def test_fetches_all_pages(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        respx.get(CONNPASS_API_URL).mock(side_effect=_page_response)
+
+        result = fetch_for_index("202603")
+
+        assert result.results_returned == 250
+
+    @respx.mock
+    def test_page_error_fails_whole_fetch(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+
+        def respond(request):
+            if request.url.params.get("start") == "101":
+                return httpx.Response(429)
+            return _page_response(request)
+
+        respx.get(CONNPASS_API_URL).mock(side_effect=respond)
+        previous = _mock_index()
+        event_index_module.publish_index(previous)
+        refresher = EventIndexRefresher(fetch=fetch_for_index, months_ahead=1)
+
+        assert isinstance(fetch_for_index("202603"), dict)
+        assert refresher.refresh_once() is None
+        assert event_index_module.current_index(max_age=60) is previous
+
+    @respx.mock
+    def test_stale_page_fails_whole_fetch(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        respx.get(CONNPASS_API_URL).mock(side_effect=_page_response)
+        fetch_for_index("202603")
+        search_connpass_module._response_cache.clear()
+
+        def respond(request):
+            if request.url.params.get("start") == "201":
+                return httpx.Response(500)
+            return _page_response(request)
+
+        respx.get(CONNPASS_API_URL).mock(side_effect=respond)
+
+        # 3 ページ目は以前に取得した結果（stale）で補われるが、インデックスには使わない
+        assert isinstance(fetch_for_index("202603"), dict)
+
+    @respx.mock
+    def test_too_many_events_fails_fetch(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        monkeypatch.setenv("CONNPASS_INDEX_MAX_EVENTS_PER_QUERY", "200")
+        route = respx.get(CONNPASS_API_URL).mock(side_effect=_page_response)
+
+        assert isinstance(fetch_for_index("202603"), dict)
+        assert route.call_count == 1
+
+
+class TestSearchConnpassUsesIndex:
+    """search_connpass がインデックスから応答するテスト"""
+
+    def teardown_method(self):
+        event_index_module.publish_index(None)
+
+    @respx.mock
+    def test_fresh_index_answers_without_api_call(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        route = respx.get(CONNPASS_API_URL).mock(return_value=httpx.Response(500))
+        event_index_module.publish_index(_mock_index())
+
+        result = search_connpass._tool_func(keyword="TypeScript", ym="202603")
+
+        assert route.call_count == 0
+        assert [e["id"] for e in result["events"]] == [100001]
+
+    @respx.mock
+    def test_out_of_coverage_falls_back_to_api(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        route = respx.get(CONNPASS_API_URL).mock(
+            return_value=httpx.Response(200, json={"events": []})
+        )
+        event_index_module.publish_index(_mock_index())
+
+        search_connpass._tool_func(keyword="TypeScript", ym="202701")
+
+        assert route.call_count == 1
@@ -0,0 +1,113 @@
+import json
+
+import httpx
+import pytest
+import respx
+
+from confee_agent.mock_events import MOCK_EVENTS
+from confee_agent.tools.event_stream import EventStream
+from confee_agent.tools.search_connpass import CONNPASS_API_URL, _search_connpass_api
+
+
+# 偶数番目を申し込み終了にしたイベント
+MIXED_EVENTS = [{**e, "open_status": "close"} if i % 2 == 0 else e for i, e in enumerate(MOCK_EVENTS)]
+
+
+def _body(events: list[dict], **fields) -> bytes:
+    data = {"results_returned": len(events), "results_available": 123, "results_start": 1, **fields}
+    data["events"] = events
+    return json.dumps(data, ensure_ascii=False).encode()
+
+
+def _parse(body: bytes, chunk_size: int, **kwargs) -> EventStream:
+    stream = EventStream(**kwargs)
+    for i in range(0, len(body), chunk_size):
+        stream.feed(body[i : i + chunk_size])
+    stream.close()
+    return stream
+
+
+class TestEventStream:
+    """events 配列を受信しながらパースするテスト"""
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, 4096])
+    def test_same_result_for_any_chunk_size(self, chunk_size):
+        body = _body(MOCK_EVENTS)
+
+        stream = _parse(body, chunk_size)
+
+        assert stream.items == MOCK_EVENTS
+        assert stream.fields == {"results_returned": len(MOCK_EVENTS), "results_available": 123, "results_start": 1}
+        assert stream.bytes_read == len(body)
+
+    def test_filters_and_projects_items(self):
+        projected = []
+
+        def project(item):
+            projected.append(item["id"])
+            return item["id"]
+
+        stream = _parse(
+            _body(MIXED_EVENTS),
+            16,
+            keep=lambda item: item["open_status"] in {"open", "preopen"},
+            project=project,
+        )
+
+        expected = [e["id"] for e in MIXED_EVENTS if e["open_status"] in {"open", "preopen"}]
+        assert stream.items == expected
+        assert projected == expected
+        assert stream.skipped == len(MIXED_EVENTS) - len(expected)
+
+    def test_fields_after_events_and_whitespace(self):
+        body = b'{\n  "events" : [ {"id": 1} ,\n {"id": 2} ],\n  "results_available" : 1234\n}\n'
+
+        stream = _parse(body, 5)
+
+        assert stream.items == [{"id": 1}, {"id": 2}]
+        assert stream.fields == {"results_available": 1234}
+
+    def test_number_split_across_chunks(self):
+        stream = EventStream()
+        stream.feed(b'{"results_available": 12')
+        stream.feed(b'34, "events": []}')
+        stream.close()
+
+        assert stream.fields["results_available"] == 1234
+
+    def test_multibyte_character_split_across_chunks(self):
+        body = _body([{"id": 1, "title": "もくもく会"}])
+
+        stream = _parse(body, 1)
+
+        assert stream.items[0]["title"] == "もくもく会"
+
+    def test_buffers_only_unfinished_item(self):
+        stream = EventStream()
+        body = _body(MOCK_EVENTS)
+        stream.feed(body[: len(body) - 10])
+
+        assert len(stream._buf) < len(json.dumps(MOCK_EVENTS[-1], ensure_ascii=False))
+
+    @pytest.mark.parametrize("body", [b'{"events": [{"id": 1}', b'{"events": [}', b"[]", b'{"a": 1} x'])
+    def test_invalid_json_raises(self, body):
+        with pytest.raises(ValueError):
+            _parse(body, 4)
+
+
+class TestSearchConnpassApiStreaming:
+    """_search_connpass_api が受信しながらパースするテスト"""
+
+    @respx.mock
+    def test_chunked_response(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        body = _body(MIXED_EVENTS)
+        chunks = [body[i : i + 100] for i in range(0, len(body), 100)]
+        respx.get(CONNPASS_API_URL).mock(return_value=httpx.Response(200, content=iter(chunks)))
+
+        result = _search_connpass_api(keyword="Python")
+
+        active = [e["id"] for e in MIXED_EVENTS if e["open_status"] in {"open", "preopen"}]
+        assert [e.id for e in result.events] == active
+        assert result.results_returned == len(active)
+        assert result.results_available == 123
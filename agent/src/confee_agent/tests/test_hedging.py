@@ -0,0 +1,292 @@
+import asyncio
+import itertools
+import json
+import threading
+import time
+
+import httpx
+import pytest
+import respx
+
+import confee_agent.tools.search_connpass as search_connpass_module
+from confee_agent.mock_events import MOCK_EVENTS
+from confee_agent.tools.hedging import HedgeCancelled, Hedger, LatencyTracker
+from confee_agent.tools.search_connpass import (
+    CONNPASS_API_URL,
+    _search_connpass_api,
+    _search_connpass_api_async,
+    hedge_stats,
+)
+
+
+def _hedger(**kwargs) -> Hedger:
+    tracker = LatencyTracker()
+    for _ in range(20):
+        tracker.record(0.01)
+    options = {"enabled": True, "budget_ratio": 1.0, "min_delay_seconds": 0.01, "tracker": tracker}
+    return Hedger(**{**options, **kwargs})
+
+
+def _slow_then_fast(slow_seconds: float = 1.0, threads: list | None = None):
+    """1 回目の呼び出しだけ遅い関数を返す。遅い間に中断の合図を受けたら HedgeCancelled を送出する。"""
+    counter = itertools.count()
+
+    def fn(cancelled):
+        call = next(counter)
+        if threads is not None:
+            threads.append(threading.get_ident())
+        if call == 0:
+            if cancelled.wait(slow_seconds):
+                raise HedgeCancelled()
+            return "primary"
+        return "hedge"
+
+    return fn
+
+
+class TestLatencyTracker:
+    """所要時間のパーセンタイルのテスト"""
+
+    def test_percentile(self):
+        tracker = LatencyTracker()
+        for ms in range(1, 101):
+            tracker.record(ms / 1000)
+
+        assert tracker.percentile(0.95) == 0.095
+        assert tracker.percentile(0.5) == 0.05
+
+    def test_empty(self):
+        assert LatencyTracker().percentile(0.95) is None
+
+
+class TestHedger:
+    """ヘッジのテスト"""
+
+    def test_disabled_runs_once(self):
+        hedger = Hedger(enabled=False)
+
+        assert hedger.run(lambda cancelled: "ok") == ("ok", False)
+
+    def test_no_hedge_until_enough_samples(self):
+        hedger = Hedger(enabled=True, min_samples=20)
+
+        assert hedger.hedge_delay() is None
+
+    def test_delay_follows_percentile(self):
+        hedger = _hedger(min_delay_seconds=0.0)
+
+        assert hedger.hedge_delay() == 0.01
+
+    def test_slow_primary_is_hedged(self):
+        hedger = _hedger()
+
+        assert hedger.run(_slow_then_fast(0.5)) == ("hedge", True)
+        assert hedger.stats()["hedge_wins"] == 1
+
+    def test_fast_primary_is_not_hedged(self):
+        hedger = _hedger(min_delay_seconds=1.0)
+
+        assert hedger.run(lambda cancelled: "primary") == ("primary", False)
+        assert hedger.stats()["hedges"] == 0
+
+    def test_budget_limits_hedges(self):
+        hedger = _hedger(budget_ratio=0.5)
+
+        assert hedger.run(_slow_then_fast(0.1)) == ("primary", False)
+        assert hedger.run(_slow_then_fast(0.5)) == ("hedge", True)
+        assert hedger.stats()["hedges"] == 1
+
+    def test_can_hedge_false_waits_for_primary(self):
+        hedger = _hedger()
+
+        assert hedger.run(_slow_then_fast(0.1), can_hedge=lambda: False) == ("primary", False)
+
+    def test_failed_hedge_falls_back_to_primary(self):
+        hedger = _hedger()
+        counter = itertools.count()
+
+        def fn(cancelled):
+            if next(counter) == 0:
+                time.sleep(0.1)
+                return "primary"
+            raise RuntimeError("hedge failed")
+
+        assert hedger.run(fn) == ("primary", True)
+
+    def test_failed_primary_falls_back_to_hedge(self):
+        hedger = _hedger()
+        counter = itertools.count()
+
+        def fn(cancelled):
+            if next(counter) == 0:
+                time.sleep(0.1)
+                raise RuntimeError("primary failed")
+            return "hedge"
+
+        assert hedger.run(fn) == ("hedge", True)
+
+    def test_failed_primary_without_hedge_raises(self):
+        hedger = _hedger(min_delay_seconds=1.0)
+
+        def fn(cancelled):
+            raise RuntimeError("primary failed")
+
+        with pytest.raises(RuntimeError):
+            hedger.run(fn)
+        assert hedger.stats()["hedges"] == 0
+
+    def test_runs_on_caller_thread_without_hedging(self):
+        threads = []
+
+        assert Hedger(enabled=False).run(_slow_then_fast(0.0, threads)) == ("primary", False)
+        assert threads == [threading.get_ident()]
+
+    def test_hedge_result_is_returned_while_primary_stalls(self):
+        hedger = _hedger()
+        counter = itertools.count()
+
+        def fn(cancelled):
+            if next(counter) == 0:
+                # 中断の合図を確認できない（応答ヘッダを待っている）最初のリクエスト
+                time.sleep(1.0)
+                return "primary"
+            return "hedge"
+
+        started = time.monotonic()
+
+        assert hedger.run(fn) == ("hedge", True)
+        assert time.monotonic() - started < 0.5
+
+    def test_slow_hedge_is_cancelled_when_primary_wins(self):
+        hedger = _hedger()
+        counter = itertools.count()
+        hedge_cancelled = threading.Event()
+
+        def fn(cancelled):
+            if next(counter) == 0:
+                time.sleep(0.1)
+                return "primary"
+            if cancelled.wait(5):
+                hedge_cancelled.set()
+                raise HedgeCancelled()
+            return "hedge"
+
+        assert hedger.run(fn) == ("primary", True)
+        assert hedge_cancelled.wait(timeout=1)
+
+    def test_no_hedge_when_all_workers_are_busy(self):
+        hedger = _hedger(max_workers=1)
+        release = threading.Event()
+        started = threading.Event()
+
+        def busy(cancelled):
+            started.set()
+            release.wait(timeout=5)
+            return "busy"
+
+        # 1 本目のリクエストがヘッジ用のスレッドの枠を使っている間に、2 本目を実行する
+        thread = threading.Thread(target=hedger.run, args=(busy,))
+        thread.start()
+        assert started.wait(timeout=5)
+        try:
+            assert hedger.run(_slow_then_fast(0.1)) == ("primary", False)
+        finally:
+            release.set()
+            thread.join(timeout=5)
+
+    @pytest.mark.asyncio
+    async def test_async_hedge_cancels_slow_primary(self):
+        hedger = _hedger()
+        counter = itertools.count()
+        cancelled = threading.Event()
+
+        async def fn():
+            if next(counter) == 0:
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+                return "primary"
+            return "hedge"
+
+        assert await hedger.run_async(fn) == ("hedge", True)
+        await asyncio.sleep(0)
+        assert cancelled.is_set()
+
+
+class TestSearchConnpassApiHedging:
+    """_search_connpass_api のタイムアウト設定とヘッジのテスト"""
+
+    def test_timeouts_are_split(self):
+        timeout = search_connpass_module._timeout
+
+        assert timeout.connect == 2.0
+        assert timeout.read == 5.0
+        assert timeout.pool == 1.0
+
+    @respx.mock
+    def test_request_stalled_before_headers_is_hedged(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        monkeypatch.setattr(search_connpass_module, "_hedger", _hedger())
+        counter = itertools.count()
+
+        def respond(request):
+            if next(counter) == 0:
+                time.sleep(1.0)
+            return httpx.Response(200, json={"results_available": 1, "events": MOCK_EVENTS[:1]})
+
+        respx.get(CONNPASS_API_URL).mock(side_effect=respond)
+
+        started = time.monotonic()
+        result = _search_connpass_api(keyword="TypeScript")
+
+        assert result.results_returned == 1
+        assert time.monotonic() - started < 0.5
+        assert hedge_stats()["hedge_wins"] == 1
+
+    @respx.mock
+    def test_slow_body_is_hedged(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        monkeypatch.setattr(search_connpass_module, "_hedger", _hedger())
+        counter = itertools.count()
+        body = json.dumps({"results_available": 1, "events": MOCK_EVENTS[:1]}).encode()
+
+        def slow_body():
+            # 本文を少しずつ返す遅いレスポンス。中断の合図は本文の受信の合間に確認される
+            for i in range(0, len(body), 64):
+                time.sleep(0.05)
+                yield body[i : i + 64]
+
+        def respond(request):
+            if next(counter) == 0:
+                return httpx.Response(200, content=slow_body())
+            return httpx.Response(200, content=body)
+
+        respx.get(CONNPASS_API_URL).mock(side_effect=respond)
+
+        started = time.monotonic()
+        result = _search_connpass_api(keyword="TypeScript")
+
+        assert result.results_returned == 1
+        assert time.monotonic() - started < 0.5
+        assert hedge_stats()["hedge_wins"] == 1
+
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_slow_async_request_is_hedged(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        monkeypatch.setattr(search_connpass_module, "_hedger", _hedger())
+        counter = itertools.count()
+
+        async def respond(request):
+            if next(counter) == 0:
+                await asyncio.sleep(5)
+            return httpx.Response(200, json={"results_available": 1, "events": MOCK_EVENTS[:1]})
+
+        respx.get(CONNPASS_API_URL).mock(side_effect=respond)
+
+        result = await asyncio.wait_for(_search_connpass_api_async(keyword="TypeScript"), timeout=2)
+
+        assert result.results_returned == 1
+        assert hedge_stats()["hedge_wins"] == 1
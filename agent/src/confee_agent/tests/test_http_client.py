@@ -0,0 +1,78 @@
+import asyncio
+
+import httpx
+import pytest
+import respx
+
+from confee_agent.tools import http_client
+from confee_agent.tools.search_connpass import CONNPASS_API_URL, _search_connpass_api
+
+
+class TestSharedHttpClient:
+    """共有 HTTP クライアントのテスト"""
+
+    def test_client_is_reused(self):
+        first = http_client.get_client()
+        second = http_client.get_client()
+
+        assert first is second
+
+    def test_close_client_recreates_on_next_call(self):
+        first = http_client.get_client()
+        http_client.close_client()
+
+        assert first.is_closed
+        assert http_client.get_client() is not first
+
+    def test_pool_limits_from_env(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_POOL_MAX_CONNECTIONS", "7")
+        monkeypatch.setenv("CONNPASS_POOL_MAX_KEEPALIVE", "3")
+        monkeypatch.setenv("CONNPASS_KEEPALIVE_EXPIRY_SECONDS", "12.5")
+
+        limits = http_client._pool_limits()
+
+        assert limits.max_connections == 7
+        assert limits.max_keepalive_connections == 3
+        assert limits.keepalive_expiry == 12.5
+
+    def test_invalid_env_falls_back_to_default(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_POOL_MAX_CONNECTIONS", "many")
+
+        limits = http_client._pool_limits()
+
+        assert limits.max_connections == http_client.DEFAULT_POOL_MAX_CONNECTIONS
+
+    @respx.mock
+    def test_search_uses_shared_client(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        respx.get(CONNPASS_API_URL).mock(
+            return_value=httpx.Response(200, json={"events": []})
+        )
+
+        _search_connpass_api(keyword="TypeScript")
+        client = http_client.get_client()
+        _search_connpass_api(keyword="Python")
+
+        assert http_client.get_client() is client
+
+
+class TestSharedAsyncHttpClient:
+    """イベントループごとの非同期 HTTP クライアントのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_async_client_is_reused_within_loop(self):
+        first = http_client.get_async_client()
+        second = http_client.get_async_client()
+
+        assert first is second
+        await http_client.aclose_async_client()
+        assert first.is_closed
+
+    def test_async_client_is_per_event_loop(self):
+        async def _get():
+            return http_client.get_async_client()
+
+        first = asyncio.run(_get())
+        second = asyncio.run(_get())
+
+        assert first is not second
@@ -1,3 +1,5 @@
+import asyncio
+import inspect
 from unittest.mock import MagicMock, patch
 
 import confee_agent.main as main_module
@@ -7,10 +9,12 @@ class TestMainEntrypoint:
     """main.py BedrockAgentCoreApp エントリポイントテスト"""
 
     def setup_method(self):
-        main_module._confee = None
+        main_module._registry = None
+        main_module._shared_model = None
 
     def teardown_method(self):
-        main_module._confee = None
+        main_module._registry = None
+        main_module._shared_model = None
 
     @patch("confee_agent.main.ConfeeAgent")
     def test_invoke_extracts_prompt_from_payload(self, mock_confee_cls):
@@ -53,3 +57,168 @@ class TestMainEntrypoint:
 
         mock_confee_cls.assert_called_once()
         mock_confee.create_agent.assert_called_once()
+
+    @patch("confee_agent.main.ConfeeAgent")
+    def test_invoke_returns_async_generator_when_streaming(self, mock_confee_cls):
+        async def fake_stream(prompt):
+            yield {"data": "おすすめ"}
+            yield {"data": "です"}
+
+        mock_confee = MagicMock()
+        mock_confee.stream = fake_stream
+        mock_confee_cls.return_value = mock_confee
+
+        result = main_module.invoke({"prompt": "テスト", "stream": True})
+
+        assert inspect.isasyncgen(result)
+        events = asyncio.run(_collect(result))
+        assert events == [{"data": "おすすめ"}, {"data": "です"}]
+        mock_confee.invoke.assert_not_called()
+
+    @patch("confee_agent.main.ConfeeAgent")
+    def test_streaming_error_is_sent_as_text(self, mock_confee_cls):
+        async def failing_stream(prompt):
+            yield {"data": "途中"}
+            raise RuntimeError("boom")
+
+        mock_confee = MagicMock()
+        mock_confee.stream = failing_stream
+        mock_confee_cls.return_value = mock_confee
+
+        events = asyncio.run(_collect(main_module.invoke({"prompt": "テスト", "stream": True})))
+
+        assert events == [{"data": "途中"}, {"data": "エラーが発生しました: boom"}]
+
+
+async def _collect(stream) -> list:
+    return [event async for event in stream]
+
+
+class TestWarmUp:
+    """コンテナ起動時のウォームアップのテスト"""
+
+    def setup_method(self):
+        main_module._registry = None
+        main_module._shared_model = None
+
+    def teardown_method(self):
+        main_module._registry = None
+        main_module._shared_model = None
+
+    @patch("confee_agent.main.emit_metrics")
+    @patch("confee_agent.main._search_connpass_api")
+    @patch("confee_agent.main.get_client")
+    @patch("confee_agent.main._get_api_key")
+    @patch("confee_agent.main.ConfeeAgent")
+    def test_warm_up_initializes_agent_api_key_and_http_pool(
+        self, mock_confee_cls, mock_get_api_key, mock_get_client, mock_search, mock_emit, monkeypatch
+    ):
+        monkeypatch.delenv("CONFEE_WARMUP_PRIME", raising=False)
+
+        timings = main_module.warm_up()
+
+        mock_confee_cls.return_value.create_agent.assert_called_once()
+        mock_get_api_key.assert_called_once()
+        mock_get_client.assert_called_once()
+        mock_search.assert_not_called()
+        assert {"ImportMs", "AgentInitMs", "ApiKeyMs", "HttpPoolMs", "ColdStartMs"} <= timings.keys()
+        mock_emit.assert_called_once()
+        assert mock_emit.call_args.args[0] == timings
+
+        # ウォームアップ後の最初のリクエストではエージェントを作り直さない
+        main_module.invoke({"prompt": "テスト"})
+        mock_confee_cls.assert_called_once()
+
+    @patch("confee_agent.main.emit_metrics")
+    @patch("confee_agent.main._search_connpass_api")
+    @patch("confee_agent.main.get_client")
+    @patch("confee_agent.main._get_api_key")
+    @patch("confee_agent.main.ConfeeAgent")
+    def test_warm_up_sends_priming_request_when_enabled(
+        self, mock_confee_cls, mock_get_api_key, mock_get_client, mock_search, mock_emit, monkeypatch
+    ):
+        monkeypatch.setenv("CONFEE_WARMUP_PRIME", "true")
+
+        timings = main_module.warm_up()
+
+        mock_search.assert_called_once_with(count=1)
+        assert "PrimingRequestMs" in timings
+
+    @patch("confee_agent.main.emit_metrics")
+    @patch("confee_agent.main.get_client")
+    @patch("confee_agent.main._get_api_key", side_effect=RuntimeError("secrets unavailable"))
+    @patch("confee_agent.main.ConfeeAgent")
+    def test_warm_up_continues_when_step_fails(
+        self, mock_confee_cls, mock_get_api_key, mock_get_client, mock_emit
+    ):
+        timings = main_module.warm_up()
+
+        mock_get_client.assert_called_once()
+        assert "ApiKeyMs" in timings
+        mock_emit.assert_called_once()
+
+
+class TestDeferredImports:
+    """CONFEE_LAZY_IMPORTS 用の遅延 import のテスト"""
+
+    def test_load_deferred_imports_restores_missing_attributes(self, monkeypatch):
+        from confee_agent.agent import ConfeeAgent
+
+        monkeypatch.delattr(main_module, "ConfeeAgent")
+
+        main_module._load_deferred_imports()
+
+        assert main_module.ConfeeAgent is ConfeeAgent
+
+    def test_load_deferred_imports_keeps_existing_attributes(self, monkeypatch):
+        sentinel = MagicMock()
+        monkeypatch.setattr(main_module, "get_client", sentinel)
+
+        main_module._load_deferred_imports()
+
+        assert main_module.get_client is sentinel
+
+
+class TestSessions:
+    """runtimeSessionId ごとの会話分離のテスト"""
+
+    def setup_method(self):
+        main_module._registry = None
+        main_module._shared_model = None
+
+    def teardown_method(self):
+        main_module._registry = None
+        main_module._shared_model = None
+
+    @patch("confee_agent.main.ConfeeAgent")
+    def test_each_session_gets_its_own_agent_sharing_the_model(self, mock_confee_cls):
+        agents = []
+
+        def create(**kwargs):
+            confee = MagicMock()
+            confee.model = kwargs["model"] or MagicMock(name="shared-model")
+            confee.invoke.return_value = {"response": "ok"}
+            agents.append((confee, kwargs["model"]))
+            return confee
+
+        mock_confee_cls.side_effect = create
+
+        main_module.invoke({"prompt": "質問1"}, MagicMock(session_id="session-a"))
+        main_module.invoke({"prompt": "質問2"}, MagicMock(session_id="session-b"))
+        main_module.invoke({"prompt": "質問3"}, MagicMock(session_id="session-a"))
+
+        assert len(agents) == 2
+        (agent_a, model_a), (agent_b, model_b) = agents
+        assert model_a is None
+        assert model_b is agent_a.model
+        assert agent_a.invoke.call_count == 2
+        assert agent_b.invoke.call_count == 1
+
+    @patch("confee_agent.main.ConfeeAgent")
+    def test_invoke_without_context_uses_default_session(self, mock_confee_cls):
+        mock_confee_cls.return_value.invoke.return_value = {"response": "ok"}
+
+        main_module.invoke({"prompt": "質問"})
+        main_module.invoke({"prompt": "質問"}, MagicMock(session_id=None))
+
+        mock_confee_cls.assert_called_once()
@@ -0,0 +1,31 @@
+import json
+
+from confee_agent.metrics import NAMESPACE, emit_metrics
+
+
+class TestEmitMetrics:
+    """EMF 形式のメトリクス出力のテスト"""
+
+    def test_writes_single_emf_line(self, capsys):
+        emit_metrics({"ColdStartMs": 1234.5, "ApiKeyMs": 10.0}, dimensions={"Service": "confee-agent"})
+
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 1
+        record = json.loads(lines[0])
+        directive = record["_aws"]["CloudWatchMetrics"][0]
+        assert directive["Namespace"] == NAMESPACE
+        assert directive["Dimensions"] == [["Service"]]
+        assert directive["Metrics"] == [
+            {"Name": "ColdStartMs", "Unit": "Milliseconds"},
+            {"Name": "ApiKeyMs", "Unit": "Milliseconds"},
+        ]
+        assert record["Service"] == "confee-agent"
+        assert record["ColdStartMs"] == 1234.5
+        assert isinstance(record["_aws"]["Timestamp"], int)
+
+    def test_supports_custom_unit_without_dimensions(self, capsys):
+        record = emit_metrics({"Requests": 3}, unit="Count")
+
+        assert record["_aws"]["CloudWatchMetrics"][0]["Dimensions"] == [[]]
+        assert record["_aws"]["CloudWatchMetrics"][0]["Metrics"] == [{"Name": "Requests", "Unit": "Count"}]
+        assert json.loads(capsys.readouterr().out) == record
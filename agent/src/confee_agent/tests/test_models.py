@@ -0,0 +1,95 @@
+import dataclasses
+
+import pytest
+
+from confee_agent.models import (
+    MISSING,
+    ConnpassEvent,
+    ConnpassEventColumns,
+    ConnpassSearchResult,
+    parse_epoch,
+)
+
+
+def _make_event(event_id: int, started_at: str | None, accepted: int = 10, limit: int | None = 20) -> ConnpassEvent:
+    return ConnpassEvent(
+        id=event_id,
+        title=f"Event {event_id}",
+        catch=None,
+        description=None,
+        url=f"https://connpass.com/event/{event_id}/",
+        started_at=started_at,
+        ended_at=None,
+        place=None,
+        address=None,
+        accepted=accepted,
+        waiting=0,
+        limit=limit,
+        event_type="participation",
+        open_status="open",
+    )
+
+
+class TestModelsAreCompact:
+    """データクラスの slots / frozen のテスト"""
+
+    def test_event_has_no_instance_dict(self):
+        event = _make_event(1, None)
+
+        assert not hasattr(event, "__dict__")
+
+    def test_event_is_immutable(self):
+        event = _make_event(1, None)
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            event.title = "changed"
+
+    def test_search_result_is_immutable(self):
+        result = ConnpassSearchResult(0, 0, 1, [])
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            result.results_returned = 1
+
+
+class TestConnpassEventColumns:
+    """列指向コンテナのテスト"""
+
+    def test_parse_epoch(self):
+        assert parse_epoch("2026-03-15T10:00:00+09:00") == 1773536400
+        assert parse_epoch(None) == MISSING
+        assert parse_epoch("invalid") == MISSING
+
+    def test_columns_are_parallel(self):
+        events = [
+            _make_event(1, "2026-03-15T10:00:00+09:00", accepted=5, limit=None),
+            _make_event(2, "2026-03-10T10:00:00+09:00", accepted=15, limit=30),
+        ]
+
+        columns = ConnpassEventColumns.from_events(events)
+
+        assert len(columns) == 2
+        assert list(columns.ids) == [1, 2]
+        assert list(columns.limit) == [MISSING, 30]
+        assert columns.fill_ratios() == [0.0, 0.5]
+
+    def test_argsort_by_started_at_puts_unknown_last(self):
+        events = [
+            _make_event(1, None),
+            _make_event(2, "2026-03-15T10:00:00+09:00"),
+            _make_event(3, "2026-03-10T10:00:00+09:00"),
+        ]
+        columns = ConnpassEventColumns.from_events(events)
+
+        assert [e.id for e in columns.take(columns.argsort_by_started_at())] == [3, 2, 1]
+        assert [e.id for e in columns.take(columns.argsort_by_started_at(descending=True))] == [2, 3, 1]
+
+    def test_starting_between(self):
+        events = [
+            _make_event(1, "2026-03-01T00:00:00+09:00"),
+            _make_event(2, "2026-04-01T00:00:00+09:00"),
+        ]
+        columns = ConnpassEventColumns.from_events(events)
+        start = parse_epoch("2026-03-01T00:00:00+09:00")
+        end = parse_epoch("2026-04-01T00:00:00+09:00")
+
+        assert columns.starting_between(start, end) == [0]
@@ -0,0 +1,72 @@
+from array import array
+
+import pytest
+
+from confee_agent.ngram_index import NgramIndex, _intersect
+
+TEXTS = [
+    "python機械学習もくもく会 #42",
+    "typescript conference 2026",
+    "rust初心者ハンズオン\n大阪府大阪市",
+    "セキュリティエンジニア勉強会",
+    "go言語 パフォーマンスチューニング入門",
+]
+
+
+class TestNgramIndex:
+    """文字 n-gram 転置インデックスのテスト"""
+
+    def test_japanese_substring_match(self):
+        index = NgramIndex(TEXTS)
+
+        assert index.match("もくもく") == [0]
+        assert index.match("勉強会") == [3]
+        assert index.match("会") == [0, 3]
+
+    def test_ascii_substring_match(self):
+        index = NgramIndex(TEXTS)
+
+        assert index.match("script") == [1]
+
+    def test_ngram_false_positive_is_removed(self):
+        # 「もく」「くも」の bigram はどちらも含むが「もくも会」という連続文字列はない
+        index = NgramIndex(TEXTS)
+
+        assert index.match("もくも会") == []
+
+    def test_does_not_match_across_fields(self):
+        index = NgramIndex(TEXTS)
+
+        assert index.match("ハンズオン大阪") == []
+
+    def test_and_or_search(self):
+        index = NgramIndex(TEXTS)
+
+        assert index.search(all_of=["python", "もくもく"]) == [0]
+        assert index.search(all_of=["python", "rust"]) == []
+        assert index.search(any_of=["python", "rust"]) == [0, 2]
+        assert index.search(all_of=["会"], any_of=["python", "セキュリティ"]) == [0, 3]
+        assert index.search() == [0, 1, 2, 3, 4]
+
+    @pytest.mark.parametrize("n", [1, 2, 3])
+    def test_results_do_not_depend_on_n(self, n):
+        index = NgramIndex(TEXTS, n=n)
+
+        assert index.match("勉強会") == [3]
+        assert index.match("入門") == [4]
+        assert index.match("会") == [0, 3]
+
+    def test_postings_are_compact_sorted_arrays(self):
+        index = NgramIndex(TEXTS * 100)
+
+        postings = index._postings["勉強"]
+        assert postings.typecode == "H"
+        assert list(postings) == sorted(postings)
+        assert index.postings_bytes() > 0
+
+    def test_intersect(self):
+        a = array("I", [1, 3, 5, 7, 9])
+        b = array("I", range(0, 100, 3))
+
+        assert list(_intersect(a, b)) == [3, 9]
+        assert list(_intersect(array("I", [50]), array("I", range(100)))) == [50]
@@ -0,0 +1,133 @@
+from confee_agent.models import ConnpassEvent, parse_epoch
+from confee_agent.ranking import (
+    REASON_DIRECT_MATCH,
+    REASON_POPULAR,
+    REASON_RELATED,
+    REASON_SOON,
+    query_terms,
+    rank_events,
+)
+
+NOW = parse_epoch("2026-03-01T00:00:00+09:00")
+
+
+def _make_event(
+    event_id: int,
+    title: str = "Event",
+    started_at: str | None = "2026-06-01T10:00:00+09:00",
+    accepted: int = 0,
+    limit: int | None = 100,
+    catch: str | None = None,
+) -> ConnpassEvent:
+    return ConnpassEvent(
+        id=event_id,
+        title=title,
+        catch=catch,
+        description=None,
+        url=f"https://connpass.com/event/{event_id}/",
+        started_at=started_at,
+        ended_at=None,
+        place=None,
+        address=None,
+        accepted=accepted,
+        waiting=0,
+        limit=limit,
+        event_type="participation",
+        open_status="open",
+    )
+
+
+class TestQueryTerms:
+    """検索語抽出のテスト"""
+
+    def test_splits_and_normalizes(self):
+        assert query_terms("TypeScript, React", "ｐｙｔｈｏｎ,typescript") == ["typescript", "react", "python"]
+
+
+class TestRankEvents:
+    """おすすめ度算出のテスト"""
+
+    def test_two_signals_give_three_stars(self):
+        event = _make_event(1, title="TypeScript Conference", accepted=60)
+
+        ranked = rank_events([event], ["typescript"], now=NOW)
+
+        assert ranked[0].recommendation_level == "★★★"
+        assert ranked[0].reasons == (REASON_DIRECT_MATCH, REASON_POPULAR, "参加者10名以上")
+
+    def test_single_signal_gives_two_stars(self):
+        event = _make_event(1, title="勉強会", catch="TypeScriptを学ぶ")
+
+        ranked = rank_events([event], ["typescript"], now=NOW)
+
+        assert ranked[0].recommendation_level == "★★☆"
+        assert ranked[0].reasons == (REASON_RELATED,)
+
+    def test_no_signal_gives_one_star(self):
+        ranked = rank_events([_make_event(1)], ["typescript"], now=NOW)
+
+        assert ranked[0].recommendation_level == "★☆☆"
+
+    def test_soon_event_counts_as_signal(self):
+        event = _make_event(1, title="TypeScript", started_at="2026-03-10T10:00:00+09:00")
+
+        ranked = rank_events([event], ["typescript"], now=NOW)
+
+        assert ranked[0].level == 3
+        assert REASON_SOON in ranked[0].reasons
+
+    def test_popular_only_gives_one_star(self):
+        """参加率は ★★★ の判定にだけ使い、単独では ★★☆ にしない"""
+        ranked = rank_events([_make_event(1, accepted=6, limit=10)], ["typescript"], now=NOW)
+
+        assert ranked[0].recommendation_level == "★☆☆"
+        assert ranked[0].reasons == (REASON_POPULAR,)
+
+    def test_soon_only_gives_one_star(self):
+        """開催日の近さは ★★★ の判定にだけ使い、単独では ★★☆ にしない"""
+        ranked = rank_events([_make_event(1, started_at="2026-03-10T10:00:00+09:00")], ["typescript"], now=NOW)
+
+        assert ranked[0].recommendation_level == "★☆☆"
+        assert ranked[0].reasons == (REASON_SOON,)
+
+    def test_popular_and_soon_give_three_stars(self):
+        event = _make_event(1, started_at="2026-03-10T10:00:00+09:00", accepted=6, limit=10)
+
+        assert rank_events([event], ["typescript"], now=NOW)[0].level == 3
+
+    def test_active_gives_two_stars(self):
+        event = _make_event(1, accepted=10, limit=None)
+
+        assert rank_events([event], ["typescript"], now=NOW)[0].recommendation_level == "★★☆"
+
+    def test_past_event_is_not_soon(self):
+        event = _make_event(1, started_at="2026-02-20T10:00:00+09:00")
+
+        assert REASON_SOON not in rank_events([event], [], now=NOW)[0].reasons
+
+    def test_no_limit_is_not_popular(self):
+        event = _make_event(1, accepted=5, limit=None)
+
+        assert rank_events([event], [], now=NOW)[0].level == 1
+
+    def test_sorted_by_level_then_start_date(self):
+        events = [
+            _make_event(1, started_at="2026-06-10T10:00:00+09:00"),
+            _make_event(2, title="TypeScript", accepted=80),
+            _make_event(3, started_at="2026-05-01T10:00:00+09:00"),
+            _make_event(4, started_at=None),
+        ]
+
+        ranked = rank_events(events, ["typescript"], now=NOW)
+
+        assert [r.event.id for r in ranked] == [2, 3, 1, 4]
+
+    def test_secondary_breaks_ties(self):
+        events = [_make_event(1), _make_event(2)]
+
+        ranked = rank_events(events, [], now=NOW, secondary=[1, 3])
+
+        assert [r.event.id for r in ranked] == [2, 1]
+
+    def test_empty(self):
+        assert rank_events([], ["x"]) == []
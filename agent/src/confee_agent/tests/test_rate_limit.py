@@ -0,0 +1,143 @@
+import httpx
+import pytest
+import respx
+
+import confee_agent.tools.search_connpass as search_connpass_module
+from confee_agent.mock_events import MOCK_EVENTS
+from confee_agent.tools.rate_limit import RateLimiter, RetryPolicy, parse_retry_after
+from confee_agent.tools.search_connpass import (
+    CONNPASS_API_URL,
+    _search_connpass_api,
+    _search_connpass_api_async,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestRateLimiter:
+    """トークンバケットのテスト"""
+
+    def test_waits_are_assigned_in_call_order(self):
+        limiter = RateLimiter(qps=1, clock=FakeClock())
+
+        assert [limiter.reserve() for _ in range(3)] == [0.0, 1.0, 2.0]
+        assert limiter.stats()["waits"] == 2
+
+    def test_burst_allows_immediate_requests(self):
+        limiter = RateLimiter(qps=2, burst=3, clock=FakeClock())
+
+        assert [limiter.reserve() for _ in range(4)] == [0.0, 0.0, 0.0, 0.5]
+
+    def test_rejects_when_wait_exceeds_limit_without_reserving(self):
+        clock = FakeClock()
+        limiter = RateLimiter(qps=1, max_wait_seconds=1.5, clock=clock)
+        limiter.reserve()
+        limiter.reserve()
+
+        assert limiter.reserve() is None
+        assert limiter.stats()["rejected"] == 1
+        clock.now += 1
+        assert limiter.reserve() == 1.0
+
+    def test_pause_delays_next_request(self):
+        clock = FakeClock()
+        limiter = RateLimiter(qps=10, clock=clock)
+        limiter.pause(3)
+
+        assert limiter.reserve() == 3.0
+
+    def test_disabled_when_qps_is_zero(self):
+        limiter = RateLimiter(qps=0)
+        limiter.pause(10)
+
+        assert limiter.reserve() == 0.0
+
+
+class TestRetryPolicy:
+    """再試行の方針のテスト"""
+
+    def test_exponential_backoff_with_jitter(self):
+        policy = RetryPolicy(max_retries=3, base_delay_seconds=0.5, rand=lambda: 0.5)
+
+        assert [policy.delay(503, None, attempt) for attempt in range(4)] == [0.25, 0.5, 1.0, None]
+
+    def test_retry_after_is_honored(self):
+        policy = RetryPolicy(rand=lambda: 0.0)
+
+        assert policy.delay(429, 2.0, 0) == 2.0
+
+    def test_does_not_retry_client_errors_or_long_waits(self):
+        policy = RetryPolicy(max_delay_seconds=5)
+
+        assert policy.delay(401, None, 0) is None
+        assert policy.delay(429, 60.0, 0) is None
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after("3") == 3.0
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:05 GMT", now=lambda: 1445412480.0) == 5.0
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+
+class TestSearchConnpassApiRetry:
+    """_search_connpass_api の再試行とレート制限のテスト"""
+
+    @respx.mock
+    def test_throttled_request_succeeds_after_retry(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        limiter = RateLimiter(qps=1000)
+        monkeypatch.setattr(search_connpass_module, "_rate_limiter", limiter)
+        route = respx.get(CONNPASS_API_URL).mock(
+            side_effect=[
+                httpx.Response(429, headers={"Retry-After": "0"}),
+                httpx.Response(200, json={"results_available": 1, "events": MOCK_EVENTS[:1]}),
+            ]
+        )
+
+        result = _search_connpass_api(keyword="TypeScript")
+
+        assert route.call_count == 2
+        assert result.results_returned == 1
+
+    @respx.mock
+    def test_gives_up_after_max_retries(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        route = respx.get(CONNPASS_API_URL).mock(return_value=httpx.Response(503))
+
+        result = _search_connpass_api(keyword="TypeScript")
+
+        assert route.call_count == 3
+        assert result["status_code"] == 503
+
+    def test_returns_error_when_rate_limit_queue_is_full(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        limiter = RateLimiter(qps=1, max_wait_seconds=0)
+        limiter.pause(60)
+        monkeypatch.setattr(search_connpass_module, "_rate_limiter", limiter)
+
+        result = _search_connpass_api(keyword="TypeScript")
+
+        assert result["error"] is True
+        assert result["status_code"] == 429
+
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_async_request_retries_server_error(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        route = respx.get(CONNPASS_API_URL).mock(
+            side_effect=[
+                httpx.Response(502),
+                httpx.Response(200, json={"results_available": 1, "events": MOCK_EVENTS[:1]}),
+            ]
+        )
+
+        result = await _search_connpass_api_async(keyword="TypeScript")
+
+        assert route.call_count == 2
+        assert result.results_returned == 1
@@ -0,0 +1,128 @@
+import httpx
+import respx
+
+from confee_agent.tools.response_cache import ResponseCache, make_cache_key
+from confee_agent.tools.search_connpass import (
+    CONNPASS_API_URL,
+    _search_connpass_api,
+    cache_stats,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMakeCacheKey:
+    """キャッシュキー正規化のテスト"""
+
+    def test_comma_list_order_is_ignored(self):
+        assert make_cache_key(keyword_or="Python,TypeScript") == make_cache_key(
+            keyword_or="TypeScript,Python"
+        )
+
+    def test_whitespace_and_case_are_ignored(self):
+        assert make_cache_key(keyword=" TypeScript , React ") == make_cache_key(
+            keyword="react,typescript"
+        )
+
+    def test_full_width_is_normalized(self):
+        assert make_cache_key(keyword="ＴｙｐｅＳｃｒｉｐｔ") == make_cache_key(
+            keyword="typescript"
+        )
+
+    def test_different_params_produce_different_keys(self):
+        assert make_cache_key(keyword="Python", start=1) != make_cache_key(
+            keyword="Python", start=11
+        )
+
+
+class TestResponseCache:
+    """ResponseCache の TTL・LRU・サイズ上限のテスト"""
+
+    def test_hit_and_miss_counters(self):
+        cache = ResponseCache()
+        cache.set(("a",), "value", size=10)
+
+        assert cache.get(("a",)) == "value"
+        assert cache.get(("b",)) is None
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_entry_expires_after_ttl(self):
+        clock = FakeClock()
+        cache = ResponseCache(ttl_seconds=10, clock=clock)
+        cache.set(("a",), "value", size=10)
+
+        clock.now = 11
+
+        assert cache.get(("a",)) is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_lru_eviction_by_entry_count(self):
+        cache = ResponseCache(max_entries=2)
+        cache.set(("a",), 1, size=1)
+        cache.set(("b",), 2, size=1)
+        cache.get(("a",))
+        cache.set(("c",), 3, size=1)
+
+        assert cache.get(("a",)) == 1
+        assert cache.get(("b",)) is None
+        assert cache.stats()["evictions"] == 1
+
+    def test_eviction_by_byte_budget(self):
+        cache = ResponseCache(max_bytes=100)
+        cache.set(("a",), 1, size=60)
+        cache.set(("b",), 2, size=60)
+
+        assert cache.get(("a",)) is None
+        assert cache.get(("b",)) == 2
+        assert cache.stats()["bytes"] == 60
+
+    def test_oversized_entry_is_not_stored(self):
+        cache = ResponseCache(max_bytes=100)
+        cache.set(("a",), 1, size=101)
+
+        assert cache.stats()["entries"] == 0
+
+    def test_disabled_when_ttl_is_zero(self):
+        cache = ResponseCache(ttl_seconds=0)
+        cache.set(("a",), 1, size=1)
+
+        assert cache.get(("a",)) is None
+
+
+class TestSearchConnpassApiCache:
+    """_search_connpass_api のキャッシュ連携テスト"""
+
+    @respx.mock
+    def test_identical_query_hits_cache(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        route = respx.get(CONNPASS_API_URL).mock(
+            return_value=httpx.Response(200, json={"results_available": 0, "events": []})
+        )
+
+        first = _search_connpass_api(keyword_or="TypeScript,Python")
+        second = _search_connpass_api(keyword_or="python, typescript")
+
+        assert route.call_count == 1
+        assert second is first
+        assert cache_stats()["hits"] == 1
+
+    @respx.mock
+    def test_error_response_is_not_cached(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        route = respx.get(CONNPASS_API_URL).mock(
+            return_value=httpx.Response(500, text="Internal Server Error")
+        )
+
+        _search_connpass_api(keyword="TypeScript")
+        _search_connpass_api(keyword="TypeScript")
+
+        # 5xx は 1 回の検索につき最初の 1 回 + 再試行 2 回リクエストする
+        assert route.call_count == 6
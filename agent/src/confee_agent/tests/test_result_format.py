@@ -0,0 +1,113 @@
+import httpx
+import respx
+
+from confee_agent.models import ConnpassEvent
+from confee_agent.tools.result_format import (
+    apply_token_budget,
+    compact_event,
+    estimate_tokens,
+    strip_html,
+    truncate,
+)
+from confee_agent.tools.search_connpass import CONNPASS_API_URL, search_connpass
+
+
+def _make_event(**overrides) -> ConnpassEvent:
+    fields = dict(
+        id=1,
+        title="TypeScript meetup #1",
+        catch="TypeScript初心者向け勉強会",
+        description="<p>TypeScriptの<b>基礎</b>を&amp;学びます</p>",
+        url="https://connpass.com/event/1/",
+        started_at="2026-03-15T13:00:00+09:00",
+        ended_at="2026-03-15T17:00:00+09:00",
+        place="渋谷カンファレンスセンター",
+        address=None,
+        accepted=30,
+        waiting=5,
+        limit=50,
+        event_type="participation",
+        open_status="open",
+    )
+    fields.update(overrides)
+    return ConnpassEvent(**fields)
+
+
+class TestCompactEvent:
+    """イベントのコンパクト表現のテスト"""
+
+    def test_strip_html_removes_tags_and_unescapes(self):
+        assert strip_html("<p>TypeScriptの<b>基礎</b>を&amp;学びます</p>") == "TypeScriptの 基礎 を&学びます"
+
+    def test_truncate_adds_ellipsis(self):
+        assert truncate("あいうえおかきくけこ", 5) == "あいうえ…"
+        assert truncate("短い", 5) == "短い"
+
+    def test_compact_event_drops_unused_and_empty_fields(self):
+        compact = compact_event(_make_event())
+
+        assert "event_type" not in compact
+        assert "address" not in compact
+        assert compact["description"] == "TypeScriptの 基礎 を&学びます"
+        assert compact["accepted"] == 30
+        assert compact["url"] == "https://connpass.com/event/1/"
+
+    def test_compact_event_truncates_description(self):
+        compact = compact_event(_make_event(description="あ" * 500), description_max_chars=50)
+
+        assert len(compact["description"]) == 50
+
+
+class TestTokenBudget:
+    """ツール結果のトークン予算のテスト"""
+
+    def test_estimate_counts_non_ascii_per_char(self):
+        assert estimate_tokens({"t": "あ" * 100}) > estimate_tokens({"t": "a" * 100})
+
+    def test_payload_within_budget_is_unchanged(self):
+        payload = {"results_returned": 1, "events": [{"title": "a"}]}
+
+        assert apply_token_budget(payload, 1000) is payload
+
+    def test_events_are_trimmed_to_budget(self):
+        events = [{"title": "あ" * 100, "id": i} for i in range(10)]
+        payload = {"results_returned": 10, "events": events}
+
+        trimmed = apply_token_budget(payload, 350)
+
+        assert estimate_tokens(trimmed) <= 350
+        assert trimmed["events"] == events[: len(trimmed["events"])]
+        assert trimmed["results_returned"] == len(trimmed["events"])
+        assert trimmed["omitted_events"] == 10 - len(trimmed["events"])
+
+    def test_zero_budget_means_unlimited(self):
+        payload = {"events": [{"title": "あ" * 1000}]}
+
+        assert apply_token_budget(payload, 0) is payload
+
+
+class TestSearchConnpassCompactMode:
+    """CONNPASS_COMPACT_RESULTS 有効時のツール結果テスト"""
+
+    @respx.mock
+    def test_tool_returns_compact_events(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        monkeypatch.setenv("CONNPASS_COMPACT_RESULTS", "true")
+        monkeypatch.setenv("CONNPASS_DESCRIPTION_MAX_CHARS", "10")
+        event = {
+            "id": 1,
+            "title": "Event",
+            "description": "<p>" + "説明" * 50 + "</p>",
+            "url": "https://connpass.com/event/1/",
+            "event_type": "participation",
+            "open_status": "open",
+        }
+        respx.get(CONNPASS_API_URL).mock(
+            return_value=httpx.Response(200, json={"results_available": 1, "events": [event]})
+        )
+
+        result = search_connpass._tool_func(keyword="Event")
+
+        compact = result["events"][0]
+        assert "event_type" not in compact
+        assert compact["description"] == "説明" * 4 + "説…"
@@ -1,11 +1,14 @@
 import httpx
+import pytest
 import respx
 
 from confee_agent.models import ConnpassEvent, ConnpassSearchResult
 from confee_agent.tools.search_connpass import (
     CONNPASS_API_URL,
     _search_connpass_api,
+    _search_connpass_api_async,
     search_connpass,
+    search_connpass_async,
 )
 
 
@@ -456,3 +459,177 @@ class TestSearchConnpassApiPagination:
         assert isinstance(result, ConnpassSearchResult)
         assert result.results_start == 11
         assert result.results_available == 50
+
+
+class TestSearchConnpassAsync:
+    """非同期版 search_connpass のテスト"""
+
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_async_search_returns_same_result_as_sync(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+
+        closed_event = {**SAMPLE_EVENT, "id": 99999, "open_status": "close"}
+        route = respx.get(CONNPASS_API_URL).mock(
+            return_value=httpx.Response(
+                200, json={**SAMPLE_RESPONSE, "events": [SAMPLE_EVENT, closed_event]}
+            )
+        )
+
+        result = await _search_connpass_api_async(keyword="TypeScript", count=5)
+
+        assert isinstance(result, ConnpassSearchResult)
+        assert [e.id for e in result.events] == [12345]
+        request = route.calls[0].request
+        assert request.url.params["keyword"] == "TypeScript"
+        assert request.url.params["count"] == "5"
+        assert request.headers["X-API-Key"] == "test-api-key"
+
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_async_search_timeout(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+
+        respx.get(CONNPASS_API_URL).mock(side_effect=httpx.ReadTimeout("timeout"))
+
+        result = await _search_connpass_api_async(keyword="TypeScript")
+
+        assert result["error"] is True
+        assert "timeout" in result["message"].lower()
+
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_async_tool_returns_dict(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+
+        respx.get(CONNPASS_API_URL).mock(
+            return_value=httpx.Response(200, json=SAMPLE_RESPONSE)
+        )
+
+        result = await search_connpass_async._tool_func(keyword="TypeScript")
+
+        assert result["results_returned"] == 1
+        assert result["events"][0]["id"] == 12345
+
+
+def _paged_responses(total: int):
+    """start/count に応じて total 件中の該当ページを返す side_effect。"""
+
+    def side_effect(request):
+        start = int(request.url.params["start"])
+        count = int(request.url.params["count"])
+        ids = range(start, min(start + count, total + 1))
+        return httpx.Response(
+            200,
+            json={
+                "results_returned": len(ids),
+                "results_available": total,
+                "results_start": start,
+                "events": [{**SAMPLE_EVENT, "id": i} for i in ids],
+            },
+        )
+
+    return side_effect
+
+
+class TestSearchConnpassAutoPagination:
+    """max_results 指定時の自動ページ取得テスト"""
+
+    @respx.mock
+    def test_fetches_all_pages_in_order(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        route = respx.get(CONNPASS_API_URL).mock(side_effect=_paged_responses(250))
+
+        result = search_connpass._tool_func(ym="202603", max_results=1000)
+
+        assert route.call_count == 3
+        starts = sorted(int(c.request.url.params["start"]) for c in route.calls)
+        assert starts == [1, 101, 201]
+        assert [e["id"] for e in result["events"]] == list(range(1, 251))
+        assert result["results_returned"] == 250
+        assert result["results_available"] == 250
+
+    @respx.mock
+    def test_stops_at_max_results(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        route = respx.get(CONNPASS_API_URL).mock(side_effect=_paged_responses(500))
+
+        result = search_connpass._tool_func(ym="202603", max_results=150)
+
+        assert route.call_count == 2
+        assert len(result["events"]) == 150
+
+    @respx.mock
+    def test_single_page_when_results_fit(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        route = respx.get(CONNPASS_API_URL).mock(side_effect=_paged_responses(30))
+
+        result = search_connpass._tool_func(ym="202603", max_results=500)
+
+        assert route.call_count == 1
+        assert result["results_returned"] == 30
+
+    @respx.mock
+    def test_page_error_truncates_results(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        paged = _paged_responses(300)
+
+        def side_effect(request):
+            if request.url.params["start"] == "101":
+                return httpx.Response(500, text="error")
+            return paged(request)
+
+        respx.get(CONNPASS_API_URL).mock(side_effect=side_effect)
+
+        result = search_connpass._tool_func(ym="202603", max_results=300)
+
+        assert [e["id"] for e in result["events"]] == list(range(1, 101))
+
+    @respx.mock
+    def test_first_page_error_is_returned(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        respx.get(CONNPASS_API_URL).mock(return_value=httpx.Response(500, text="error"))
+
+        result = search_connpass._tool_func(ym="202603", max_results=300)
+
+        assert result["error"] is True
+
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_async_fetches_all_pages_in_order(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        route = respx.get(CONNPASS_API_URL).mock(side_effect=_paged_responses(250))
+
+        result = await search_connpass_async._tool_func(ym="202603", max_results=1000)
+
+        assert route.call_count == 3
+        assert [e["id"] for e in result["events"]] == list(range(1, 251))
+
+
+class TestSearchConnpassPreRanking:
+    """ツール結果のおすすめ度付与テスト"""
+
+    @respx.mock
+    def test_tool_attaches_recommendation_level(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        respx.get(CONNPASS_API_URL).mock(
+            return_value=httpx.Response(200, json=SAMPLE_RESPONSE)
+        )
+
+        result = search_connpass._tool_func(keyword="TypeScript")
+
+        event = result["events"][0]
+        assert event["recommendation_level"] in {"★★★", "★★☆", "★☆☆"}
+        assert "クエリに直接一致" in event["recommendation_reasons"]
+
+    @respx.mock
+    def test_prerank_can_be_disabled(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        monkeypatch.setenv("CONNPASS_PRERANK", "false")
+        respx.get(CONNPASS_API_URL).mock(
+            return_value=httpx.Response(200, json=SAMPLE_RESPONSE)
+        )
+
+        result = search_connpass._tool_func(keyword="TypeScript")
+
+        assert "recommendation_level" not in result["events"][0]
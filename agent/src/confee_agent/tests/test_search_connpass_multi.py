@@ -0,0 +1,134 @@
+import httpx
+import pytest
+import respx
+
+from confee_agent.tools.search_connpass import CONNPASS_API_URL
+from confee_agent.tools.search_connpass_multi import (
+    MAX_QUERIES,
+    search_connpass_multi,
+)
+
+
+def _event(event_id: int, started_at: str) -> dict:
+    return {
+        "id": event_id,
+        "title": f"Event {event_id}",
+        "url": f"https://connpass.com/event/{event_id}/",
+        "started_at": started_at,
+        "open_status": "open",
+    }
+
+
+def _response(*events: dict) -> httpx.Response:
+    return httpx.Response(
+        200,
+        json={
+            "results_returned": len(events),
+            "results_available": len(events),
+            "results_start": 1,
+            "events": list(events),
+        },
+    )
+
+
+def _by_keyword(responses: dict):
+    def side_effect(request):
+        return responses[request.url.params.get("keyword")]
+
+    return side_effect
+
+
+class TestSearchConnpassMulti:
+    """search_connpass_multi ツールのテスト"""
+
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_merges_and_dedupes_by_event_id(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        respx.get(CONNPASS_API_URL).mock(
+            side_effect=_by_keyword(
+                {
+                    "TypeScript": _response(
+                        _event(1, "2026-03-20T10:00:00+09:00"),
+                        _event(2, "2026-03-10T10:00:00+09:00"),
+                    ),
+                    "React": _response(
+                        _event(2, "2026-03-10T10:00:00+09:00"),
+                        _event(3, "2026-03-01T10:00:00+09:00"),
+                    ),
+                }
+            )
+        )
+
+        result = await search_connpass_multi._tool_func(
+            queries=[{"keyword": "TypeScript"}, {"keyword": "React"}]
+        )
+
+        ids = [e["id"] for e in result["events"]]
+        assert ids == [2, 3, 1]
+        assert result["results_returned"] == 3
+        assert result["events"][0]["matched_queries"] == 2
+
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_runs_each_query(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        route = respx.get(CONNPASS_API_URL).mock(return_value=_response())
+
+        await search_connpass_multi._tool_func(
+            queries=[{"keyword": "A"}, {"keyword": "B"}, {"keyword_or": "C,D", "ym": "202603"}]
+        )
+
+        assert route.call_count == 3
+
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_partial_failure_keeps_successful_results(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        respx.get(CONNPASS_API_URL).mock(
+            side_effect=_by_keyword(
+                {
+                    "ok": _response(_event(1, "2026-03-20T10:00:00+09:00")),
+                    "ng": httpx.Response(500, text="error"),
+                }
+            )
+        )
+
+        result = await search_connpass_multi._tool_func(
+            queries=[{"keyword": "ok"}, {"keyword": "ng"}]
+        )
+
+        assert [e["id"] for e in result["events"]] == [1]
+        assert result["queries"][1]["error"] is True
+        assert result["queries"][1]["status_code"] == 500
+
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_invalid_query_is_reported(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        route = respx.get(CONNPASS_API_URL).mock(return_value=_response())
+
+        result = await search_connpass_multi._tool_func(
+            queries=[{"unknown": "x"}, {"keyword": "Python"}]
+        )
+
+        assert route.call_count == 1
+        assert result["queries"][0]["error"] is True
+
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_query_count_is_capped(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        route = respx.get(CONNPASS_API_URL).mock(return_value=_response())
+
+        await search_connpass_multi._tool_func(
+            queries=[{"keyword": f"k{i}"} for i in range(MAX_QUERIES + 3)]
+        )
+
+        assert route.call_count == MAX_QUERIES
+
+    @pytest.mark.asyncio
+    async def test_empty_queries_returns_error(self):
+        result = await search_connpass_multi._tool_func(queries=[])
+
+        assert result["error"] is True
@@ -0,0 +1,84 @@
+import sys
+
+import pytest
+
+from confee_agent import serialization
+from confee_agent.mock_events import MOCK_EVENTS
+from confee_agent.serialization import OrjsonSerializer, StdlibSerializer, get_serializer, set_serializer
+
+
+@pytest.fixture(autouse=True)
+def _reset_serializer():
+    set_serializer(None)
+    yield
+    set_serializer(None)
+
+
+def _orjson_available() -> bool:
+    try:
+        OrjsonSerializer()
+    except ImportError:
+        return False
+    return True
+
+
+requires_orjson = pytest.mark.skipif(not _orjson_available(), reason="orjson is not installed")
+
+PAYLOAD = {"results_returned": len(MOCK_EVENTS), "events": MOCK_EVENTS, "stale": True, "limit": None}
+
+
+class TestStdlibSerializer:
+    """標準の json を使うシリアライザのテスト"""
+
+    def test_compact_and_raw_utf8(self):
+        text = StdlibSerializer().dumps({"title": "もくもく会", "ids": [1, 2]})
+
+        assert text == '{"title":"もくもく会","ids":[1,2]}'
+
+    def test_round_trip(self):
+        serializer = StdlibSerializer()
+
+        assert serializer.loads(serializer.dumps_bytes(PAYLOAD)) == PAYLOAD
+
+
+@requires_orjson
+class TestOrjsonSerializer:
+    """orjson を使うシリアライザのテスト"""
+
+    def test_same_output_as_stdlib(self):
+        assert OrjsonSerializer().dumps(PAYLOAD) == StdlibSerializer().dumps(PAYLOAD)
+
+    def test_non_str_keys(self):
+        assert OrjsonSerializer().dumps({1: "a"}) == '{"1":"a"}'
+
+    def test_invalid_json_raises_value_error(self):
+        with pytest.raises(ValueError):
+            OrjsonSerializer().loads("{invalid")
+
+
+class TestGetSerializer:
+    """CONFEE_JSON_BACKEND によるシリアライザの選択のテスト"""
+
+    def test_json_backend(self, monkeypatch):
+        monkeypatch.setenv("CONFEE_JSON_BACKEND", "json")
+
+        assert get_serializer().name == "json"
+
+    @requires_orjson
+    def test_auto_prefers_orjson(self, monkeypatch):
+        monkeypatch.delenv("CONFEE_JSON_BACKEND", raising=False)
+
+        assert get_serializer().name == "orjson"
+
+    def test_falls_back_when_orjson_is_missing(self, monkeypatch):
+        monkeypatch.setenv("CONFEE_JSON_BACKEND", "orjson")
+        monkeypatch.setitem(sys.modules, "orjson", None)
+
+        assert get_serializer().name == "json"
+
+    def test_module_functions_use_selected_serializer(self):
+        set_serializer(StdlibSerializer())
+
+        assert serialization.dumps({"a": "あ"}) == '{"a":"あ"}'
+        assert serialization.dumps_bytes({"a": 1}) == b'{"a":1}'
+        assert serialization.loads(b'{"a":1}') == {"a": 1}
@@ -0,0 +1,244 @@
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from confee_agent.sessions import SessionRegistry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _registry(**kwargs) -> tuple[SessionRegistry, MagicMock]:
+    factory = MagicMock(side_effect=lambda: MagicMock())
+    return SessionRegistry(factory, **kwargs), factory
+
+
+class TestSessionRegistry:
+    """セッションごとのエージェント管理のテスト"""
+
+    def test_creates_one_agent_per_session(self):
+        registry, factory = _registry()
+
+        a1 = registry.get("session-a")
+        a2 = registry.get("session-a")
+        b = registry.get("session-b")
+
+        assert a1 is a2
+        assert a1 is not b
+        assert factory.call_count == 2
+        assert len(registry) == 2
+
+    def test_different_sessions_run_in_parallel(self):
+        registry, _ = _registry()
+        both_inside = threading.Barrier(2, timeout=2)
+
+        def work(session_id):
+            with registry.session(session_id):
+                both_inside.wait()
+
+        threads = [threading.Thread(target=work, args=(sid,)) for sid in ("a", "b")]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=3)
+
+        assert not both_inside.broken
+
+    def test_same_session_is_serialized(self):
+        registry, _ = _registry()
+        active = 0
+        max_active = 0
+        counter_lock = threading.Lock()
+
+        def work():
+            nonlocal active, max_active
+            with registry.session("same"):
+                with counter_lock:
+                    active += 1
+                    max_active = max(max_active, active)
+                time.sleep(0.02)
+                with counter_lock:
+                    active -= 1
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=3)
+
+        assert max_active == 1
+
+    def test_evicts_idle_sessions(self):
+        clock = FakeClock()
+        registry, factory = _registry(idle_seconds=60, clock=clock)
+        first = registry.get("a")
+
+        clock.now = 61
+        assert registry.evict_idle() == 1
+        assert "a" not in registry
+
+        assert registry.get("a") is not first
+        assert factory.call_count == 2
+
+    def test_does_not_evict_session_in_use(self):
+        clock = FakeClock()
+        registry, _ = _registry(idle_seconds=60, clock=clock)
+
+        with registry.session("a"):
+            clock.now = 120
+            assert registry.evict_idle() == 0
+            assert "a" in registry
+
+    def test_evicts_least_recently_used_over_limit(self):
+        clock = FakeClock()
+        registry, _ = _registry(max_sessions=2, clock=clock)
+        registry.get("a")
+        registry.get("b")
+        registry.get("a")
+
+        registry.get("c")
+
+        assert "b" not in registry
+        assert "a" in registry
+        assert "c" in registry
+
+    def test_keeps_sessions_in_use_over_limit(self):
+        registry, _ = _registry(max_sessions=1)
+
+        with registry.session("a"):
+            registry.get("b")
+            assert "a" in registry
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("CONFEE_SESSION_IDLE_SECONDS", "30")
+        monkeypatch.setenv("CONFEE_MAX_SESSIONS", "5")
+
+        registry = SessionRegistry.from_env(MagicMock())
+
+        assert registry.idle_seconds == 30
+        assert registry.max_sessions == 5
+
+
+class TestSessionRegistryCreation:
+    """エージェント生成中のセッションの扱いのテスト"""
+
+    def test_slow_creation_does_not_block_other_sessions(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def factory():
+            if threading.current_thread().name == "slow":
+                started.set()
+                release.wait(5)
+            return MagicMock()
+
+        registry = SessionRegistry(factory)
+        existing = registry.get("session-b")
+        slow = threading.Thread(target=registry.get, args=("session-a",), name="slow")
+        slow.start()
+        started.wait(5)
+
+        try:
+            # session-a の生成中でも、既存のセッションの取得・新しいセッションの作成は待たされない
+            assert registry.get("session-b") is existing
+            assert registry.get("session-c") is not None
+        finally:
+            release.set()
+            slow.join(5)
+
+    def test_concurrent_requests_share_one_creation(self):
+        release = threading.Event()
+        factory = MagicMock(side_effect=lambda: release.wait(5) and MagicMock())
+        registry = SessionRegistry(factory)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get("session-a"))) for _ in range(3)]
+        for t in threads:
+            t.start()
+        time.sleep(0.05)
+        release.set()
+        for t in threads:
+            t.join(5)
+
+        assert factory.call_count == 1
+        assert len(set(map(id, results))) == 1
+
+    def test_failed_creation_is_not_kept(self):
+        factory = MagicMock(side_effect=[RuntimeError("boom"), MagicMock()])
+        registry = SessionRegistry(factory)
+
+        with pytest.raises(RuntimeError):
+            with registry.session("session-a"):
+                pass
+
+        assert "session-a" not in registry
+        assert registry.get("session-a") is not None
+
+
+class TestSessionRegistryAsync:
+    """session_async のテスト"""
+
+    @pytest.mark.asyncio
+    async def test_same_session_is_serialized(self):
+        registry, _ = _registry()
+        order = []
+
+        async def work(name):
+            async with registry.session_async("same"):
+                order.append(f"{name}-start")
+                await asyncio.sleep(0.02)
+                order.append(f"{name}-end")
+
+        await asyncio.gather(work("x"), work("y"))
+
+        assert order in (
+            ["x-start", "x-end", "y-start", "y-end"],
+            ["y-start", "y-end", "x-start", "x-end"],
+        )
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_hold_lock(self):
+        registry, _ = _registry()
+
+        with registry.session("same"):
+            async def wait():
+                async with registry.session_async("same"):
+                    pass
+
+            task = asyncio.create_task(wait())
+            await asyncio.sleep(0.03)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        async with registry.session_async("same") as agent:
+            assert agent is registry.get("same")
+
+    @pytest.mark.asyncio
+    async def test_creation_does_not_block_event_loop(self):
+        def factory():
+            time.sleep(0.2)
+            return MagicMock()
+
+        registry = SessionRegistry(factory)
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        async with registry.session_async("session-a") as agent:
+            assert agent is not None
+        ticker.cancel()
+
+        assert ticks >= 5
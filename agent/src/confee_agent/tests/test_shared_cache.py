@@ -0,0 +1,274 @@
+import threading
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+import respx
+
+import confee_agent.tools.search_connpass as search_connpass_module
+from confee_agent.mock_events import MOCK_EVENTS
+from confee_agent.models import ConnpassSearchResult
+from confee_agent.shared_cache import (
+    DYNAMODB_MAX_ITEM_BYTES,
+    DynamoDBBackend,
+    SQLiteBackend,
+    TieredCache,
+)
+from confee_agent.tools.search_connpass import (
+    CONNPASS_API_URL,
+    _parse_event,
+    _search_connpass_api,
+    _search_connpass_api_async,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _result() -> ConnpassSearchResult:
+    events = [_parse_event(e) for e in MOCK_EVENTS[:2]]
+    return ConnpassSearchResult(
+        results_returned=len(events), results_available=10, results_start=1, events=events
+    )
+
+
+class ThreadRecordingBackend:
+    """L2 の読み書きを実行したスレッドを記録する SQLiteBackend。"""
+
+    def __init__(self, backend: SQLiteBackend):
+        self.backend = backend
+        self.threads: list[int] = []
+
+    def get(self, key: str) -> bytes | None:
+        self.threads.append(threading.get_ident())
+        return self.backend.get(key)
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        self.threads.append(threading.get_ident())
+        self.backend.set(key, value, ttl_seconds)
+
+
+def _connpass_cache(l2, clock, **kwargs) -> TieredCache:
+    return TieredCache(
+        "connpass",
+        l2=l2,
+        encode=ConnpassSearchResult.to_dict,
+        decode=ConnpassSearchResult.from_dict,
+        clock=clock,
+        **kwargs,
+    )
+
+
+class TestSearchResultSerialization:
+    """ConnpassSearchResult の dict 変換のテスト"""
+
+    def test_round_trip(self):
+        result = _result()
+        assert ConnpassSearchResult.from_dict(result.to_dict()) == result
+
+
+class TestSQLiteBackend:
+    """SQLite の L2 のテスト"""
+
+    def test_get_returns_value_until_expired(self, tmp_path):
+        clock = FakeClock()
+        backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), clock=clock)
+        backend.set("k", b"value", ttl_seconds=60)
+
+        assert backend.get("k") == b"value"
+        clock.now += 61
+        assert backend.get("k") is None
+
+    def test_shared_between_connections(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite3")
+        SQLiteBackend(path).set("k", b"value", ttl_seconds=60)
+
+        assert SQLiteBackend(path).get("k") == b"value"
+
+
+class TestDynamoDBBackend:
+    """DynamoDB の L2 のテスト（クライアントはモック）"""
+
+    def test_put_and_get_item(self):
+        clock = FakeClock()
+        client = MagicMock()
+        backend = DynamoDBBackend("confee-cache", client=client, clock=clock)
+        backend.set("k", b"value", ttl_seconds=60)
+
+        item = client.put_item.call_args.kwargs["Item"]
+        assert client.put_item.call_args.kwargs["TableName"] == "confee-cache"
+        assert item["value"] == {"B": b"value"}
+        assert item["expires_at"] == {"N": str(int(clock.now + 60))}
+
+        client.get_item.return_value = {"Item": item}
+        assert backend.get("k") == b"value"
+
+    def test_expired_item_is_ignored_before_ttl_deletion(self):
+        clock = FakeClock()
+        client = MagicMock()
+        client.get_item.return_value = {
+            "Item": {"key": {"S": "k"}, "value": {"B": b"old"}, "expires_at": {"N": str(int(clock.now - 1))}}
+        }
+
+        assert DynamoDBBackend("confee-cache", client=client, clock=clock).get("k") is None
+
+    def test_oversized_value_is_not_written(self):
+        client = MagicMock()
+        DynamoDBBackend("confee-cache", client=client).set("k", b"x" * (DYNAMODB_MAX_ITEM_BYTES + 1), 60)
+
+        client.put_item.assert_not_called()
+
+
+class TestTieredCache:
+    """L1 + L2 の 2 層キャッシュのテスト"""
+
+    def test_other_instance_reads_from_l2(self, tmp_path):
+        clock = FakeClock()
+        backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), clock=clock)
+        writer = _connpass_cache(backend, clock)
+        reader = _connpass_cache(backend, clock)
+        writer.set(("q",), _result(), size=100)
+
+        assert reader.get(("q",)) == _result()
+        assert reader.stats()["l2_hits"] == 1
+        # 2 回目はプロセス内の L1 から返す
+        assert reader.get(("q",)) == _result()
+        assert reader.stats()["hits"] == 1
+
+    def test_stale_value_within_grace_period(self):
+        clock = FakeClock()
+        cache = _connpass_cache(None, clock, ttl_seconds=60, stale_seconds=30)
+        cache.set(("q",), "value", size=1)
+
+        clock.now += 70
+        found = cache.lookup(("q",))
+        assert found.value == "value"
+        assert found.stale is True
+        assert cache.get(("q",)) is None
+
+        clock.now += 30
+        assert cache.lookup(("q",)) is None
+
+    def test_revalidate_runs_once_per_key(self):
+        cache = TieredCache("test")
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def load():
+            calls.append(1)
+            started.set()
+            release.wait(timeout=5)
+
+        assert cache.revalidate(("q",), load) is True
+        assert started.wait(timeout=5)
+        assert cache.revalidate(("q",), load) is False
+        release.set()
+        for thread in threading.enumerate():
+            if thread.name == "test-revalidate":
+                thread.join(timeout=5)
+
+        assert calls == [1]
+        assert cache.revalidate(("q",), lambda: None) is True
+
+    def test_l2_failure_is_treated_as_miss(self):
+        backend = MagicMock()
+        backend.get.side_effect = RuntimeError("unavailable")
+        backend.set.side_effect = RuntimeError("unavailable")
+        cache = TieredCache("test", l2=backend)
+
+        cache.set(("q",), "value", size=1)
+        assert cache.stats()["l2_errors"] == 1
+        cache.clear()
+
+        assert cache.get(("q",)) is None
+        assert cache.stats()["l2_errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_async_l2_io_runs_off_event_loop(self, tmp_path):
+        clock = FakeClock()
+        backend = ThreadRecordingBackend(SQLiteBackend(str(tmp_path / "cache.sqlite3"), clock=clock))
+        writer = _connpass_cache(backend, clock)
+        reader = _connpass_cache(backend, clock)
+
+        await writer.set_async(("q",), _result(), size=100)
+        found = await reader.lookup_async(("q",))
+
+        assert found.value == _result()
+        assert len(backend.threads) == 2
+        assert threading.get_ident() not in backend.threads
+
+
+class TestSearchConnpassSharedCache:
+    """_search_connpass_api と共有キャッシュの連携テスト"""
+
+    @pytest.fixture
+    def shared(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+        clock = FakeClock()
+        backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), clock=clock)
+        cache = _connpass_cache(backend, clock, ttl_seconds=60, stale_seconds=300)
+        monkeypatch.setattr(search_connpass_module, "_response_cache", cache)
+        return cache, clock
+
+    @respx.mock
+    def test_result_survives_new_instance(self, shared):
+        cache, _ = shared
+        route = respx.get(CONNPASS_API_URL).mock(
+            return_value=httpx.Response(200, json={"results_available": 1, "events": MOCK_EVENTS[:1]})
+        )
+
+        first = _search_connpass_api(keyword="TypeScript")
+        # 別インスタンスを想定して L1 だけを消す
+        cache.clear()
+        second = _search_connpass_api(keyword="typescript")
+
+        assert route.call_count == 1
+        assert second == first
+
+    @respx.mock
+    def test_stale_result_is_served_and_revalidated(self, shared):
+        cache, clock = shared
+        route = respx.get(CONNPASS_API_URL).mock(
+            side_effect=[
+                httpx.Response(200, json={"results_available": 1, "events": MOCK_EVENTS[:1]}),
+                httpx.Response(200, json={"results_available": 2, "events": MOCK_EVENTS[:2]}),
+            ]
+        )
+        first = _search_connpass_api(keyword="TypeScript")
+        clock.now += 120
+
+        stale = _search_connpass_api(keyword="TypeScript")
+        for thread in threading.enumerate():
+            if thread.name == "connpass-revalidate":
+                thread.join(timeout=5)
+
+        assert stale == first
+        assert route.call_count == 2
+        assert _search_connpass_api(keyword="TypeScript").results_available == 2
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_async_search_reads_and_writes_l2_off_event_loop(self, shared, tmp_path, monkeypatch):
+        _, clock = shared
+        backend = ThreadRecordingBackend(SQLiteBackend(str(tmp_path / "async.sqlite3"), clock=clock))
+        cache = _connpass_cache(backend, clock, ttl_seconds=60)
+        monkeypatch.setattr(search_connpass_module, "_response_cache", cache)
+        route = respx.get(CONNPASS_API_URL).mock(
+            return_value=httpx.Response(200, json={"results_available": 1, "events": MOCK_EVENTS[:1]})
+        )
+
+        first = await _search_connpass_api_async(keyword="TypeScript")
+        cache.clear()
+        second = await _search_connpass_api_async(keyword="TypeScript")
+
+        assert route.call_count == 1
+        assert second == first
+        # 1 回目の読み込み（ミス）と書き込み、2 回目の読み込み
+        assert len(backend.threads) == 3
+        assert threading.get_ident() not in backend.threads
@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+import respx
+
+from confee_agent.mock_events import MOCK_EVENTS
+from confee_agent.tools.search_connpass import (
+    CONNPASS_API_URL,
+    _search_connpass_api,
+    _search_connpass_api_async,
+    cache_stats,
+)
+from confee_agent.tools.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """SingleFlight のテスト"""
+
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            release.wait(timeout=5)
+            return object()
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            futures = [pool.submit(flight.do, "k", fn) for _ in range(5)]
+            while flight.stats()["coalesced"] < 4:
+                time.sleep(0.001)
+            release.set()
+            results = [f.result(timeout=5) for f in futures]
+
+        assert calls == [1]
+        assert all(r is results[0] for r in results)
+
+    def test_error_is_shared_and_key_is_released(self):
+        flight = SingleFlight()
+
+        def fail():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            flight.do("k", fail)
+        assert flight.do("k", lambda: "ok") == "ok"
+        assert flight.stats()["inflight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_async_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*(flight.do_async("k", fn) for _ in range(5)))
+
+        assert calls == [1]
+        assert results == ["result"] * 5
+
+    @pytest.mark.asyncio
+    async def test_sync_caller_joins_async_execution(self):
+        flight = SingleFlight()
+        started = asyncio.Event()
+
+        async def fn():
+            started.set()
+            await asyncio.sleep(0.05)
+            return "result"
+
+        leader = asyncio.create_task(flight.do_async("k", fn))
+        await started.wait()
+        follower = asyncio.to_thread(flight.do, "k", lambda: "own")
+
+        assert await asyncio.gather(leader, follower) == ["result", "result"]
+
+    @pytest.mark.asyncio
+    async def test_follower_runs_again_when_leader_is_cancelled(self):
+        flight = SingleFlight()
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        async def fast():
+            return "follower"
+
+        leader = asyncio.create_task(flight.do_async("k", slow))
+        await started.wait()
+        follower = asyncio.create_task(flight.do_async("k", fast))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await follower == "follower"
+
+
+class TestSearchConnpassApiCoalescing:
+    """_search_connpass_api の同一リクエストの集約テスト"""
+
+    @respx.mock
+    def test_identical_concurrent_searches_hit_upstream_once(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+
+        def slow_response(request):
+            time.sleep(0.1)
+            return httpx.Response(200, json={"results_available": 1, "events": MOCK_EVENTS[:1]})
+
+        route = respx.get(CONNPASS_API_URL).mock(side_effect=slow_response)
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            results = list(pool.map(lambda _: _search_connpass_api(keyword="TypeScript"), range(5)))
+
+        assert route.call_count == 1
+        assert all(r is results[0] for r in results)
+        assert cache_stats()["coalesced"] >= 1
+
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_identical_concurrent_async_searches_hit_upstream_once(self, monkeypatch):
+        monkeypatch.setenv("CONNPASS_API_KEY", "test-api-key")
+
+        async def slow_response(request):
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"results_available": 1, "events": MOCK_EVENTS[:1]})
+
+        route = respx.get(CONNPASS_API_URL).mock(side_effect=slow_response)
+
+        results = await asyncio.gather(*(_search_connpass_api_async(keyword="TypeScript") for _ in range(5)))
+
+        assert route.call_count == 1
+        assert all(r is results[0] for r in results)
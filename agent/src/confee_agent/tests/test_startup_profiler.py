@@ -0,0 +1,84 @@
+import sys
+import time
+
+import pytest
+
+from confee_agent import startup_profiler
+from confee_agent.startup_profiler import ImportProfiler
+
+
+@pytest.fixture
+def module_tree(tmp_path, monkeypatch):
+    """親モジュールが子モジュールを import する小さなパッケージを作る。"""
+    package = tmp_path / "profiled_pkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "child.py").write_text("import time\ntime.sleep(0.02)\n")
+    (package / "parent.py").write_text("import time\nfrom profiled_pkg import child\ntime.sleep(0.01)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield
+    for name in [n for n in sys.modules if n.startswith("profiled_pkg")]:
+        del sys.modules[name]
+
+
+@pytest.fixture
+def profiler():
+    profiler = ImportProfiler()
+    sys.meta_path.insert(0, profiler)
+    yield profiler
+    sys.meta_path.remove(profiler)
+
+
+class TestImportProfiler:
+    """import 時間計測のテスト"""
+
+    def test_records_self_and_cumulative_time(self, module_tree, profiler):
+        import profiled_pkg.parent  # noqa: F401
+
+        records = {name: (self_ms, cumulative_ms) for name, self_ms, cumulative_ms in profiler.records}
+        assert {"profiled_pkg", "profiled_pkg.parent", "profiled_pkg.child"} <= records.keys()
+
+        child_self, child_cumulative = records["profiled_pkg.child"]
+        parent_self, parent_cumulative = records["profiled_pkg.parent"]
+        assert child_self >= 15
+        assert parent_cumulative >= child_cumulative + 5
+        # 親の自身の時間には子の import 時間を含めない
+        assert parent_self < parent_cumulative - child_cumulative + 5
+
+    def test_summary_groups_by_top_level_package(self, module_tree, profiler):
+        import profiled_pkg.parent  # noqa: F401
+
+        summary = profiler.summary(top=2)
+
+        assert summary["modules_imported"] >= 3
+        assert summary["packages"]["profiled_pkg"] >= 25
+        assert len(summary["slowest_modules"]) == 2
+        assert summary["slowest_modules"][0]["module"] == "profiled_pkg.child"
+
+    def test_already_imported_modules_are_not_recorded(self, profiler):
+        import json  # noqa: F401
+
+        assert profiler.records == []
+
+
+class TestStartupProfilerModule:
+    """start / report のテスト"""
+
+    def teardown_method(self):
+        startup_profiler.stop()
+
+    def test_report_returns_none_when_not_started(self):
+        assert startup_profiler.report() is None
+
+    def test_report_includes_time_to_ready_and_stops(self, module_tree):
+        profiler = startup_profiler.start()
+        assert startup_profiler.start() is profiler
+        import profiled_pkg.parent  # noqa: F401
+        time.sleep(0.01)
+
+        report = startup_profiler.report()
+
+        assert report["time_to_ready_ms"] >= report["import_total_ms"]
+        assert report["time_to_ready_ms"] >= 40
+        assert not startup_profiler.is_active()
+        assert profiler not in sys.meta_path
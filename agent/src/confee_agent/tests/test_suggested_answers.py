@@ -0,0 +1,110 @@
+import threading
+
+from confee_agent.suggested_answers import SUGGESTED_PROMPTS, SuggestedAnswerStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeCompute:
+    """呼び出されたプロンプトを記録し、呼び出し回数入りの回答を返す。"""
+
+    def __init__(self):
+        self.calls: list[str] = []
+        self.fail = False
+        self.called = threading.Event()
+
+    def __call__(self, prompt: str) -> str:
+        self.calls.append(prompt)
+        self.called.set()
+        if self.fail:
+            raise RuntimeError("bedrock error")
+        return f"{prompt}の回答{len(self.calls)}"
+
+
+def _store(**kwargs):
+    compute = FakeCompute()
+    clock = FakeClock()
+    day = {"value": "20260315"}
+    store = SuggestedAnswerStore(
+        compute,
+        prompts=("おすすめの勉強会ある？",),
+        clock=clock,
+        today=lambda: day["value"],
+        **kwargs,
+    )
+    return store, compute, clock, day
+
+
+def _wait_refreshed() -> None:
+    for thread in threading.enumerate():
+        if thread.name == "suggested-answer-refresh":
+            thread.join(timeout=5)
+
+
+class TestSuggestedAnswerStore:
+    """おすすめプロンプトの回答の事前生成のテスト"""
+
+    def test_prompts_match_frontend_suggestions(self):
+        assert len(SUGGESTED_PROMPTS) == 4
+        assert "おすすめの勉強会ある？" in SUGGESTED_PROMPTS
+
+    def test_refresh_all_then_lookup_normalized_message(self):
+        store, compute, _, _ = _store()
+        assert store.refresh_all() == 1
+
+        answer = store.lookup(" おすすめの勉強会ある? ")
+        assert answer is not None
+        assert answer.text == "おすすめの勉強会ある？の回答1"
+        assert compute.calls == ["おすすめの勉強会ある？"]
+
+    def test_unknown_prompt_returns_none_without_compute(self):
+        store, compute, _, _ = _store()
+        assert store.lookup("Pythonの勉強会ある？") is None
+        assert compute.calls == []
+
+    def test_missing_answer_triggers_background_refresh(self):
+        store, compute, _, _ = _store()
+        assert store.lookup("おすすめの勉強会ある？") is None
+        assert compute.called.wait(timeout=5)
+        _wait_refreshed()
+        assert store.lookup("おすすめの勉強会ある？").text == "おすすめの勉強会ある？の回答1"
+
+    def test_stale_answer_is_served_while_refreshing(self):
+        store, compute, clock, _ = _store(max_age_seconds=60)
+        store.refresh_all()
+        clock.now = 120
+
+        answer = store.lookup("おすすめの勉強会ある？")
+        assert answer.text == "おすすめの勉強会ある？の回答1"
+        _wait_refreshed()
+        assert len(compute.calls) == 2
+        assert store.lookup("おすすめの勉強会ある？").text == "おすすめの勉強会ある？の回答2"
+
+    def test_answer_from_previous_day_is_not_served(self):
+        store, _, _, day = _store()
+        store.refresh_all()
+        day["value"] = "20260316"
+
+        assert store.lookup("おすすめの勉強会ある？") is None
+        _wait_refreshed()
+
+    def test_failed_refresh_keeps_previous_answer(self):
+        store, compute, _, _ = _store()
+        store.refresh_all()
+        compute.fail = True
+
+        assert store.refresh("おすすめの勉強会ある？") is None
+        assert store.lookup("おすすめの勉強会ある？").text == "おすすめの勉強会ある？の回答1"
+
+    def test_start_and_stop_background_thread(self):
+        store, compute, _, _ = _store()
+        store.start(interval_seconds=3600)
+        assert compute.called.wait(timeout=5)
+        store.stop()
+        assert compute.calls == ["おすすめの勉強会ある？"]
@@ -0,0 +1,134 @@
+import logging
+import threading
+import time
+from typing import Callable
+
+from confee_agent.config import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_SLOW_CALL_SECONDS = 3.0
+DEFAULT_OPEN_SECONDS = 30.0
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """connpass API の障害時に呼び出しを止めるサーキットブレーカー（スレッドセーフ）。
+
+    失敗（タイムアウト・接続エラー・429 / 5xx）または slow_call_seconds を超える応答が
+    failure_threshold 回続くと open になり、open_seconds の間は呼び出しを許可しない。
+    その後 half_open になって 1 件だけ試行を許可し、成功すれば closed に、失敗すれば再び open に戻る。
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        slow_call_seconds: float = DEFAULT_SLOW_CALL_SECONDS,
+        open_seconds: float = DEFAULT_OPEN_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._rejected = 0
+
+    @classmethod
+    def from_env(cls) -> "CircuitBreaker":
+        return cls(
+            failure_threshold=env_int("CONNPASS_CIRCUIT_FAILURE_THRESHOLD", DEFAULT_FAILURE_THRESHOLD),
+            slow_call_seconds=env_float("CONNPASS_CIRCUIT_SLOW_CALL_SECONDS", DEFAULT_SLOW_CALL_SECONDS),
+            open_seconds=env_float("CONNPASS_CIRCUIT_OPEN_SECONDS", DEFAULT_OPEN_SECONDS),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.failure_threshold > 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow(self) -> bool:
+        """呼び出してよいかを返す。True を返した場合は record_success / record_failure を呼ぶこと
+        （呼び出さなかった場合は release を呼ぶ）。
+
+        half_open の試行が結果を記録しないまま open_seconds 経った場合は、次の呼び出しに試行を許可する。
+        """
+        if not self.enabled:
+            return True
+        with self._lock:
+            now = self._clock()
+            if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+                self._state = HALF_OPEN
+                self._probing = False
+                logger.info("Circuit half-open, probing connpass API")
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and (not self._probing or now - self._probe_started >= self.open_seconds):
+                self._probing = True
+                self._probe_started = now
+                return True
+            self._rejected += 1
+            return False
+
+    def record_success(self, elapsed_seconds: float = 0.0) -> None:
+        if not self.enabled:
+            return
+        if self.slow_call_seconds > 0 and elapsed_seconds > self.slow_call_seconds:
+            self.record_failure()
+            return
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info("Circuit closed, connpass API recovered")
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def release(self) -> None:
+        """allow() が True を返したが呼び出さなかった場合に、half_open の試行を次の呼び出しに譲る。"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self._opened += 1
+                    logger.warning("Circuit opened after %d consecutive failures", self._failures)
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._probing = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+            self._opened = self._rejected = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "opened": self._opened,
+                "rejected": self._rejected,
+            }
@@ -0,0 +1,144 @@
+import codecs
+import json
+from json.decoder import WHITESPACE
+from typing import Any, Callable
+
+# パーサの状態
+_START = "start"
+_KEY = "key"
+_COLON = "colon"
+_VALUE = "value"
+_ITEMS = "items"
+_DONE = "done"
+
+_decoder = json.JSONDecoder()
+
+
+class _Incomplete(Exception):
+    """バッファの末尾で値が途切れている（続きのデータが必要）。"""
+
+
+class EventStream:
+    """connpass API のレスポンス（JSON）を受信しながらパースし、events 配列の要素を 1 件ずつ処理する。
+
+    トップレベルの events 以外の値は fields に入る。events の各要素は keep が True を返した場合だけ
+    project で変換して items に追加し、それ以外は変換せずに捨てる。
+    レスポンス全体は保持せず、受信途中の 1 要素分だけをバッファするため、メモリ使用量は
+    レスポンスのサイズではなく items に残したイベントの量に比例する。
+    """
+
+    def __init__(
+        self,
+        keep: Callable[[dict], bool] = lambda item: True,
+        project: Callable[[dict], Any] = lambda item: item,
+        array_key: str = "events",
+    ):
+        self.fields: dict[str, Any] = {}
+        self.items: list = []
+        self.skipped = 0
+        self.bytes_read = 0
+        self._keep = keep
+        self._project = project
+        self._array_key = array_key
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pending: list[str] = []
+        self._pending_len = 0
+        # 値が途切れていた場合、バッファがこの長さに達するまでパースを再試行しない（再試行の計算量を線形に保つ）
+        self._retry_at = 0
+        self._state = _START
+        self._key = ""
+
+    @property
+    def done(self) -> bool:
+        return self._state == _DONE
+
+    def feed(self, chunk: bytes) -> None:
+        self.bytes_read += len(chunk)
+        text = self._text.decode(chunk)
+        if not text:
+            return
+        self._pending.append(text)
+        self._pending_len += len(text)
+        if len(self._buf) + self._pending_len >= self._retry_at:
+            self._parse(final=False)
+
+    def close(self) -> None:
+        """受信を終える。JSON が不正・途中で途切れている場合は ValueError を送出する。"""
+        self._pending.append(self._text.decode(b"", final=True))
+        self._parse(final=True)
+        if self._state != _DONE:
+            raise ValueError("Incomplete JSON response")
+
+    def _decode(self, buf: str, pos: int, final: bool) -> tuple[Any, int]:
+        try:
+            value, end = _decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            raise _Incomplete from None
+        # 数値などはバッファの末尾で途切れていても読めてしまうため、続きが来るまで確定しない
+        if end == len(buf) and not final:
+            raise _Incomplete
+        return value, end
+
+    def _parse(self, final: bool) -> None:
+        buf = self._buf + "".join(self._pending)
+        self._pending.clear()
+        self._pending_len = 0
+        pos = 0
+        try:
+            while True:
+                pos = WHITESPACE.match(buf, pos).end()
+                if pos >= len(buf):
+                    break
+                pos = self._step(buf, pos, final)
+        except _Incomplete:
+            self._retry_at = 2 * (len(buf) - pos)
+        else:
+            self._retry_at = 0
+        self._buf = buf[pos:]
+
+    def _step(self, buf: str, pos: int, final: bool) -> int:
+        """buf[pos] から 1 トークン分を処理し、次の位置を返す。"""
+        ch = buf[pos]
+        state = self._state
+        if state == _START:
+            if ch != "{":
+                raise ValueError(f"Expected JSON object at {self.bytes_read}")
+            self._state = _KEY
+            return pos + 1
+        if state == _KEY:
+            if ch == "}":
+                self._state = _DONE
+                return pos + 1
+            if ch == ",":
+                return pos + 1
+            self._key, end = self._decode(buf, pos, final)
+            self._state = _COLON
+            return end
+        if state == _COLON:
+            if ch != ":":
+                raise ValueError(f"Expected ':' after {self._key!r}")
+            self._state = _VALUE
+            return pos + 1
+        if state == _VALUE:
+            if self._key == self._array_key and ch == "[":
+                self._state = _ITEMS
+                return pos + 1
+            self.fields[self._key], end = self._decode(buf, pos, final)
+            self._state = _KEY
+            return end
+        if state == _ITEMS:
+            if ch == "]":
+                self._state = _KEY
+                return pos + 1
+            if ch == ",":
+                return pos + 1
+            item, end = self._decode(buf, pos, final)
+            if isinstance(item, dict) and self._keep(item):
+                self.items.append(self._project(item))
+            else:
+                self.skipped += 1
+            return end
+        raise ValueError("Unexpected data after JSON object")
@@ -0,0 +1,204 @@
+import asyncio
+import math
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable
+
+from confee_agent.config import env_bool, env_float, env_int
+
+DEFAULT_PERCENTILE = 0.95
+DEFAULT_MIN_DELAY_SECONDS = 0.05
+DEFAULT_BUDGET_RATIO = 0.05
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_WINDOW = 200
+DEFAULT_WORKERS = 8
+
+class HedgeCancelled(Exception):
+    """もう一方のリクエストが先に終わったため、中断したリクエストが送出する。"""
+
+
+class LatencyTracker:
+    """直近 window 件のリクエストの所要時間から、パーセンタイルを求める（スレッドセーフ）。"""
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, math.ceil(q * len(samples)) - 1)]
+
+
+class Hedger:
+    """遅いリクエストに対して、同じリクエストをもう 1 つ送り、先に終わった方の結果を使う。
+
+    最初のリクエストが直近の所要時間の percentile（既定 p95）を過ぎても終わらない場合に 2 つ目を送る。
+    2 つ目を送るのはリクエスト全体の budget_ratio の割合まで（上流の負荷を増やしすぎないため）。
+    所要時間のサンプルが min_samples 件に満たないうちは送らない。
+    同期版はヘッジの対象になるリクエストを max_workers 本のスレッドで実行し、先に終わった方の結果をすぐに返す
+    （負けた方は中断の合図を受けて裏で終わる）。スレッドが空いていない場合は呼び出し元のスレッドで実行し、ヘッジしない。
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        percentile: float = DEFAULT_PERCENTILE,
+        min_delay_seconds: float = DEFAULT_MIN_DELAY_SECONDS,
+        budget_ratio: float = DEFAULT_BUDGET_RATIO,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        tracker: LatencyTracker | None = None,
+        max_workers: int = DEFAULT_WORKERS,
+    ):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_delay_seconds = min_delay_seconds
+        self.budget_ratio = budget_ratio
+        self.min_samples = min_samples
+        self.tracker = tracker or LatencyTracker()
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        # 待ち行列に積まず、空いているスレッドがある場合だけヘッジする
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._requests = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+
+    @classmethod
+    def from_env(cls) -> "Hedger":
+        return cls(
+            enabled=env_bool("CONNPASS_HEDGE_ENABLED"),
+            percentile=env_float("CONNPASS_HEDGE_PERCENTILE", DEFAULT_PERCENTILE),
+            min_delay_seconds=env_float("CONNPASS_HEDGE_MIN_DELAY_SECONDS", DEFAULT_MIN_DELAY_SECONDS),
+            budget_ratio=env_float("CONNPASS_HEDGE_BUDGET_RATIO", DEFAULT_BUDGET_RATIO),
+            min_samples=env_int("CONNPASS_HEDGE_MIN_SAMPLES", DEFAULT_MIN_SAMPLES),
+            max_workers=env_int("CONNPASS_HEDGE_MAX_WORKERS", DEFAULT_WORKERS),
+        )
+
+    def hedge_delay(self) -> float | None:
+        """2 つ目を送るまでの待ち秒数。ヘッジしない場合は None。"""
+        if not self.enabled or len(self.tracker) < self.min_samples:
+            return None
+        return max(self.min_delay_seconds, self.tracker.percentile(self.percentile))
+
+    def _take_budget(self) -> bool:
+        with self._lock:
+            if self._hedges + 1 > self.budget_ratio * self._requests:
+                return False
+            self._hedges += 1
+            return True
+
+    def _count_request(self) -> None:
+        with self._lock:
+            self._requests += 1
+
+    def _count_win(self) -> None:
+        with self._lock:
+            self._hedge_wins += 1
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="connpass-hedge")
+            return self._executor
+
+    def _start(self, fn: Callable[[threading.Event], Any], cancelled: threading.Event) -> Future:
+        """確保済みのスレッドの枠で fn を実行する。枠は fn が終わったときに返す。"""
+        try:
+            future = self._get_executor().submit(fn, cancelled)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def run(
+        self, fn: Callable[[threading.Event], Any], can_hedge: Callable[[], bool] = lambda: True
+    ) -> tuple[Any, bool]:
+        """fn を実行し、(結果, ヘッジしたか) を返す。can_hedge は 2 つ目を送る直前に確認する条件。
+
+        fn には中断の合図の Event を渡す。fn はセットされたら HedgeCancelled を送出して処理を打ち切ること。
+        先に終わった方が例外の場合はもう一方の結果を待つ。両方失敗した場合は最初のリクエストの例外を送出する。
+        """
+        self._count_request()
+        delay = self.hedge_delay()
+        if delay is None or not self._slots.acquire(blocking=False):
+            return fn(threading.Event()), False
+
+        primary_cancelled = threading.Event()
+        primary = self._start(fn, primary_cancelled)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._slots.acquire(blocking=False):
+            return primary.result(), False
+        if not (self._take_budget() and can_hedge()):
+            self._slots.release()
+            return primary.result(), False
+
+        hedge_cancelled = threading.Event()
+        hedge = self._start(fn, hedge_cancelled)
+        cancels = {primary: primary_cancelled, hedge: hedge_cancelled}
+        pending: set[Future] = {primary, hedge}
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if future is hedge:
+                            self._count_win()
+                        return future.result(), True
+            return primary.result(), True
+        finally:
+            # 負けた方は中断の合図を受けて裏で終わり、スレッドの枠を返す
+            for future in pending:
+                cancels[future].set()
+
+    async def run_async(
+        self, fn: Callable[[], Awaitable[Any]], can_hedge: Callable[[], bool] = lambda: True
+    ) -> tuple[Any, bool]:
+        """run() の非同期版。負けた方のリクエストはキャンセルする。"""
+        self._count_request()
+        delay = self.hedge_delay()
+        if delay is None:
+            return await fn(), False
+
+        primary = asyncio.ensure_future(fn())
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or not (self._take_budget() and can_hedge()):
+            return await primary, False
+
+        hedge = asyncio.ensure_future(fn())
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._count_win()
+                        return task.result(), True
+            return primary.result(), True
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> dict:
+        p = self.tracker.percentile(self.percentile)
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "hedges": self._hedges,
+                "hedge_wins": self._hedge_wins,
+                "latency_percentile_ms": None if p is None else round(p * 1000, 1),
+            }
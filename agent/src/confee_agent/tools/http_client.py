@@ -0,0 +1,109 @@
+import asyncio
+import atexit
+import logging
+import threading
+import weakref
+
+import httpx
+
+from confee_agent.config import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+# コネクションプール設定（環境変数で上書き可能）
+DEFAULT_POOL_MAX_CONNECTIONS = 20
+DEFAULT_POOL_MAX_KEEPALIVE = 10
+DEFAULT_KEEPALIVE_EXPIRY_SECONDS = 30.0
+
+_client: httpx.Client | None = None
+_client_lock = threading.Lock()
+
+# httpx.AsyncClient はイベントループに紐づくため、ループごとに 1 つ保持する
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _http2_available() -> bool:
+    """h2 パッケージがインストールされている場合のみ HTTP/2 を有効にする。"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=env_int(
+            "CONNPASS_POOL_MAX_CONNECTIONS", DEFAULT_POOL_MAX_CONNECTIONS
+        ),
+        max_keepalive_connections=env_int(
+            "CONNPASS_POOL_MAX_KEEPALIVE", DEFAULT_POOL_MAX_KEEPALIVE
+        ),
+        keepalive_expiry=env_float(
+            "CONNPASS_KEEPALIVE_EXPIRY_SECONDS", DEFAULT_KEEPALIVE_EXPIRY_SECONDS
+        ),
+    )
+
+
+def get_client() -> httpx.Client:
+    """プロセス全体で共有する keep-alive 付き HTTP クライアントを取得する。
+
+    初回呼び出し時に生成し、以降は同じコネクションプールを再利用する。
+    """
+    global _client
+    if _client is not None and not _client.is_closed:
+        return _client
+
+    with _client_lock:
+        if _client is None or _client.is_closed:
+            limits = _pool_limits()
+            http2 = _http2_available()
+            _client = httpx.Client(limits=limits, http2=http2)
+            logger.info(
+                "HTTP client created: http2=%s, max_connections=%s, keepalive_expiry=%s",
+                http2,
+                limits.max_connections,
+                limits.keepalive_expiry,
+            )
+    return _client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """実行中のイベントループで共有する非同期 HTTP クライアントを取得する。"""
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        client = _async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(limits=_pool_limits(), http2=_http2_available())
+            _async_clients[loop] = client
+            logger.info("Async HTTP client created for event loop %s", id(loop))
+    return client
+
+
+async def aclose_async_client() -> None:
+    """実行中のイベントループに紐づく非同期 HTTP クライアントを閉じる。"""
+    loop = asyncio.get_running_loop()
+    with _client_lock:
+        client = _async_clients.pop(loop, None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+        logger.info("Async HTTP client closed")
+
+
+def close_client() -> None:
+    """共有 HTTP クライアントを閉じる。プロセス終了時に自動で呼ばれる。
+
+    非同期クライアントは所属するイベントループ上でしか閉じられないため、参照のみ破棄する。
+    """
+    global _client
+    with _client_lock:
+        if _client is not None and not _client.is_closed:
+            _client.close()
+            logger.info("HTTP client closed")
+        _client = None
+        _async_clients.clear()
+
+
+atexit.register(close_client)
@@ -0,0 +1,175 @@
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable
+
+from confee_agent.config import env_float, env_int
+
+# connpass API の利用制限（1 秒に 1 リクエスト程度）に合わせた既定値
+DEFAULT_QPS = 1.0
+DEFAULT_BURST = 1
+DEFAULT_MAX_WAIT_SECONDS = 10.0
+
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BACKOFF_BASE_SECONDS = 0.5
+DEFAULT_BACKOFF_MAX_SECONDS = 8.0
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class RateLimiter:
+    """プロセス全体で共有するトークンバケット（スレッドセーフ）。
+
+    呼び出し順に次の送信時刻を予約するため、待たされる呼び出しは先着順に処理される。
+    予約した待ち時間が max_wait_seconds を超える場合は予約せずに諦める。qps が 0 以下なら制限しない。
+    """
+
+    def __init__(
+        self,
+        qps: float = DEFAULT_QPS,
+        burst: int = DEFAULT_BURST,
+        max_wait_seconds: float = DEFAULT_MAX_WAIT_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.qps = qps
+        self.burst = max(burst, 1)
+        self.max_wait_seconds = max_wait_seconds
+        self._clock = clock
+        # 次のリクエストを送れる理論上の時刻（GCRA の theoretical arrival time）
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+        self._waits = 0
+        self._wait_seconds = 0.0
+        self._rejected = 0
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        return cls(
+            qps=env_float("CONNPASS_RATE_LIMIT_QPS", DEFAULT_QPS),
+            burst=env_int("CONNPASS_RATE_LIMIT_BURST", DEFAULT_BURST),
+            max_wait_seconds=env_float("CONNPASS_RATE_LIMIT_MAX_WAIT_SECONDS", DEFAULT_MAX_WAIT_SECONDS),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.qps > 0
+
+    def reserve(self) -> float | None:
+        """送信枠を予約し、送信までに待つ秒数を返す。max_wait_seconds を超える場合は None。"""
+        if not self.enabled:
+            return 0.0
+        interval = 1.0 / self.qps
+        with self._lock:
+            now = self._clock()
+            next_at = max(self._next_at, now)
+            delay = max(0.0, next_at - now - (self.burst - 1) * interval)
+            if delay > self.max_wait_seconds:
+                self._rejected += 1
+                return None
+            self._next_at = next_at + interval
+            if delay > 0:
+                self._waits += 1
+                self._wait_seconds += delay
+            return delay
+
+    def try_acquire(self) -> bool:
+        """待たずに送れる場合だけ送信枠を予約する（ヘッジ等の追加のリクエスト用）。"""
+        if not self.enabled:
+            return True
+        interval = 1.0 / self.qps
+        with self._lock:
+            now = self._clock()
+            next_at = max(self._next_at, now)
+            if next_at - now - (self.burst - 1) * interval > 0:
+                return False
+            self._next_at = next_at + interval
+            return True
+
+    def acquire(self) -> bool:
+        delay = self.reserve()
+        if delay is None:
+            return False
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+    async def acquire_async(self) -> bool:
+        delay = self.reserve()
+        if delay is None:
+            return False
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return True
+
+    def pause(self, seconds: float) -> None:
+        """429 の Retry-After に従い、全ての呼び出しの送信を seconds 秒後以降に遅らせる。"""
+        if not self.enabled or seconds <= 0:
+            return
+        with self._lock:
+            self._next_at = max(self._next_at, self._clock() + seconds)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._next_at = 0.0
+            self._waits = self._rejected = 0
+            self._wait_seconds = 0.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "waits": self._waits,
+                "wait_seconds": round(self._wait_seconds, 3),
+                "rejected": self._rejected,
+            }
+
+
+def parse_retry_after(value: str | None, now: Callable[[], float] = time.time) -> float | None:
+    """Retry-After ヘッダ（秒数または HTTP 日付）を待ち秒数に変換する。"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - now())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """429 / 5xx を、ジッター付きの指数バックオフで再試行する方針。
+
+    Retry-After があればその秒数以上待つ。待ち時間が max_delay_seconds を超える場合は再試行しない。
+    """
+
+    def __init__(
+        self,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        base_delay_seconds: float = DEFAULT_BACKOFF_BASE_SECONDS,
+        max_delay_seconds: float = DEFAULT_BACKOFF_MAX_SECONDS,
+        rand: Callable[[], float] = random.random,
+    ):
+        self.max_retries = max(max_retries, 0)
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self._rand = rand
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        return cls(
+            max_retries=env_int("CONNPASS_MAX_RETRIES", DEFAULT_MAX_RETRIES),
+            base_delay_seconds=env_float("CONNPASS_BACKOFF_BASE_SECONDS", DEFAULT_BACKOFF_BASE_SECONDS),
+            max_delay_seconds=env_float("CONNPASS_BACKOFF_MAX_SECONDS", DEFAULT_BACKOFF_MAX_SECONDS),
+        )
+
+    def delay(self, status_code: int, retry_after: float | None, attempt: int) -> float | None:
+        """attempt 回目（0 始まり）の失敗後に待つ秒数を返す。再試行しない場合は None。"""
+        if status_code not in RETRYABLE_STATUSES or attempt >= self.max_retries:
+            return None
+        # full jitter: [0, base * 2^attempt) の一様乱数
+        backoff = min(self.max_delay_seconds, self.base_delay_seconds * (2**attempt)) * self._rand()
+        delay = max(backoff, retry_after or 0.0)
+        if delay > self.max_delay_seconds:
+            return None
+        return delay
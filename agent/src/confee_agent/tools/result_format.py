@@ -0,0 +1,75 @@
+import html
+import re
+
+from confee_agent.models import ConnpassEvent
+from confee_agent.serialization import dumps
+
+DEFAULT_DESCRIPTION_MAX_CHARS = 200
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def strip_html(text: str) -> str:
+    """HTML タグを除去し、文字参照を展開して空白を詰める。"""
+    text = _TAG_RE.sub(" ", text)
+    return _WHITESPACE_RE.sub(" ", html.unescape(text)).strip()
+
+
+def truncate(text: str, max_chars: int) -> str:
+    if max_chars <= 0 or len(text) <= max_chars:
+        return text
+    return text[: max_chars - 1].rstrip() + "…"
+
+
+def compact_event(e: ConnpassEvent, description_max_chars: int = DEFAULT_DESCRIPTION_MAX_CHARS) -> dict:
+    """システムプロンプトのテンプレートで使う項目だけに絞ったイベント表現を返す。
+
+    概要は HTML を除去して切り詰め、値のない項目は省略する。
+    """
+    description = e.description
+    if description:
+        description = truncate(strip_html(description), description_max_chars)
+
+    fields = {
+        "id": e.id,
+        "title": e.title,
+        "catch": e.catch,
+        "description": description,
+        "url": e.url,
+        "started_at": e.started_at,
+        "ended_at": e.ended_at,
+        "place": e.place,
+        "address": e.address,
+        "accepted": e.accepted,
+        "waiting": e.waiting,
+        "limit": e.limit,
+        "open_status": e.open_status,
+    }
+    return {k: v for k, v in fields.items() if v is not None and v != ""}
+
+
+def estimate_tokens(payload: dict) -> int:
+    """ツール結果のトークン数を概算する（ASCII は 4 文字で 1 トークン、それ以外は 1 文字 1 トークン）。"""
+    text = dumps(payload)
+    non_ascii = len(text) - len(text.encode("ascii", "ignore"))
+    return non_ascii + (len(text) - non_ascii + 3) // 4
+
+
+def apply_token_budget(payload: dict, max_tokens: int) -> dict:
+    """events の末尾から削って、ツール結果を max_tokens 以内に収める（0 以下は無制限）。"""
+    events = payload.get("events")
+    if max_tokens <= 0 or not events or estimate_tokens(payload) <= max_tokens:
+        return payload
+
+    # 1 件あたりの平均トークン数から残す件数を見積もり、超過している間は 1 件ずつ減らす
+    overhead = estimate_tokens({**payload, "events": []})
+    per_event = max(1, (estimate_tokens(payload) - overhead) // len(events))
+    keep = max(0, min(len(events), (max_tokens - overhead) // per_event))
+    trimmed = {**payload, "events": events[:keep], "omitted_events": len(events) - keep}
+    while keep > 0 and estimate_tokens(trimmed) > max_tokens:
+        keep -= 1
+        trimmed = {**payload, "events": events[:keep], "omitted_events": len(events) - keep}
+    if "results_returned" in trimmed:
+        trimmed["results_returned"] = keep
+    return trimmed
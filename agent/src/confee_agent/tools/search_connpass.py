@@ -1,10 +1,38 @@
+import asyncio
+import dataclasses
 import logging
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import httpx
 from strands import tool
 
+from confee_agent.config import env_bool, env_float, env_int
+from confee_agent.event_index import DEFAULT_MAX_AGE_SECONDS, current_index, record_events
+from confee_agent.metrics import emit_metrics
 from confee_agent.models import ConnpassEvent, ConnpassSearchResult
+from confee_agent.ranking import query_terms, rank_events
+from confee_agent.shared_cache import CacheLookup, TieredCache, get_backend
+from confee_agent.tools.circuit_breaker import CircuitBreaker
+from confee_agent.tools.event_stream import EventStream
+from confee_agent.tools.hedging import HedgeCancelled, Hedger
+from confee_agent.tools.http_client import get_async_client, get_client
+from confee_agent.tools.rate_limit import RETRYABLE_STATUSES, RateLimiter, RetryPolicy, parse_retry_after
+from confee_agent.tools.response_cache import (
+    DEFAULT_MAX_BYTES,
+    DEFAULT_MAX_ENTRIES,
+    DEFAULT_TTL_SECONDS,
+    ResponseCache,
+    make_cache_key,
+)
+from confee_agent.tools.result_format import (
+    DEFAULT_DESCRIPTION_MAX_CHARS,
+    apply_token_budget,
+    compact_event,
+)
+from confee_agent.tools.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -12,9 +40,56 @@ CONNPASS_API_URL = "https://connpass.com/api/v2/events/"
 CONNPASS_SECRET_NAME = "confee/connpass-api-key"
 USER_AGENT = "confee/1.0"
 TIMEOUT_SECONDS = 5
+DEFAULT_CONNECT_TIMEOUT_SECONDS = 2.0
+DEFAULT_POOL_TIMEOUT_SECONDS = 1.0
+
+# connpass API の 1 リクエストあたり最大取得件数と、自動ページ取得の上限
+MAX_PAGE_SIZE = 100
+MAX_FETCH_RESULTS = 1000
+DEFAULT_PAGE_WORKERS = 3
+DEFAULT_LAST_GOOD_SECONDS = 86400.0
+DEFAULT_INDEX_MAX_EVENTS = 3000
 
 _cached_api_key: str | None = None
 
+# 同一検索条件の結果を再利用するキャッシュ（プロセス内の L1 と、CONFEE_CACHE_BACKEND で指定した共有の L2）
+_response_cache = TieredCache(
+    "connpass",
+    ttl_seconds=env_float("CONNPASS_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS),
+    stale_seconds=env_float("CONNPASS_CACHE_STALE_SECONDS", 0),
+    max_entries=env_int("CONNPASS_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES),
+    max_bytes=env_int("CONNPASS_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES),
+    l2=get_backend(),
+    encode=ConnpassSearchResult.to_dict,
+    decode=ConnpassSearchResult.from_dict,
+)
+
+# connpass API の呼び出し頻度の制限（プロセス全体で共有）と、429 / 5xx の再試行の方針
+_rate_limiter = RateLimiter.from_env()
+_retry_policy = RetryPolicy.from_env()
+
+# connpass API の障害時に呼び出しを止めるサーキットブレーカーと、障害時に返す検索条件ごとの最後の成功結果
+_circuit_breaker = CircuitBreaker.from_env()
+_last_good = ResponseCache(
+    ttl_seconds=env_float("CONNPASS_LAST_GOOD_SECONDS", DEFAULT_LAST_GOOD_SECONDS),
+    max_entries=env_int("CONNPASS_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES),
+    max_bytes=env_int("CONNPASS_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES),
+)
+
+# 接続・読み込み・プール待ちのタイムアウトを分け、接続できない場合に読み込みの時間まで待たない
+_timeout = httpx.Timeout(
+    TIMEOUT_SECONDS,
+    connect=env_float("CONNPASS_CONNECT_TIMEOUT_SECONDS", DEFAULT_CONNECT_TIMEOUT_SECONDS),
+    read=env_float("CONNPASS_READ_TIMEOUT_SECONDS", TIMEOUT_SECONDS),
+    pool=env_float("CONNPASS_POOL_TIMEOUT_SECONDS", DEFAULT_POOL_TIMEOUT_SECONDS),
+)
+
+# 遅いリクエストに同じリクエストをもう 1 つ送るヘッジ（CONNPASS_HEDGE_ENABLED で有効化）
+_hedger = Hedger.from_env()
+
+# 同じ検索条件の実行中のリクエストをまとめ、後から来た呼び出しはその結果を共有する（同期・非同期共通）
+_inflight = SingleFlight()
+
 
 def _get_api_key() -> str:
     """環境変数 → Secrets Manager の優先順で API キーを取得する。"""
@@ -78,6 +153,7 @@ def _parse_event(event_data: dict) -> ConnpassEvent:
         limit=event_data.get("limit"),
         event_type=event_data.get("event_type", ""),
         open_status=event_data.get("open_status", ""),
+        updated_at=event_data.get("updated_at"),
     )
 
 
@@ -85,28 +161,25 @@ def _parse_event(event_data: dict) -> ConnpassEvent:
 _ACTIVE_OPEN_STATUSES = {"open", "preopen"}
 
 
-def _search_connpass_api(
-    keyword: str = "",
-    keyword_or: str = "",
-    ym: str = "",
-    ymd: str = "",
-    prefecture: str = "",
-    order: int = 1,
-    start: int = 1,
-    count: int = 10,
-) -> ConnpassSearchResult | dict:
-    api_key = _get_api_key()
-    if not api_key:
-        return {
-            "error": True,
-            "message": "connpass APIキーが設定されていません。環境変数 CONNPASS_API_KEY を設定してください。",
-        }
+def _is_active(event_data: dict) -> bool:
+    return event_data.get("open_status", "") in _ACTIVE_OPEN_STATUSES
+
+
+def _event_stream() -> EventStream:
+    """受信しながら、申し込み可能なイベントだけを ConnpassEvent に変換するパーサ。"""
+    return EventStream(keep=_is_active, project=_parse_event)
 
-    headers = {
-        "X-API-Key": api_key,
-        "User-Agent": USER_AGENT,
-    }
 
+def _build_params(
+    keyword: str,
+    keyword_or: str,
+    ym: str,
+    ymd: str,
+    prefecture: str,
+    order: int,
+    start: int,
+    count: int,
+) -> dict:
     params: dict = {"order": order, "start": start, "count": count}
     if keyword:
         params["keyword"] = keyword
@@ -118,49 +191,516 @@ def _search_connpass_api(
         params["ymd"] = ymd
     if prefecture:
         params["prefecture"] = prefecture
+    return params
 
-    try:
-        response = httpx.get(
-            CONNPASS_API_URL,
-            headers=headers,
-            params=params,
-            timeout=TIMEOUT_SECONDS,
-        )
 
-        if response.status_code != 200:
-            return {
-                "error": True,
-                "status_code": response.status_code,
-                "message": f"connpass API returned status {response.status_code}",
-            }
-
-        data = response.json()
-        all_events = [_parse_event(e) for e in data.get("events", [])]
-
-        # 申し込み期限切れ・キャンセル済みイベントを除外
-        events = [e for e in all_events if e.open_status in _ACTIVE_OPEN_STATUSES]
-        filtered_count = len(all_events) - len(events)
-        if filtered_count > 0:
-            logger.info("Filtered out %d expired/cancelled events", filtered_count)
-
-        return ConnpassSearchResult(
-            results_returned=len(events),
-            results_available=data.get("results_available", 0),
-            results_start=data.get("results_start", 1),
-            events=events,
-        )
+def _build_headers(api_key: str) -> dict:
+    return {
+        "X-API-Key": api_key,
+        "User-Agent": USER_AGENT,
+    }
 
-    except httpx.TimeoutException:
+
+def _missing_api_key_error() -> dict:
+    return {
+        "error": True,
+        "message": "connpass APIキーが設定されていません。環境変数 CONNPASS_API_KEY を設定してください。",
+    }
+
+
+def _http_error(e: httpx.HTTPError) -> dict:
+    if isinstance(e, httpx.TimeoutException):
         return {
             "error": True,
             "message": "Timeout: connpass API did not respond within the time limit.",
         }
-    except httpx.HTTPError as e:
+    return {
+        "error": True,
+        "message": f"HTTP error occurred: {e}",
+    }
+
+
+def _circuit_open_error() -> dict:
+    return {
+        "error": True,
+        "circuit_open": True,
+        "message": "connpass API is temporarily unavailable. Please try again later.",
+    }
+
+
+def _last_known_good(cache_key: tuple, error: dict) -> ConnpassSearchResult | dict:
+    """connpass API から結果を得られない場合、同じ検索条件で最後に取得できた結果を stale として返す。"""
+    last = _last_good.get(cache_key)
+    if last is None:
+        return error
+    logger.warning("Serving last known good result (%s)", error.get("message"))
+    return dataclasses.replace(last, stale=True)
+
+
+def _finish_fetch(
+    response: httpx.Response, events: EventStream | None, cache_key: tuple, elapsed: float
+) -> ConnpassSearchResult | dict:
+    """最終的なレスポンスをサーキットブレーカーに記録して結果に変換する（同期・非同期共通）。"""
+    if response.status_code in RETRYABLE_STATUSES:
+        _circuit_breaker.record_failure()
+        return _last_known_good(cache_key, _handle_response(response, events, cache_key))
+    _circuit_breaker.record_success(elapsed)
+    return _handle_response(response, events, cache_key)
+
+
+def _record_request(elapsed: float, hedged: bool) -> None:
+    if env_bool("CONNPASS_REQUEST_METRICS"):
+        emit_metrics({"ConnpassRequestMs": elapsed * 1000}, dimensions={"Service": "confee-agent"})
+        emit_metrics({"ConnpassHedgedRequests": int(hedged)}, unit="Count", dimensions={"Service": "confee-agent"})
+
+
+def _send(api_key: str, params: dict) -> tuple[httpx.Response, EventStream | None, float]:
+    """connpass API に 1 回リクエストし、(レスポンス, パース結果, 所要秒数) を返す。遅い場合はヘッジする。
+
+    200 のレスポンスは本文を受信しながらパースする（本文全体はメモリに載せない）。
+    ヘッジで負けたリクエストは裏で続き、本文の受信の合間に中断の合図を確認して打ち切る
+    （応答を待っている間は、応答か読み込みのタイムアウトまでヘッジ用のスレッドの枠を使う）。
+    """
+
+    def send(cancelled: threading.Event) -> tuple[httpx.Response, EventStream | None]:
+        started = time.monotonic()
+        events = None
+        with get_client().stream(
+            "GET",
+            CONNPASS_API_URL,
+            headers=_build_headers(api_key),
+            params=params,
+            timeout=_timeout,
+        ) as response:
+            if response.status_code == 200:
+                events = _event_stream()
+                for chunk in response.iter_bytes():
+                    if cancelled.is_set():
+                        raise HedgeCancelled()
+                    events.feed(chunk)
+                events.close()
+        _hedger.tracker.record(time.monotonic() - started)
+        return response, events
+
+    started = time.monotonic()
+    (response, events), hedged = _hedger.run(send, can_hedge=_rate_limiter.try_acquire)
+    elapsed = time.monotonic() - started
+    _record_request(elapsed, hedged)
+    return response, events, elapsed
+
+
+async def _send_async(api_key: str, params: dict) -> tuple[httpx.Response, EventStream | None, float]:
+    async def send() -> tuple[httpx.Response, EventStream | None]:
+        started = time.monotonic()
+        events = None
+        async with get_async_client().stream(
+            "GET",
+            CONNPASS_API_URL,
+            headers=_build_headers(api_key),
+            params=params,
+            timeout=_timeout,
+        ) as response:
+            if response.status_code == 200:
+                events = _event_stream()
+                async for chunk in response.aiter_bytes():
+                    events.feed(chunk)
+                events.close()
+        _hedger.tracker.record(time.monotonic() - started)
+        return response, events
+
+    started = time.monotonic()
+    (response, events), hedged = await _hedger.run_async(send, can_hedge=_rate_limiter.try_acquire)
+    elapsed = time.monotonic() - started
+    _record_request(elapsed, hedged)
+    return response, events, elapsed
+
+
+def _rate_limited_error() -> dict:
+    return {
+        "error": True,
+        "status_code": 429,
+        "message": "connpass API is busy (rate limited). Please try again in a few seconds.",
+    }
+
+
+def _rate_limited(attempt: int) -> dict:
+    """レート制限の枠を得られずにリクエストを打ち切る。サーキットブレーカーには必ず結果を伝える。
+
+    最初の試行ではリクエストを送っていないため half_open の試行を譲り、再試行中なら直前の 429 / 5xx を失敗として記録する。
+    """
+    if attempt == 0:
+        _circuit_breaker.release()
+    else:
+        _circuit_breaker.record_failure()
+    return _rate_limited_error()
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float | None:
+    """再試行する場合の待ち秒数を返す。429 の Retry-After は他の呼び出しの送信も遅らせる。"""
+    if response.status_code not in RETRYABLE_STATUSES:
+        return None
+    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+    if response.status_code == 429 and retry_after:
+        _rate_limiter.pause(retry_after)
+    delay = _retry_policy.delay(response.status_code, retry_after, attempt)
+    if delay is not None:
+        logger.warning(
+            "connpass API returned %d, retrying in %.2fs (attempt %d)", response.status_code, delay, attempt + 1
+        )
+    return delay
+
+
+def _handle_response(
+    response: httpx.Response, events: EventStream | None, cache_key: tuple
+) -> ConnpassSearchResult | dict:
+    """受信時にパースした結果を検証し、成功時は最後の成功結果として保存する（同期・非同期共通）。
+
+    検索結果キャッシュ（L2 への書き込みを含む）への保存は、同期・非同期それぞれの呼び出し側で行う。
+
+    申し込み期限切れ・キャンセル済みイベントはパース時に除外済み。
+    """
+    if response.status_code != 200 or events is None:
         return {
             "error": True,
-            "message": f"HTTP error occurred: {e}",
+            "status_code": response.status_code,
+            "message": f"connpass API returned status {response.status_code}",
         }
 
+    if events.skipped > 0:
+        logger.info("Filtered out %d expired/cancelled events", events.skipped)
+
+    result = ConnpassSearchResult(
+        results_returned=len(events.items),
+        results_available=events.fields.get("results_available", 0),
+        results_start=events.fields.get("results_start", 1),
+        events=events.items,
+    )
+    _last_good.set(cache_key, result, size=events.bytes_read)
+    # 回答キャッシュが、回答に使ったイベントの更新を検出できるようにする
+    record_events(result.events)
+    return result
+
+
+def _search_connpass_api(
+    keyword: str = "",
+    keyword_or: str = "",
+    ym: str = "",
+    ymd: str = "",
+    prefecture: str = "",
+    order: int = 1,
+    start: int = 1,
+    count: int = 10,
+) -> ConnpassSearchResult | dict:
+    api_key = _get_api_key()
+    if not api_key:
+        return _missing_api_key_error()
+
+    params = _build_params(keyword, keyword_or, ym, ymd, prefecture, order, start, count)
+    cache_key = make_cache_key(**params)
+    cached = _cached_result(api_key, params, cache_key, _response_cache.lookup(cache_key))
+    if cached is not None:
+        return cached
+    return _inflight.do(cache_key, lambda: _fetch(api_key, params, cache_key))
+
+
+def _fetch(api_key: str, params: dict, cache_key: tuple) -> ConnpassSearchResult | dict:
+    """サーキットブレーカーが許可した場合に、レート制限の枠を待ってからリクエストする。
+
+    429 / 5xx はバックオフして再試行し、最終的に失敗した場合は最後に取得できた結果を返す。
+    """
+    if not _circuit_breaker.allow():
+        return _last_known_good(cache_key, _circuit_open_error())
+    for attempt in range(_retry_policy.max_retries + 1):
+        if not _rate_limiter.acquire():
+            return _rate_limited(attempt)
+        try:
+            response, events, elapsed = _send(api_key, params)
+        except httpx.HTTPError as e:
+            _circuit_breaker.record_failure()
+            return _last_known_good(cache_key, _http_error(e))
+        except Exception:
+            # 不正な本文など httpx 以外の失敗も記録し、half_open の試行を使ったままにしない
+            _circuit_breaker.record_failure()
+            raise
+        delay = _retry_delay(response, attempt)
+        if delay is None:
+            break
+        time.sleep(delay)
+    result = _finish_fetch(response, events, cache_key, elapsed)
+    if _is_fresh(response, events):
+        _response_cache.set(cache_key, result, size=events.bytes_read)
+    return result
+
+
+def _is_fresh(response: httpx.Response, events: EventStream | None) -> bool:
+    """connpass API から結果を取得できたかどうか（検索結果キャッシュに保存する対象）。"""
+    return response.status_code == 200 and events is not None
+
+
+def _cached_result(
+    api_key: str, params: dict, cache_key: tuple, cached: CacheLookup | None
+) -> ConnpassSearchResult | None:
+    """キャッシュの検索結果 cached を返す。期限切れ（stale）の結果はそのまま返し、裏で取り直す。"""
+    if cached is None:
+        return None
+    if cached.stale:
+        _response_cache.revalidate(
+            cache_key, lambda: _inflight.do(cache_key, lambda: _fetch(api_key, params, cache_key))
+        )
+    return cached.value
+
+
+async def _search_connpass_api_async(
+    keyword: str = "",
+    keyword_or: str = "",
+    ym: str = "",
+    ymd: str = "",
+    prefecture: str = "",
+    order: int = 1,
+    start: int = 1,
+    count: int = 10,
+) -> ConnpassSearchResult | dict:
+    """_search_connpass_api の非同期版。I/O 待ちの間スレッドを占有しない。"""
+    api_key = _get_api_key()
+    if not api_key:
+        return _missing_api_key_error()
+
+    params = _build_params(keyword, keyword_or, ym, ymd, prefecture, order, start, count)
+    cache_key = make_cache_key(**params)
+    # L2 の読み込みは通信を伴うため、スレッドで行いイベントループを止めない
+    cached = _cached_result(api_key, params, cache_key, await _response_cache.lookup_async(cache_key))
+    if cached is not None:
+        return cached
+    return await _inflight.do_async(cache_key, lambda: _fetch_async(api_key, params, cache_key))
+
+
+async def _fetch_async(api_key: str, params: dict, cache_key: tuple) -> ConnpassSearchResult | dict:
+    if not _circuit_breaker.allow():
+        return _last_known_good(cache_key, _circuit_open_error())
+    for attempt in range(_retry_policy.max_retries + 1):
+        if not await _rate_limiter.acquire_async():
+            return _rate_limited(attempt)
+        try:
+            response, events, elapsed = await _send_async(api_key, params)
+        except httpx.HTTPError as e:
+            _circuit_breaker.record_failure()
+            return _last_known_good(cache_key, _http_error(e))
+        except Exception:
+            _circuit_breaker.record_failure()
+            raise
+        delay = _retry_delay(response, attempt)
+        if delay is None:
+            break
+        await asyncio.sleep(delay)
+    result = _finish_fetch(response, events, cache_key, elapsed)
+    if _is_fresh(response, events):
+        # L2 への書き込みは通信を伴うため、スレッドで行いイベントループを止めない
+        await _response_cache.set_async(cache_key, result, size=events.bytes_read)
+    return result
+
+
+def _remaining_page_starts(first: ConnpassSearchResult, max_results: int) -> list[int]:
+    """1 ページ目の結果から、残りのページの開始位置を計算する。"""
+    last = min(first.results_available, first.results_start - 1 + max_results)
+    return list(range(first.results_start + MAX_PAGE_SIZE, last + 1, MAX_PAGE_SIZE))
+
+
+def _merge_pages(
+    first: ConnpassSearchResult,
+    pages: list[ConnpassSearchResult | dict],
+    max_results: int,
+) -> ConnpassSearchResult:
+    """ページを開始位置順に連結する。失敗したページ以降は連続性が保てないため打ち切る。"""
+    events = list(first.events)
+    seen = {e.id for e in events}
+    for page in pages:
+        if isinstance(page, dict):
+            logger.warning("Stopped pagination after page error: %s", page.get("message"))
+            break
+        for event in page.events:
+            if event.id not in seen:
+                seen.add(event.id)
+                events.append(event)
+
+    events = events[:max_results]
+    return ConnpassSearchResult(
+        results_returned=len(events),
+        results_available=first.results_available,
+        results_start=first.results_start,
+        events=events,
+        stale=first.stale or any(not isinstance(page, dict) and page.stale for page in pages),
+    )
+
+
+def _search_connpass_pages(max_results: int, **params) -> ConnpassSearchResult | dict:
+    """最大 max_results 件まで、複数ページを並行取得して開始位置順に連結する。"""
+    params["count"] = MAX_PAGE_SIZE
+    first = _search_connpass_api(**params)
+    if isinstance(first, dict):
+        return first
+
+    return _merge_pages(first, _fetch_remaining_pages(first, max_results, params), max_results)
+
+
+def _fetch_remaining_pages(
+    first: ConnpassSearchResult, max_results: int, params: dict
+) -> list[ConnpassSearchResult | dict]:
+    """2 ページ目以降を並行取得し、開始位置順に返す。"""
+    starts = _remaining_page_starts(first, max_results)
+    if not starts:
+        return []
+
+    workers = max(1, env_int("CONNPASS_PAGE_WORKERS", DEFAULT_PAGE_WORKERS))
+    with ThreadPoolExecutor(max_workers=min(workers, len(starts))) as executor:
+        return list(executor.map(lambda start: _search_connpass_api(**{**params, "start": start}), starts))
+
+
+async def _search_connpass_pages_async(max_results: int, **params) -> ConnpassSearchResult | dict:
+    """_search_connpass_pages の非同期版。"""
+    params["count"] = MAX_PAGE_SIZE
+    first = await _search_connpass_api_async(**params)
+    if isinstance(first, dict):
+        return first
+
+    semaphore = asyncio.Semaphore(max(1, env_int("CONNPASS_PAGE_WORKERS", DEFAULT_PAGE_WORKERS)))
+
+    async def fetch(start: int) -> ConnpassSearchResult | dict:
+        async with semaphore:
+            return await _search_connpass_api_async(**{**params, "start": start})
+
+    pages = await asyncio.gather(*(fetch(start) for start in _remaining_page_starts(first, max_results)))
+    return _merge_pages(first, list(pages), max_results)
+
+
+def _search_local_index(max_results: int = 0, **params) -> ConnpassSearchResult | None:
+    """事前取得したイベントインデックスが十分新しく、条件が対象範囲内ならそこから検索する。"""
+    index = current_index(env_float("CONNPASS_INDEX_MAX_AGE_SECONDS", DEFAULT_MAX_AGE_SECONDS))
+    if index is None:
+        return None
+    if max_results > 0:
+        params["count"] = max_results
+    return index.search(**params)
+
+
+def _index_fetch_error(message: str) -> dict:
+    return {"error": True, "message": message}
+
+
+def fetch_for_index(ym: str, prefecture: str = "") -> ConnpassSearchResult | dict:
+    """イベントインデックス構築用に、指定月（・都道府県）の申し込み可能なイベントをすべて取得する。
+
+    インデックスは対象の月の検索に応答するため、全件を取得できなかった場合（いずれかのページの失敗、
+    以前の検索結果（stale）、件数が CONNPASS_INDEX_MAX_EVENTS_PER_QUERY を超える場合）はエラーを返す。
+    呼び出し側は古いインデックスを使い続け、対象外の検索は API で処理する。
+    """
+    max_events = env_int("CONNPASS_INDEX_MAX_EVENTS_PER_QUERY", DEFAULT_INDEX_MAX_EVENTS)
+    params = {"ym": ym, "prefecture": prefecture, "order": 2, "count": MAX_PAGE_SIZE}
+    first = _search_connpass_api(**params)
+    if isinstance(first, dict):
+        return first
+    if first.results_available > max_events:
+        return _index_fetch_error(
+            f"{first.results_available} events exceed CONNPASS_INDEX_MAX_EVENTS_PER_QUERY ({max_events})"
+        )
+
+    pages = [first, *_fetch_remaining_pages(first, max_events, params)]
+    for page in pages:
+        if isinstance(page, dict):
+            return page
+        if page.stale:
+            return _index_fetch_error("connpass API returned a stale result")
+    return _merge_pages(first, pages[1:], max_events)
+
+
+def circuit_stats() -> dict:
+    """サーキットブレーカーの状態と、open にした回数・止めた呼び出しの件数を返す。"""
+    return _circuit_breaker.stats()
+
+
+def hedge_stats() -> dict:
+    """ヘッジの対象になったリクエスト数・送ったヘッジの数・ヘッジが先に終わった数と、所要時間のパーセンタイルを返す。"""
+    return _hedger.stats()
+
+
+def cache_stats() -> dict:
+    """検索結果キャッシュのヒット・ミス・追い出し件数と、まとめたリクエストの件数を返す。"""
+    return {**_response_cache.stats(), "coalesced": _inflight.stats()["coalesced"]}
+
+
+def _event_to_dict(e: ConnpassEvent) -> dict:
+    return {
+        "id": e.id,
+        "title": e.title,
+        "catch": e.catch,
+        "description": e.description,
+        "url": e.url,
+        "started_at": e.started_at,
+        "ended_at": e.ended_at,
+        "place": e.place,
+        "address": e.address,
+        "accepted": e.accepted,
+        "waiting": e.waiting,
+        "limit": e.limit,
+        "event_type": e.event_type,
+        "open_status": e.open_status,
+    }
+
+
+def _format_event(e: ConnpassEvent) -> dict:
+    """CONNPASS_COMPACT_RESULTS が有効な場合はプロンプトのテンプレートに必要な項目だけを返す。"""
+    if env_bool("CONNPASS_COMPACT_RESULTS"):
+        return compact_event(
+            e,
+            env_int("CONNPASS_DESCRIPTION_MAX_CHARS", DEFAULT_DESCRIPTION_MAX_CHARS),
+        )
+    return _event_to_dict(e)
+
+
+def _fit_token_budget(payload: dict) -> dict:
+    return apply_token_budget(payload, env_int("CONNPASS_RESULT_TOKEN_BUDGET", 0))
+
+
+def _format_events(
+    events: list[ConnpassEvent],
+    terms: list[str],
+    secondary: list[float] | None = None,
+    extra: list[dict] | None = None,
+) -> list[dict]:
+    """イベントを出力用の dict に変換する。
+
+    CONNPASS_PRERANK が有効（デフォルト）の場合は、おすすめ度と理由を付与して
+    おすすめ度の高い順 → 開催日の近い順に並べ替える。extra は各イベントに追加する項目。
+    """
+    extra = extra or [{} for _ in events]
+    if not env_bool("CONNPASS_PRERANK", True):
+        return [{**_format_event(e), **x} for e, x in zip(events, extra)]
+
+    position = {id(e): i for i, e in enumerate(events)}
+    return [
+        {
+            **_format_event(ranked.event),
+            **extra[position[id(ranked.event)]],
+            "recommendation_level": ranked.recommendation_level,
+            "recommendation_reasons": list(ranked.reasons),
+        }
+        for ranked in rank_events(events, terms, secondary=secondary)
+    ]
+
+
+def _to_tool_result(result: ConnpassSearchResult | dict, terms: list[str] = ()) -> dict:
+    if isinstance(result, dict):
+        return result
+
+    payload = {
+        "results_returned": result.results_returned,
+        "results_available": result.results_available,
+        "results_start": result.results_start,
+        "events": _format_events(result.events, list(terms)),
+    }
+    if result.stale:
+        payload["stale"] = True
+    return _fit_token_budget(payload)
+
 
 @tool
 def search_connpass(
@@ -172,6 +712,7 @@ def search_connpass(
     order: int = 1,
     start: int = 1,
     count: int = 10,
+    max_results: int = 0,
 ) -> dict:
     """connpass API v2からイベントを検索する。
 
@@ -186,8 +727,9 @@ def search_connpass(
         order: ソート順。1=更新日時降順, 2=開催日時降順, 3=新着順
         start: 検索結果の開始位置（最小値: 1）
         count: 取得件数（1〜100）
+        max_results: 0より大きい値を指定すると、startから最大この件数（上限1000）まで複数ページを自動取得する。指定時はcountは無視される。開催月全体など100件を超える検索結果をまとめて取得したい場合に使う
     """
-    result = _search_connpass_api(
+    params = dict(
         keyword=keyword,
         keyword_or=keyword_or,
         ym=ym,
@@ -197,31 +739,58 @@ def search_connpass(
         start=start,
         count=count,
     )
+    terms = query_terms(keyword, keyword_or)
+    max_results = min(max_results, MAX_FETCH_RESULTS)
+    indexed = _search_local_index(max_results, **params)
+    if indexed is not None:
+        return _to_tool_result(indexed, terms)
+    if max_results > 0:
+        return _to_tool_result(_search_connpass_pages(max_results, **params), terms)
+    return _to_tool_result(_search_connpass_api(**params), terms)
+
+
+@tool(name="search_connpass")
+async def search_connpass_async(
+    keyword: str = "",
+    keyword_or: str = "",
+    ym: str = "",
+    ymd: str = "",
+    prefecture: str = "",
+    order: int = 1,
+    start: int = 1,
+    count: int = 10,
+    max_results: int = 0,
+) -> dict:
+    """connpass API v2からイベントを検索する。
 
-    if isinstance(result, dict):
-        return result
+    技術カンファレンス、勉強会、LT会などのイベント情報を検索する。
 
-    return {
-        "results_returned": result.results_returned,
-        "results_available": result.results_available,
-        "results_start": result.results_start,
-        "events": [
-            {
-                "id": e.id,
-                "title": e.title,
-                "catch": e.catch,
-                "description": e.description,
-                "url": e.url,
-                "started_at": e.started_at,
-                "ended_at": e.ended_at,
-                "place": e.place,
-                "address": e.address,
-                "accepted": e.accepted,
-                "waiting": e.waiting,
-                "limit": e.limit,
-                "event_type": e.event_type,
-                "open_status": e.open_status,
-            }
-            for e in result.events
-        ],
-    }
+    Args:
+        keyword: AND条件検索キーワード。タイトル、キャッチ、概要、住所を対象に検索。複数指定時はカンマ区切り
+        keyword_or: OR条件検索キーワード。タイトル、キャッチ、概要、住所を対象に検索。複数指定時はカンマ区切り
+        ym: 開催年月（yyyymm形式）。例: "202603"
+        ymd: 開催日（yyyymmdd形式）。例: "20260315"
+        prefecture: 都道府県コード。例: "tokyo", "online", "osaka"。複数指定時はカンマ区切り
+        order: ソート順。1=更新日時降順, 2=開催日時降順, 3=新着順
+        start: 検索結果の開始位置（最小値: 1）
+        count: 取得件数（1〜100）
+        max_results: 0より大きい値を指定すると、startから最大この件数（上限1000）まで複数ページを自動取得する。指定時はcountは無視される。開催月全体など100件を超える検索結果をまとめて取得したい場合に使う
+    """
+    params = dict(
+        keyword=keyword,
+        keyword_or=keyword_or,
+        ym=ym,
+        ymd=ymd,
+        prefecture=prefecture,
+        order=order,
+        start=start,
+        count=count,
+    )
+    terms = query_terms(keyword, keyword_or)
+    max_results = min(max_results, MAX_FETCH_RESULTS)
+    indexed = _search_local_index(max_results, **params)
+    if indexed is not None:
+        return _to_tool_result(indexed, terms)
+    if max_results > 0:
+        return _to_tool_result(await _search_connpass_pages_async(max_results, **params), terms)
+    return _to_tool_result(await _search_connpass_api_async(**params), terms)
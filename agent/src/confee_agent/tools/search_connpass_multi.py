@@ -0,0 +1,141 @@
+import asyncio
+import logging
+
+from strands import tool
+
+from confee_agent.config import env_int
+from confee_agent.models import ConnpassEvent, ConnpassSearchResult
+from confee_agent.ranking import query_terms
+from confee_agent.tools.search_connpass import (
+    _fit_token_budget,
+    _format_events,
+    _search_connpass_api_async,
+    _search_local_index,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_QUERIES = 5
+DEFAULT_MAX_CONCURRENCY = 3
+
+# クエリ指定で受け付けるキー（_search_connpass_api の引数と同じ）
+_QUERY_FIELDS = {
+    "keyword": str,
+    "keyword_or": str,
+    "ym": str,
+    "ymd": str,
+    "prefecture": str,
+    "order": int,
+    "start": int,
+    "count": int,
+}
+
+
+def _validate_query(query: dict) -> dict:
+    if not isinstance(query, dict):
+        raise ValueError("query must be an object")
+    params = {}
+    for name, value in query.items():
+        expected = _QUERY_FIELDS.get(name)
+        if expected is None:
+            raise ValueError(f"unknown field: {name}")
+        if expected is int and isinstance(value, str) and value.isdigit():
+            value = int(value)
+        if not isinstance(value, expected):
+            raise ValueError(f"{name} must be {expected.__name__}")
+        params[name] = value
+    return params
+
+
+def _merge_results(results: list[ConnpassSearchResult]) -> list[tuple[ConnpassEvent, int]]:
+    """イベント ID で重複を除き、ヒットしたクエリ数の多い順 → 開催日時の早い順に並べる。"""
+    merged: dict[int, list] = {}
+    for result in results:
+        for event in result.events:
+            entry = merged.get(event.id)
+            if entry is None:
+                merged[event.id] = [event, 1]
+            else:
+                entry[1] += 1
+
+    return sorted(
+        ((event, hits) for event, hits in merged.values()),
+        key=lambda item: (-item[1], item[0].started_at or "9999"),
+    )
+
+
+async def _search_connpass_multi(
+    queries: list[dict],
+    max_concurrency: int,
+) -> dict:
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(params: dict) -> ConnpassSearchResult | dict:
+        indexed = _search_local_index(**params)
+        if indexed is not None:
+            return indexed
+        async with semaphore:
+            return await _search_connpass_api_async(**params)
+
+    summaries: list[dict] = []
+    tasks = []
+    for query in queries:
+        try:
+            params = _validate_query(query)
+        except ValueError as e:
+            summaries.append({"query": query, "error": True, "message": str(e)})
+            continue
+        summaries.append({"query": params})
+        tasks.append((summaries[-1], asyncio.create_task(run(params))))
+
+    successes: list[ConnpassSearchResult] = []
+    for summary, task in tasks:
+        result = await task
+        if isinstance(result, dict):
+            summary.update(result)
+        else:
+            summary["results_available"] = result.results_available
+            summary["results_returned"] = result.results_returned
+            if result.stale:
+                summary["stale"] = True
+            successes.append(result)
+
+    merged = _merge_results(successes)
+    terms = query_terms(
+        *(s["query"].get(name, "") for s in summaries if "error" not in s for name in ("keyword", "keyword_or"))
+    )
+    hits = [h for _, h in merged]
+    return _fit_token_budget(
+        {
+            "results_returned": len(merged),
+            "queries": summaries,
+            "events": _format_events(
+                [event for event, _ in merged],
+                terms,
+                secondary=hits,
+                extra=[{"matched_queries": h} for h in hits],
+            ),
+        }
+    )
+
+
+@tool
+async def search_connpass_multi(queries: list[dict]) -> dict:
+    """複数の検索条件で connpass API v2 を同時に検索し、結果を統合して返す。
+
+    あいまいなクエリで複数のキーワードを試したい場合に、search_connpass を何度も呼ぶ代わりに使う。
+    同じイベントは 1 件にまとめ、多くの検索条件にヒットしたもの → 開催日が近いものの順に並べる。
+
+    Args:
+        queries: 検索条件のリスト（最大5件）。各要素は search_connpass と同じキー
+            (keyword, keyword_or, ym, ymd, prefecture, order, start, count) を持つオブジェクト。
+            例: [{"keyword": "TypeScript"}, {"keyword_or": "React,Vue", "ym": "202603"}]
+    """
+    if not queries:
+        return {"error": True, "message": "queries must contain at least one query"}
+    if len(queries) > MAX_QUERIES:
+        logger.info("Truncating %d queries to %d", len(queries), MAX_QUERIES)
+        queries = queries[:MAX_QUERIES]
+
+    max_concurrency = max(1, env_int("CONNPASS_MULTI_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY))
+    return await _search_connpass_multi(queries, max_concurrency)
@@ -1,8 +1,12 @@
 const API_URL = import.meta.env.VITE_API_URL as string | undefined;
+// Chat Lambda がレスポンスストリーミングに対応するまでは、SSE を中継しても全文がまとめて届くだけなので
+// 既定では JSON で受け取る。ストリーミング対応の構成でのみ "true" にする
+const STREAM_ENABLED = import.meta.env.VITE_CHAT_STREAM === "true";
 
 interface ChatRequest {
   message: string;
   session_id: string;
+  stream?: boolean;
 }
 
 interface ChatResponse {
@@ -14,6 +18,17 @@ interface ChatErrorResponse {
   error: string;
 }
 
+// サーバーから送られるストリームイベント（SSE の data 行の JSON）
+interface ChatStreamEvent {
+  data?: string;
+  tool?: string;
+  error?: string;
+  done?: boolean;
+  session_id?: string;
+}
+
+export type ChatDeltaHandler = (text: string) => void;
+
 export class ChatApiError extends Error {
   readonly status: number;
 
@@ -24,15 +39,74 @@ export class ChatApiError extends Error {
   }
 }
 
+// SSE のテキストを読み進め、応答テキストが届くたびに onDelta に累積テキストを渡す
+async function readEventStream(
+  res: Response,
+  sessionId: string,
+  onDelta?: ChatDeltaHandler
+): Promise<ChatResponse> {
+  if (!res.body) {
+    throw new ChatApiError("Empty stream response", res.status);
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let text = "";
+  let resolvedSessionId = sessionId;
+
+  const handleEvent = (raw: string) => {
+    const data = raw
+      .split("\n")
+      .filter((line) => line.startsWith("data:"))
+      .map((line) => line.slice(5).trim())
+      .join("");
+    if (!data) return;
+
+    const event = JSON.parse(data) as ChatStreamEvent;
+    if (event.error) {
+      throw new ChatApiError(event.error, 503);
+    }
+    if (event.data) {
+      text += event.data;
+      onDelta?.(text);
+    }
+    if (event.done && event.session_id) {
+      resolvedSessionId = event.session_id;
+    }
+  };
+
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      handleEvent(buffer.slice(0, boundary));
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf("\n\n");
+    }
+  }
+  buffer += decoder.decode();
+  if (buffer.trim()) handleEvent(buffer);
+
+  return { response: text, session_id: resolvedSessionId };
+}
+
 export async function sendMessage(
   message: string,
-  sessionId: string
+  sessionId: string,
+  onDelta?: ChatDeltaHandler
 ): Promise<ChatResponse> {
   if (!API_URL) {
     throw new Error("VITE_API_URL is not configured");
   }
 
   const body: ChatRequest = { message, session_id: sessionId };
+  if (STREAM_ENABLED) {
+    body.stream = true;
+  }
 
   const res = await fetch(`${API_URL}/chat`, {
     method: "POST",
@@ -46,6 +120,10 @@ export async function sendMessage(
     throw new ChatApiError(errorMessage, res.status);
   }
 
+  if (res.headers.get("Content-Type")?.startsWith("text/event-stream")) {
+    return readEventStream(res, sessionId, onDelta);
+  }
+
   return res.json() as Promise<ChatResponse>;
 }
 
@@ -40,6 +40,7 @@ function getErrorMessage(err: unknown): string {
 export function ChatContainer({ sessionKey }: Props) {
   const [messages, setMessages] = useState<ChatMessage[]>([]);
   const [isLoading, setIsLoading] = useState(false);
+  const [isStreaming, setIsStreaming] = useState(false);
   const sessionIdRef = useRef(generateSessionId());
 
   // sessionKey が変わったらセッションをリセット
@@ -48,6 +49,7 @@ export function ChatContainer({ sessionKey }: Props) {
     prevKeyRef.current = sessionKey;
     setMessages([]);
     setIsLoading(false);
+    setIsStreaming(false);
     sessionIdRef.current = generateSessionId();
   }
 
@@ -62,17 +64,23 @@ export function ChatContainer({ sessionKey }: Props) {
     setMessages((prev) => [...prev, userMessage]);
     setIsLoading(true);
 
+    // ストリーミング中は同じ ID のメッセージを更新し続ける
+    const assistantId = crypto.randomUUID();
+    const upsertAssistant = (content: string) => {
+      setMessages((prev) =>
+        prev.some((m) => m.id === assistantId)
+          ? prev.map((m) => (m.id === assistantId ? { ...m, content } : m))
+          : [...prev, { id: assistantId, role: "assistant", content, timestamp: new Date() }]
+      );
+    };
+
     try {
-      const data = await sendMessage(text, sessionIdRef.current);
+      const data = await sendMessage(text, sessionIdRef.current, (partial) => {
+        setIsStreaming(true);
+        upsertAssistant(partial);
+      });
       sessionIdRef.current = data.session_id;
-
-      const assistantMessage: ChatMessage = {
-        id: crypto.randomUUID(),
-        role: "assistant",
-        content: data.response,
-        timestamp: new Date(),
-      };
-      setMessages((prev) => [...prev, assistantMessage]);
+      upsertAssistant(data.response);
     } catch (err) {
       // セッションタイムアウト時は新しいセッションIDを生成
       if (err instanceof ChatApiError && err.status === 408) {
@@ -88,6 +96,7 @@ export function ChatContainer({ sessionKey }: Props) {
       setMessages((prev) => [...prev, errorMessage]);
     } finally {
       setIsLoading(false);
+      setIsStreaming(false);
     }
   }, []);
 
@@ -112,7 +121,7 @@ export function ChatContainer({ sessionKey }: Props) {
           </div>
         </div>
       ) : (
-        <MessageList messages={messages} isLoading={isLoading} />
+        <MessageList messages={messages} isLoading={isLoading && !isStreaming} />
       )}
       <SuggestedPrompts
         prompts={suggestedPrompts}
@@ -45,6 +45,35 @@ describe("ChatContainer", () => {
     expect(screen.queryByText("TypeScriptのカンファレンスある？")).not.toBeInTheDocument();
   });
 
+  it("ストリーミング中の途中テキストを表示し、完了後に最終テキストで置き換える", async () => {
+    const user = userEvent.setup();
+    let finish: () => void = () => {};
+    sendMessageMock.mockImplementationOnce(async (_message, sessionId, onDelta) => {
+      onDelta?.("途中までの応答");
+      await new Promise<void>((resolve) => {
+        finish = resolve;
+      });
+      return { response: "途中までの応答と続き", session_id: sessionId };
+    });
+
+    render(<ChatContainer sessionKey={0} />);
+
+    const input = screen.getByPlaceholderText("カンファレンスについて質問してみましょう...");
+    await user.type(input, "テスト");
+    await user.click(screen.getByText("送信"));
+
+    await waitFor(() => {
+      expect(screen.getByText("途中までの応答")).toBeInTheDocument();
+    });
+
+    finish();
+
+    await waitFor(() => {
+      expect(screen.getByText("途中までの応答と続き")).toBeInTheDocument();
+    });
+    expect(screen.queryByText("途中までの応答")).not.toBeInTheDocument();
+  });
+
   it("API接続エラー時にフレンドリーなメッセージを表示する", async () => {
     const user = userEvent.setup();
     sendMessageMock.mockRejectedValueOnce(new TypeError("Failed to fetch"));
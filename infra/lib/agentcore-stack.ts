@@ -1,4 +1,5 @@
 import * as cdk from "aws-cdk-lib/core";
+import * as dynamodb from "aws-cdk-lib/aws-dynamodb";
 import * as iam from "aws-cdk-lib/aws-iam";
 import * as lambda from "aws-cdk-lib/aws-lambda";
 import * as ecr_assets from "aws-cdk-lib/aws-ecr-assets";
@@ -64,6 +65,15 @@ export class ConfeeAgentCoreStack extends cdk.Stack {
       })
     );
 
+    // microVM をまたいで検索結果・回答を共有するキャッシュテーブル (期限切れの項目は TTL で削除)
+    const cacheTable = new dynamodb.Table(this, "CacheTable", {
+      partitionKey: { name: "key", type: dynamodb.AttributeType.STRING },
+      billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+      timeToLiveAttribute: "expires_at",
+      removalPolicy: cdk.RemovalPolicy.DESTROY,
+    });
+    cacheTable.grant(agentRuntimeRole, "dynamodb:GetItem", "dynamodb:PutItem");
+
     // Custom Resource Lambda: AgentCore Runtime 作成/削除
     const onEventHandler = new lambda.Function(
       this,
@@ -133,6 +143,13 @@ export class ConfeeAgentCoreStack extends cdk.Stack {
         roleArn: agentRuntimeRole.roleArn,
         environmentVariables: JSON.stringify({
           AWS_DEFAULT_REGION: "ap-northeast-1",
+          // ツール結果をテンプレートで使う項目に絞り、入力トークンを削減する
+          CONNPASS_COMPACT_RESULTS: "true",
+          CONNPASS_RESULT_TOKEN_BUDGET: "4000",
+          // 検索結果・回答のキャッシュを DynamoDB で共有し、期限切れの検索結果は裏で取り直しつつ返す
+          CONFEE_CACHE_BACKEND: "dynamodb",
+          CONFEE_CACHE_TABLE: cacheTable.tableName,
+          CONNPASS_CACHE_STALE_SECONDS: "600",
         }),
       },
     });
@@ -43,7 +43,7 @@ export class ConfeeApiStack extends cdk.Stack {
       runtime: lambda.Runtime.PYTHON_3_13,
       handler: "handler.handler",
       code: lambda.Code.fromAsset(chatLambdaPath, {
-        exclude: ["tests", "tests/**", "__pycache__"],
+        exclude: ["tests", "tests/**", "benchmarks", "benchmarks/**", "__pycache__"],
         bundling: {
           image: lambda.Runtime.PYTHON_3_13.bundlingImage,
           command: [
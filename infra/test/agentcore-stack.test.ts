@@ -46,6 +46,14 @@ describe("ConfeeAgentCoreStack", () => {
     });
   });
 
+  test("共有キャッシュ用のDynamoDBテーブルがTTL付きで作成される", () => {
+    template.hasResourceProperties("AWS::DynamoDB::Table", {
+      KeySchema: [{ AttributeName: "key", KeyType: "HASH" }],
+      BillingMode: "PAY_PER_REQUEST",
+      TimeToLiveSpecification: { AttributeName: "expires_at", Enabled: true },
+    });
+  });
+
   test("AgentRuntimeIdの出力が定義される", () => {
     template.hasOutput("AgentRuntimeId", {});
   });